@@ -0,0 +1,86 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measures how long it takes to execute many token transfers concurrently on one event loop,
+with the node calls made on `Transact.executor` and with them blocking the event loop.
+
+Both the total time and the longest period during which the event loop could not run
+any other coroutine get reported.
+
+Requires ganache-cli listening on localhost:8555 (see `ganache.sh`).
+Run with `python -m benchmarks.concurrent_transact`.
+"""
+
+import asyncio
+import time
+
+from web3 import Web3, HTTPProvider
+
+from pymaker import Address, Transact
+from pymaker.numeric import Wad
+from pymaker.token import DSToken
+from pymaker.util import synchronize
+
+TRANSFERS = 100
+
+web3 = Web3(HTTPProvider("http://localhost:8555"))
+web3.eth.defaultAccount = web3.eth.accounts[0]
+
+token = DSToken.deploy(web3, 'ABC')
+token.mint(Wad.from_number(1000000)).transact()
+
+
+async def blocking_run(self, function, *args):
+    # what `Transact.transact_async()` did before, blocking the event loop on every node call
+    return function(*args)
+
+
+def benchmark() -> tuple:
+    # measures for how long the event loop has been unable to run other coroutines at most
+    stalls = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            start = time.time()
+            await asyncio.sleep(0.01)
+            stalls.append(time.time() - start - 0.01)
+
+    async def transfers():
+        try:
+            return await asyncio.gather(*[token.transfer(Address(web3.eth.accounts[1]), Wad(1)).transact_async()
+                                          for _ in range(TRANSFERS)])
+        finally:
+            done.set()
+
+    start = time.time()
+    receipts = synchronize([transfers(), heartbeat()])[0]
+    assert all(receipt is not None and receipt.successful for receipt in receipts)
+
+    return time.time() - start, max(stalls)
+
+
+original_run = Transact._run
+Transact._run = blocking_run
+blocking_time, blocking_stall = benchmark()
+Transact._run = original_run
+executor_time, executor_stall = benchmark()
+
+print(f"{TRANSFERS} concurrent transfers, blocking the event loop:"
+      f" {blocking_time:.2f}s, longest event loop stall {blocking_stall*1000:.0f}ms")
+print(f"{TRANSFERS} concurrent transfers, node calls on the executor:"
+      f" {executor_time:.2f}s, longest event loop stall {executor_stall*1000:.0f}ms")
@@ -0,0 +1,90 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measures how many bytes a cached order or urn takes, including its `Wad` and `Address` fields.
+
+Run with `python -m benchmarks.memory`, on two revisions if you want to compare them.
+"""
+
+import gc
+import tracemalloc
+
+from pymaker import Address
+from pymaker.dss import Ilk, Urn
+from pymaker.numeric import Wad
+from pymaker.oasis import Order as OasisOrder
+from pymaker.zrxv2 import Order as ZrxOrder, ERC20Asset
+
+COUNT = 20000
+
+PAY_TOKEN = '0x' + 'aa' * 20
+BUY_TOKEN = '0x' + 'bb' * 20
+ZERO = '0x' + '00' * 20
+
+
+def address(i: int) -> str:
+    return '0x' + format(i, '040x')
+
+
+def oasis_order(i: int):
+    return OasisOrder(market=None,
+                      order_id=i,
+                      maker=Address(address(i % 100)),
+                      pay_token=Address(PAY_TOKEN),
+                      pay_amount=Wad(10**18 + i),
+                      buy_token=Address(BUY_TOKEN),
+                      buy_amount=Wad(2 * 10**18 + i),
+                      timestamp=1500000000 + i)
+
+
+def zrx_order(i: int):
+    return ZrxOrder(exchange=None,
+                    sender=Address(ZERO),
+                    maker=Address(address(i % 100)),
+                    taker=Address(ZERO),
+                    maker_fee=Wad(0),
+                    taker_fee=Wad(0),
+                    pay_asset=ERC20Asset(Address(PAY_TOKEN)),
+                    pay_amount=Wad(10**18 + i),
+                    buy_asset=ERC20Asset(Address(BUY_TOKEN)),
+                    buy_amount=Wad(2 * 10**18 + i),
+                    salt=1500000000000 + i,
+                    fee_recipient=Address(ZERO),
+                    expiration=1600000000,
+                    exchange_contract_address=Address(address(12345)),
+                    signature='0x' + '1c' * 66)
+
+
+def urn(i: int):
+    return Urn(address=Address(address(i)), ilk=Ilk('ETH'), ink=Wad(10**18 + i), art=Wad(10**20 + i))
+
+
+def bytes_per_object(factory) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(objects) == COUNT
+    return (after - before) / COUNT
+
+
+if __name__ == '__main__':
+    for name, factory in [('oasis.Order', oasis_order), ('zrxv2.Order', zrx_order), ('dss.Urn', urn)]:
+        print(f"{name:<12} {bytes_per_object(factory):8.0f} bytes per object")
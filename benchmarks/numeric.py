@@ -0,0 +1,133 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compares the integer-only `Wad`/`Ray`/`Rad` arithmetic with the former `Decimal` based one,
+and `WadArray`/`RayArray` batch arithmetic with a Python loop over `Wad` numbers.
+
+Run with `python -m benchmarks.numeric`.
+"""
+
+import random
+import timeit
+from decimal import Decimal, localcontext
+
+from pymaker.numeric import Wad, Ray, Rad, WadArray, RayArray, _context
+
+
+def _quantize(value: Decimal) -> int:
+    return int(value.quantize(1, context=_context))
+
+
+# The `Decimal` based implementation `Wad`, `Ray` and `Rad` used before, evaluated with
+# the 1000-digit `_context` so it gives exact results even for values above 28 digits.
+def decimal_mul(x: int, y: int, decimals: int) -> int:
+    with localcontext(_context):
+        return _quantize(Decimal(x) * Decimal(y) / (Decimal(10) ** Decimal(decimals)))
+
+
+def decimal_div(x: int, y: int, decimals: int) -> int:
+    with localcontext(_context):
+        return _quantize(Decimal(x) * (Decimal(10) ** Decimal(decimals)) / Decimal(y))
+
+
+def decimal_downcast(x: int, decimals: int) -> int:
+    with localcontext(_context):
+        return _quantize(Decimal(x) // (Decimal(10) ** Decimal(decimals)))
+
+
+def random_value() -> int:
+    value = random.randrange(1, 10 ** random.randint(1, 40))
+    return value if random.random() < 0.9 else -value
+
+
+def check(samples: int) -> int:
+    mismatches = 0
+    for _ in range(samples):
+        x, y = random_value(), random_value()
+
+        expected_and_actual = [
+            (decimal_mul(x, y, 18), (Wad(x) * Wad(y)).value),
+            (decimal_mul(x, y, 27), (Wad(x) * Ray(y)).value),
+            (decimal_mul(x, y, 27), (Ray(x) * Ray(y)).value),
+            (decimal_mul(x, y, 45), (Rad(x) * Rad(y)).value),
+            (decimal_div(x, y, 18), (Wad(x) / Wad(y)).value),
+            (decimal_div(x, y, 27), (Ray(x) / Ray(y)).value),
+            (decimal_div(x, y, 45), (Rad(x) / Rad(y)).value),
+            (decimal_downcast(x, 9), Wad(Ray(x)).value),
+            (decimal_downcast(x, 27), Wad(Rad(x)).value),
+        ]
+
+        mismatches += sum(1 for expected, actual in expected_and_actual if expected != actual)
+
+    return mismatches
+
+
+def bench(name: str, statement, number: int = 100000):
+    seconds = timeit.timeit(statement, number=number)
+    print(f"{name:<32} {seconds / number * 10**9:10.0f} ns/op")
+
+
+def bench_arrays(size: int = 10000, number: int = 20):
+    pay_amounts = [Wad(random.randrange(10**15, 10**22)) for _ in range(size)]
+    buy_amounts = [Wad(random.randrange(10**15, 10**22)) for _ in range(size)]
+    inks = [Wad(random.randrange(10**15, 10**22)) for _ in range(size)]
+    arts = [Wad(random.randrange(10**15, 10**22)) for _ in range(size)]
+    spot, rate = Ray.from_number(150.5), Ray.from_number(1.0234)
+
+    pay_array, buy_array = WadArray.from_list(pay_amounts), WadArray.from_list(buy_amounts)
+    ink_array, art_array = WadArray.from_list(inks), WadArray.from_list(arts)
+
+    def prices_loop():
+        return sorted(pay / buy for pay, buy in zip(pay_amounts, buy_amounts))
+
+    def prices_array():
+        return (pay_array / buy_array).sorted()
+
+    def unsafe_loop():
+        return [ink * spot < art * rate for ink, art in zip(inks, arts)]
+
+    def unsafe_array():
+        return (ink_array * spot).lt(art_array * rate)
+
+    assert prices_loop() == prices_array().to_list()
+    assert unsafe_loop() == unsafe_array()
+
+    bench(f"loop  sorted prices ({size})", prices_loop, number)
+    bench(f"array sorted prices ({size})", prices_array, number)
+    bench(f"loop  unsafe urns ({size})", unsafe_loop, number)
+    bench(f"array unsafe urns ({size})", unsafe_array, number)
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    print(f"Mismatches against the Decimal implementation: {check(20000)}")
+    print()
+
+    a, b = Wad.from_number(1234.5678), Wad.from_number(0.00431)
+    r = Ray.from_number(1.0000000015)
+
+    bench("Decimal Wad * Wad", lambda: decimal_mul(a.value, b.value, 18))
+    bench("int     Wad * Wad", lambda: a * b)
+    bench("Decimal Wad / Wad", lambda: decimal_div(a.value, b.value, 18))
+    bench("int     Wad / Wad", lambda: a / b)
+    bench("Decimal Wad * Ray", lambda: decimal_mul(a.value, r.value, 27))
+    bench("int     Wad * Ray", lambda: a * r)
+    bench("Decimal Wad(Ray)", lambda: decimal_downcast(r.value, 9))
+    bench("int     Wad(Ray)", lambda: Wad(r))
+    print()
+
+    bench_arrays()
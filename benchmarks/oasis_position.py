@@ -0,0 +1,72 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measures `MatchingMarket.make()` latency (i.e. the time it takes to calculate the order position)
+with 1000 resting orders, with and without the local orderbook.
+
+Requires ganache-cli listening on localhost:8555 (see `ganache.sh`).
+Run with `python -m benchmarks.oasis_position`.
+"""
+
+import random
+import time
+
+from web3 import Web3, HTTPProvider
+
+from pymaker import Address
+from pymaker.approval import directly
+from pymaker.numeric import Wad
+from pymaker.oasis import MatchingMarket
+from pymaker.token import DSToken
+
+RESTING_ORDERS = 1000
+LADDER_ORDERS = 50
+
+web3 = Web3(HTTPProvider("http://localhost:8555"))
+web3.eth.defaultAccount = web3.eth.accounts[0]
+
+token1 = DSToken.deploy(web3, 'AAA')
+token1.mint(Wad.from_number(1000000)).transact()
+token2 = DSToken.deploy(web3, 'BBB')
+token2.mint(Wad.from_number(1000000)).transact()
+
+otc = MatchingMarket.deploy(web3, 2500000000)
+otc.add_token_pair_whitelist(token1.address, token2.address).transact()
+otc.approve([token1, token2], directly())
+
+print(f"Placing {RESTING_ORDERS} resting orders...")
+for _ in range(RESTING_ORDERS):
+    otc.make(pay_token=token1.address, pay_amount=Wad.from_number(1),
+             buy_token=token2.address, buy_amount=Wad.from_number(random.randint(100, 200)), pos=0).transact()
+
+
+def benchmark(market: MatchingMarket):
+    latencies = []
+    for i in range(LADDER_ORDERS):
+        start = time.time()
+        transact = market.make(pay_token=token1.address, pay_amount=Wad.from_number(1),
+                               buy_token=token2.address, buy_amount=Wad.from_number(150 + i))
+        latencies.append(time.time() - start)
+        transact.transact()
+
+    return sum(latencies) / len(latencies), max(latencies)
+
+
+for use_order_book in [False, True]:
+    average, worst = benchmark(MatchingMarket(web3=web3, address=otc.address, use_order_book=use_order_book))
+    print(f"use_order_book={use_order_book}: average make() latency {average*1000:.1f}ms, worst {worst*1000:.1f}ms"
+          f" ({LADDER_ORDERS} orders)")
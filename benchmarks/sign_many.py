@@ -0,0 +1,68 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measures how many messages per second can be signed one by one with `eth_sign()`
+and all at once with `sign_many()`.
+
+Messages are signed both by the node (with `eth_sign` JSON-RPC requests) and locally, by an account
+registered with `register_private_key()`. Local signing only uses the pool of worker processes
+if the machine has more than one CPU.
+
+Requires ganache-cli listening on localhost:8555 (see `ganache.sh`).
+Run with `python -m benchmarks.sign_many`.
+"""
+
+import os
+import time
+
+from eth_account import Account
+from web3 import Web3, HTTPProvider
+
+from pymaker.keys import register_private_key
+from pymaker.sign import eth_sign, sign_many
+
+MESSAGES = 200
+
+web3 = Web3(HTTPProvider("http://localhost:8555"))
+messages = [os.urandom(32) for _ in range(MESSAGES)]
+
+
+def benchmark() -> tuple:
+    start = time.time()
+    one_by_one = [eth_sign(message, web3) for message in messages]
+    one_by_one_rate = MESSAGES / (time.time() - start)
+
+    start = time.time()
+    all_at_once = sign_many(messages, web3)
+    all_at_once_rate = MESSAGES / (time.time() - start)
+
+    assert one_by_one == all_at_once
+    return one_by_one_rate, all_at_once_rate
+
+
+web3.eth.defaultAccount = web3.eth.accounts[0]
+node_rates = benchmark()
+
+account = Account.create()
+register_private_key(web3, account.privateKey)
+web3.eth.defaultAccount = account.address
+local_rates = benchmark()
+
+for name, (one_by_one_rate, all_at_once_rate) in [('signed by the node', node_rates),
+                                                  (f'signed locally, {os.cpu_count()} CPUs', local_rates)]:
+    print(f"{MESSAGES} messages {name}: {one_by_one_rate:.0f} per second with eth_sign(),"
+          f" {all_at_once_rate:.0f} per second with sign_many()")
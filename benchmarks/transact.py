@@ -0,0 +1,97 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measures how long it takes to send a transaction from an account registered with `register_private_key()`,
+signing it locally in `Transact` and with the web3.py signing middleware.
+
+Requires ganache-cli listening on localhost:8555 (see `ganache.sh`).
+Run with `python -m benchmarks.transact`.
+"""
+
+import time
+
+from eth_account import Account
+from web3 import Web3, HTTPProvider
+
+from pymaker import Address, Transact, eth_transfer
+from pymaker.gas import GasPrice, DefaultGasPrice, FixedGasPrice
+from pymaker.keys import register_private_key
+from pymaker.numeric import Wad
+from pymaker.token import DSToken
+
+TRANSACTIONS = 100
+
+web3 = Web3(HTTPProvider("http://localhost:8555"))
+web3.eth.defaultAccount = web3.eth.accounts[0]
+
+account = Account.create()
+register_private_key(web3, account.privateKey)
+eth_transfer(web3, Address(account.address), Wad.from_number(10)).transact()
+
+web3.eth.defaultAccount = account.address
+token = DSToken.deploy(web3, 'ABC')
+token.mint(Wad.from_number(1000000)).transact()
+
+
+def middleware_signed(self, account, gas: int, gas_price, nonce: int):
+    # what `Transact` did before, leaving it to the web3.py signing middleware to fill in the gas price
+    # and the chain id, and to sign the transaction
+    gas_price_dict = {'gasPrice': gas_price} if gas_price is not None else {}
+    return self._contract_function().transact({**{'from': account.address, 'gas': gas, 'nonce': nonce},
+                                               **gas_price_dict})
+
+
+def benchmark(func_signed, gas_price: GasPrice) -> tuple:
+    send_times = []
+    send_requests = []
+    original_func = Transact._func
+    original_request_blocking = web3.manager.request_blocking
+    requests = []
+
+    def counting_request_blocking(method, params):
+        requests.append(method)
+        return original_request_blocking(method, params)
+
+    def timed_func(self, *args):
+        requests.clear()
+        start = time.time()
+        try:
+            return original_func(self, *args)
+        finally:
+            send_times.append(time.time() - start)
+            send_requests.append(len(requests))
+
+    original_func_signed = Transact._func_signed
+    Transact._func = timed_func
+    Transact._func_signed = func_signed
+    web3.manager.request_blocking = counting_request_blocking
+    try:
+        for _ in range(TRANSACTIONS):
+            token.transfer(Address(web3.eth.accounts[1]), Wad(1)).transact(gas_price=gas_price)
+    finally:
+        Transact._func = original_func
+        Transact._func_signed = original_func_signed
+        web3.manager.request_blocking = original_request_blocking
+
+    return sum(send_times) / len(send_times), sum(send_requests) / len(send_requests)
+
+
+for gas_price in [DefaultGasPrice(), FixedGasPrice(1000000000)]:
+    for name, func_signed in [('signing middleware', middleware_signed), ('local signing', Transact._func_signed)]:
+        latency, requests = benchmark(func_signed, gas_price)
+        print(f"{name}, {type(gas_price).__name__}: average send latency {latency*1000:.1f}ms,"
+              f" {requests:.1f} JSON-RPC requests per send ({TRANSACTIONS} transactions)")
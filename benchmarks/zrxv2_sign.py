@@ -0,0 +1,78 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Measures how many 0x V2 orders per second can be signed, with order hashes calculated locally
+and with them fetched from the exchange contract with `eth_call`.
+
+Orders are signed by an account registered with `register_private_key()`, so signing itself
+does not need the node.
+
+Requires ganache-cli listening on localhost:8555 (see `ganache.sh`).
+Run with `python -m benchmarks.zrxv2_sign`.
+"""
+
+import time
+
+from eth_account import Account
+from web3 import Web3, HTTPProvider
+
+from pymaker import Address, eth_transfer
+from pymaker.keys import register_private_key
+from pymaker.numeric import Wad
+from pymaker.util import bytes_to_hexstring
+from pymaker.zrxv2 import ZrxExchangeV2, ERC20Asset
+
+ORDERS = 200
+
+web3 = Web3(HTTPProvider("http://localhost:8555"))
+web3.eth.defaultAccount = web3.eth.accounts[0]
+
+exchange = ZrxExchangeV2.deploy(web3, None)
+
+account = Account.create()
+register_private_key(web3, account.privateKey)
+eth_transfer(web3, Address(account.address), Wad.from_number(1)).transact()
+web3.eth.defaultAccount = account.address
+
+
+def contract_order_hash(self, order) -> str:
+    # what `ZrxExchangeV2.get_order_hash()` did before, calling `getOrderInfo` on the exchange contract
+    return bytes_to_hexstring(self._get_order_info(order)[0][1])
+
+
+def benchmark() -> float:
+    orders = [exchange.create_order(pay_asset=ERC20Asset(Address("0x0202020202020202020202020202020202020202")),
+                                    pay_amount=Wad.from_number(100 + i),
+                                    buy_asset=ERC20Asset(Address("0x0101010101010101010101010101010101010101")),
+                                    buy_amount=Wad.from_number(2.5), expiration=int(time.time()) + 3600)
+              for i in range(ORDERS)]
+
+    start = time.time()
+    for order in orders:
+        exchange.sign_order(order)
+
+    return ORDERS / (time.time() - start)
+
+
+original_get_order_hash = ZrxExchangeV2.get_order_hash
+ZrxExchangeV2.get_order_hash = contract_order_hash
+contract_rate = benchmark()
+ZrxExchangeV2.get_order_hash = original_get_order_hash
+local_rate = benchmark()
+
+print(f"{ORDERS} orders, hashed by the exchange contract: {contract_rate:.0f} orders signed per second")
+print(f"{ORDERS} orders, hashed locally: {local_rate:.0f} orders signed per second")
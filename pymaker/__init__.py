@@ -21,9 +21,9 @@ import logging
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, auto
-from functools import total_ordering, wraps
-from threading import Lock
+from functools import total_ordering, wraps, lru_cache, partial
 from typing import Optional
 
 import eth_utils
@@ -35,12 +35,14 @@ from web3.utils.contracts import get_function_info, encode_abi
 from web3.utils.events import get_event_data
 
 from pymaker.gas import DefaultGasPrice, GasPrice
+from pymaker.gas_estimates import GasEstimateCache
+from pymaker.logs import LogFetcher
+from pymaker.nonce import NonceManager
 from pymaker.numeric import Wad
+from pymaker.receipts import ReceiptWatcher
 from pymaker.util import synchronize, bytes_to_hexstring, is_contract_at
 
 filter_threads = []
-node_is_parity = None
-transaction_lock = Lock()
 
 
 def register_filter_thread(filter_thread):
@@ -87,11 +89,19 @@ def _track_status(f):
     return wrapper
 
 
+@lru_cache(maxsize=65536)
+def _normalize_address(address) -> str:
+    # interning means all instances of the same address share one string (and its cached hash)
+    return sys.intern(eth_utils.to_checksum_address(address))
+
+
 @total_ordering
 class Address:
     """Represents an Ethereum address.
 
     Addresses get normalized automatically, so instances of this class can be safely compared to each other.
+    Normalized representations are kept in a bounded LRU cache, as the same addresses tend to be seen
+    over and over again (in event logs, orders, receipts etc.), see `cache_info()`.
 
     Args:
         address: Can be any address representation allowed by web3.py
@@ -100,11 +110,40 @@ class Address:
     Attributes:
         address: Normalized hexadecimal representation of the Ethereum address.
     """
+
+    __slots__ = ('address',)
+
     def __init__(self, address):
         if isinstance(address, Address):
             self.address = address.address
         else:
-            self.address = eth_utils.to_checksum_address(address)
+            try:
+                self.address = _normalize_address(address)
+            except TypeError:
+                # unhashable representations (i.e. `bytearray`) can not be cached
+                self.address = sys.intern(eth_utils.to_checksum_address(address))
+
+    @classmethod
+    def from_bytes(cls, value: bytes):
+        """Creates an address from its 20-byte raw representation, i.e. straight from ABI decoding.
+
+        Meant for trusted inputs, as apart from checking the length the value doesn't get validated.
+        """
+        assert(len(value) == 20)
+
+        address = cls.__new__(cls)
+        address.address = _normalize_address(bytes(value))
+        return address
+
+    @staticmethod
+    def cache_info():
+        """Returns statistics of the cache of normalized addresses.
+
+        Returns:
+            A named tuple with `hits`, `misses`, `maxsize` and `currsize` fields,
+            as returned by `functools.lru_cache`.
+        """
+        return _normalize_address.cache_info()
 
     def as_bytes(self) -> bytes:
         """Return the address as a 20-byte bytes array."""
@@ -138,7 +177,28 @@ class Contract:
         assert(isinstance(bytecode, str))
         assert(isinstance(args, list))
 
-        tx_hash = web3.eth.contract(abi=abi, bytecode=bytecode).deploy(transaction={'from': eth_utils.to_checksum_address(web3.eth.defaultAccount)}, args=args)
+        # the nonce is reserved from the same manager `Transact` uses, so it stays in sync with the node
+        nonce_manager = NonceManager.for_account(web3, web3.eth.defaultAccount)
+        def deploy(nonce: int):
+            return web3.eth.contract(abi=abi, bytecode=bytecode).deploy(transaction={'from': eth_utils.to_checksum_address(web3.eth.defaultAccount),
+                                                                                     'nonce': nonce}, args=args)
+
+        try:
+            _, tx_hash = nonce_manager.reserve_and_send(deploy)
+        except Exception as e:
+            # the nonce might have been out of sync with the node (i.e. if a transaction has been sent
+            # from the same account outside of pymaker), so we try once more with a fresh one, but only
+            # if the node has rejected it because of the nonce, as otherwise it might have been accepted
+            nonce_manager.resync()
+            if not NonceManager.is_nonce_error(e):
+                raise
+
+            try:
+                _, tx_hash = nonce_manager.reserve_and_send(deploy)
+            except:
+                nonce_manager.resync()
+                raise
+
         receipt = web3.eth.getTransactionReceipt(tx_hash)
         return Address(receipt['contractAddress'])
 
@@ -153,28 +213,28 @@ class Contract:
 
         return web3.eth.contract(abi=abi)(address=address.address)
 
-    def _past_events(self, contract, event, cls, number_of_past_blocks, event_filter) -> list:
+    log_fetcher = LogFetcher()
+
+    def _past_events(self, contract, event, cls, number_of_past_blocks, event_filter, stream=False):
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        def _event_callback(cls, past):
-            def callback(log):
-                if past:
-                    self.logger.debug(f"Past event {log['event']} discovered, block_number={log['blockNumber']},"
-                                      f" tx_hash={bytes_to_hexstring(log['transactionHash'])}")
-                else:
-                    self.logger.debug(f"Event {log['event']} discovered, block_number={log['blockNumber']},"
-                                      f" tx_hash={bytes_to_hexstring(log['transactionHash'])}")
-                return cls(log)
+        block_number = contract.web3.eth.blockNumber
+        events = self._events_in_range(contract, event, cls, max(block_number-number_of_past_blocks, 0), block_number,
+                                       event_filter)
 
-            return callback
+        return events if stream else list(events)
 
-        block_number = contract.web3.eth.blockNumber
-        result = contract.events[event].createFilter(fromBlock=max(block_number-number_of_past_blocks, 0),
-                                                     toBlock=block_number,
-                                                     argument_filters=event_filter).get_all_entries()
+    def _events_in_range(self, contract, event, cls, from_block, to_block, event_filter):
+        assert(isinstance(from_block, int))
+        assert(isinstance(to_block, int))
+        assert(isinstance(event_filter, dict) or (event_filter is None))
 
-        return list(map(_event_callback(cls, True), result))
+        for log in self.log_fetcher.fetch(contract.events[event], from_block, to_block, event_filter):
+            self.logger.debug(f"Past event {log['event']} discovered, block_number={log['blockNumber']},"
+                              f" tx_hash={bytes_to_hexstring(log['transactionHash'])}")
+            yield cls(log)
 
     @staticmethod
     def _load_abi(package, resource) -> list:
@@ -336,6 +396,8 @@ class Transact:
 
     logger = logging.getLogger()
 
+    executor = ThreadPoolExecutor(max_workers=32)
+
     def __init__(self,
                  origin: Optional[object],
                  web3: Web3,
@@ -367,16 +429,12 @@ class Transact:
         self.result_function = result_function
         self.status = TransactStatus.NEW
         self.nonce = None
-
-    def _is_parity(self) -> bool:
-        global node_is_parity
-        if node_is_parity is None:
-            node_is_parity = "parity" in self.web3.version.node.lower()
-
-        return node_is_parity
+        self._encoded_calldata = None
 
     def _get_receipt(self, transaction_hash: str) -> Optional[Receipt]:
-        raw_receipt = self.web3.eth.getTransactionReceipt(transaction_hash)
+        return self._to_receipt(self.web3.eth.getTransactionReceipt(transaction_hash))
+
+    def _to_receipt(self, raw_receipt) -> Optional[Receipt]:
         if raw_receipt is not None and raw_receipt['blockNumber'] is not None:
             receipt = Receipt(raw_receipt)
             receipt.result = self.result_function(receipt) if self.result_function is not None else None
@@ -404,6 +462,13 @@ class Transact:
             return gas_estimate + 100000
 
     def _func(self, from_account: str, gas: int, gas_price: Optional[int], nonce: Optional[int]):
+        # Transactions from accounts registered with `pymaker.keys.register_private_key()` are built and signed
+        # locally, so unlike with the web3.py signing middleware no gas, nonce or chain id lookups are needed.
+        from pymaker.keys import local_account
+        account = local_account(self.web3, Address(from_account))
+        if account is not None and nonce is not None:
+            return self._func_signed(account, gas, gas_price, nonce)
+
         gas_price_dict = {'gasPrice': gas_price} if gas_price is not None else {}
         nonce_dict = {'nonce': nonce} if nonce is not None else {}
 
@@ -423,6 +488,30 @@ class Transact:
         else:
             return self.web3.eth.sendTransaction({**transaction_params, **{'to': self.address.address}})
 
+    def _func_signed(self, account, gas: int, gas_price: Optional[int], nonce: int):
+        from pymaker.keys import chain_id
+        transaction = {**self._as_dict(self.extra),
+                       **{'to': self.address.address,
+                          'data': self._calldata(),
+                          'gas': gas,
+                          'gasPrice': gas_price if gas_price is not None else self.web3.eth.gasPrice,
+                          'nonce': nonce,
+                          'chainId': chain_id(self.web3)}}
+
+        return self.web3.eth.sendRawTransaction(account.signTransaction(transaction).rawTransaction)
+
+    def _calldata(self):
+        # encoded only once, as it stays the same for all the gas price bumps
+        if self._encoded_calldata is None:
+            if self.contract is None:
+                self._encoded_calldata = '0x'
+            elif self.function_name is None:
+                self._encoded_calldata = self.parameters[0]
+            else:
+                self._encoded_calldata = self._contract_function()._encode_transaction_data()
+
+        return self._encoded_calldata
+
     def _contract_function(self):
         if '(' in self.function_name:
             function_factory = self.contract.get_function_by_signature(self.function_name)
@@ -490,9 +579,10 @@ class Transact:
 
         Out-of-gas exceptions are automatically recognized as transaction failures.
 
-        Allowed keyword arguments are: `from_address`, `gas`, `gas_buffer`, `gas_price`. `gas_price`
-        needs to be an instance of a class inheriting from :py:class:`pymaker.gas.GasPrice`.
-        `from_address` needs to be an instance of :py:class:`pymaker.Address`.
+        Allowed keyword arguments are: `from_address`, `gas`, `gas_buffer`, `gas_price`, `gas_estimate_cache`.
+        `gas_price` needs to be an instance of a class inheriting from :py:class:`pymaker.gas.GasPrice`.
+        `from_address` needs to be an instance of :py:class:`pymaker.Address`. `gas_estimate_cache` needs
+        to be an instance of :py:class:`pymaker.gas_estimates.GasEstimateCache`.
 
         The `gas` keyword argument is the gas limit for the transaction, whereas `gas_buffer`
         specifies how much gas should be added to the estimate. They can not be present
@@ -512,10 +602,15 @@ class Transact:
         Ultimately, its future value will become either a :py:class:`pymaker.Receipt` or `None`,
         depending on whether the transaction execution was successful or not.
 
+        The method never blocks the event loop, as all the calls to the node are made on the
+        `Transact.executor` thread pool. So many transactions can be executed concurrently
+        on a single event loop, i.e. with `asyncio.gather()`.
+
         Out-of-gas exceptions are automatically recognized as transaction failures.
 
-        Allowed keyword arguments are: `gas`, `gas_buffer`, `gas_price`. `gas_price` needs
-        to be an instance of a class inheriting from :py:class:`pymaker.gas.GasPrice`.
+        Allowed keyword arguments are: `gas`, `gas_buffer`, `gas_price`, `gas_estimate_cache`. `gas_price`
+        needs to be an instance of a class inheriting from :py:class:`pymaker.gas.GasPrice`.
+        `gas_estimate_cache` needs to be an instance of :py:class:`pymaker.gas_estimates.GasEstimateCache`.
 
         The `gas` keyword argument is the gas limit for the transaction, whereas `gas_buffer`
         specifies how much gas should be added to the estimate. They can not be present
@@ -534,8 +629,16 @@ class Transact:
         # do not increment the nonce. If the estimation is successful, we pass the calculated
         # gas value (plus some `gas_buffer`) to the subsequent `transact` calls so it does not
         # try to estimate it again.
+        #
+        # If a `gas_estimate_cache` has been passed, the estimate might come from it instead.
+        gas_estimate_cache = kwargs['gas_estimate_cache'] if ('gas_estimate_cache' in kwargs) else None
+        assert(isinstance(gas_estimate_cache, GasEstimateCache) or (gas_estimate_cache is None))
         try:
-            gas_estimate = self.estimated_gas(Address(from_account))
+            if gas_estimate_cache is not None:
+                gas_estimate, gas_estimate_cached = await self._run(gas_estimate_cache.estimated_gas,
+                                                                    self, Address(from_account))
+            else:
+                gas_estimate, gas_estimate_cached = await self._run(self.estimated_gas, Address(from_account)), False
         except:
             self.logger.warning(f"Transaction {self.name()} will fail, refusing to send ({sys.exc_info()[1]})")
             return None
@@ -554,69 +657,132 @@ class Transact:
 
             self.nonce = replaced_tx.nonce
 
+        # Unless the nonce has been borrowed, it gets reserved from the manager shared by all transactions
+        # sent from this account, so transactions can be sent back to back without waiting for each other.
+        nonce_manager = NonceManager.for_account(self.web3, from_account)
+        nonce_reserved = False
+        nonce_resynced = False
+
+        # If the nonce has been borrowed from a transaction which has already been mined, there is no point
+        # in sending this one as it would fail anyway.
+        if self.nonce is not None and await self._run(self.web3.eth.getTransactionCount, from_account) > self.nonce:
+            self.logger.warning(f"Transaction {self.name()} has been overridden by another transaction"
+                                f" with the same nonce, which means it has failed")
+            return None
+
         # Initialize variables which will be used in the main loop.
         tx_hashes = []
         initial_time = time.time()
         gas_price_last = 0
 
-        while True:
-            seconds_elapsed = int(time.time() - initial_time)
+        # Receipts are waited for by the watcher shared by all transactions sent through this `Web3` instance,
+        # so the number of requests to the node does not grow with the number of pending transactions.
+        watch = None
+        watch_future = None
+
+        try:
+            while True:
+                seconds_elapsed = int(time.time() - initial_time)
 
-            if self.nonce is not None and self.web3.eth.getTransactionCount(from_account) > self.nonce:
                 # Check if any transaction sent so far has been mined (has a receipt).
                 # If it has, we return either the receipt (if if was successful) or `None`.
-                for _ in range(5):
-                    for tx_hash in tx_hashes:
-                        receipt = self._get_receipt(tx_hash)
-                        if receipt:
-                            if receipt.successful:
-                                self.logger.info(f"Transaction {self.name()} was successful (tx_hash={bytes_to_hexstring(tx_hash)})")
-                                return receipt
-                            else:
-                                self.logger.warning(f"Transaction {self.name()} mined successfully but generated no single"
-                                                    f" log entry, assuming it has failed (tx_hash={bytes_to_hexstring(tx_hash)})")
-                                return None
-
-                    await asyncio.sleep(0.5)
-
-                # If we can not find a mined receipt but at the same time we know last used nonce
-                # has increased, then it means that the transaction we tried to send failed.
-                self.logger.warning(f"Transaction {self.name()} has been overridden by another transaction"
-                                    f" with the same nonce, which means it has failed")
-                return None
-
-            # Send a transaction if:
-            # - no transaction has been sent yet, or
-            # - the gas price requested has changed since the last transaction has been sent
-            gas_price_value = gas_price.get_gas_price(seconds_elapsed)
-            if len(tx_hashes) == 0 or ((gas_price_value is not None) and (gas_price_last is not None) and
-                                           (gas_price_value > gas_price_last * 1.1)):
-                gas_price_last = gas_price_value
-
-                try:
-                    # We need the lock in order to not try to send two transactions with the same nonce.
-                    with transaction_lock:
+                if watch_future is not None and watch_future.done():
+                    receipt = self._to_receipt(watch_future.result())
+                    if receipt is not None:
+                        if receipt.successful:
+                            self.logger.info(f"Transaction {self.name()} was successful"
+                                             f" (tx_hash={bytes_to_hexstring(receipt.transaction_hash)})")
+                            if gas_estimate_cache is not None:
+                                gas_estimate_cache.observe(self, receipt.gas_used)
+                            return receipt
+                        elif gas_estimate_cached and receipt.gas_used >= gas:
+                            # The cached estimate has turned out to be too low, so we drop it and send
+                            # the transaction again, this time with a fresh estimate.
+                            self.logger.warning(f"Transaction {self.name()} ran out of gas with a cached gas estimate,"
+                                                f" retrying with a fresh estimate"
+                                                f" (tx_hash={bytes_to_hexstring(receipt.transaction_hash)})")
+                            gas_estimate_cache.invalidate(self)
+                            return await self._transact_again(**kwargs)
+                        else:
+                            self.logger.warning(f"Transaction {self.name()} mined successfully but generated no single"
+                                                f" log entry, assuming it has failed"
+                                                f" (tx_hash={bytes_to_hexstring(receipt.transaction_hash)})")
+                            return None
+
+                    # If we can not find a mined receipt but at the same time we know last used nonce
+                    # has increased, then it means that the transaction we tried to send failed.
+                    self.logger.warning(f"Transaction {self.name()} has been overridden by another transaction"
+                                        f" with the same nonce, which means it has failed")
+                    return None
+
+                # Send a transaction if:
+                # - no transaction has been sent yet, or
+                # - the gas price requested has changed since the last transaction has been sent
+                gas_price_value = gas_price.get_gas_price(seconds_elapsed)
+                if len(tx_hashes) == 0 or ((gas_price_value is not None) and (gas_price_last is not None) and
+                                               (gas_price_value > gas_price_last * 1.1)):
+                    gas_price_last = gas_price_value
+
+                    try:
                         if self.nonce is None:
-                            if self._is_parity():
-                                self.nonce = int(self.web3.manager.request_blocking("parity_nextNonce", [from_account]), 16)
+                            nonce_reserved = True
+                            self.nonce, tx_hash = await self._run(nonce_manager.reserve_and_send,
+                                                                  lambda nonce: self._func(from_account, gas,
+                                                                                           gas_price_value, nonce))
+                        else:
+                            tx_hash = await self._run(self._func, from_account, gas, gas_price_value, self.nonce)
 
-                            else:
-                                self.nonce = self.web3.eth.getTransactionCount(from_account, block_identifier='pending')
-
-                        tx_hash = self._func(from_account, gas, gas_price_value, self.nonce)
                         tx_hashes.append(tx_hash)
 
-                    self.logger.info(f"Sent transaction {self.name()} with nonce={self.nonce}, gas={gas},"
-                                     f" gas_price={gas_price_value if gas_price_value is not None else 'default'}"
-                                     f" (tx_hash={bytes_to_hexstring(tx_hash)})")
-                except:
-                    self.logger.warning(f"Failed to send transaction {self.name()} with nonce={self.nonce}, gas={gas},"
-                                        f" gas_price={gas_price_value if gas_price_value is not None else 'default'}")
+                        if watch is None:
+                            watch = ReceiptWatcher.for_web3(self.web3).watch(from_account, self.nonce)
+                            watch_future = asyncio.wrap_future(watch.future)
+                        watch.add(tx_hash)
+
+                        self.logger.info(f"Sent transaction {self.name()} with nonce={self.nonce}, gas={gas},"
+                                         f" gas_price={gas_price_value if gas_price_value is not None else 'default'}"
+                                         f" (tx_hash={bytes_to_hexstring(tx_hash)})")
+                    except Exception as e:
+                        self.logger.warning(f"Failed to send transaction {self.name()} with nonce={self.nonce}, gas={gas},"
+                                            f" gas_price={gas_price_value if gas_price_value is not None else 'default'}")
+
+                        if len(tx_hashes) == 0:
+                            # If the node has rejected the transaction because of its nonce, the nonce has been
+                            # out of sync with the node (i.e. if some other process has sent a transaction from
+                            # the same account), so we try once more with a fresh one. Any other failure might
+                            # have happened after the node has accepted the transaction, so it never gets resent.
+                            if nonce_reserved and not nonce_resynced and NonceManager.is_nonce_error(e):
+                                nonce_manager.resync()
+                                nonce_resynced = True
+                                self.nonce = None
+                                continue
+
+                            # The reserved nonce might never be used, so the manager has to resync with the node,
+                            # otherwise all the subsequent transactions could be stuck behind a nonce gap.
+                            if nonce_reserved:
+                                nonce_manager.resync()
+
+                            raise
+
+                # Wake up as soon as the receipt arrives, but no later than when the gas price might need to change.
+                if watch_future is not None:
+                    await asyncio.wait([watch_future], timeout=0.25)
+                else:
+                    await asyncio.sleep(0.25)
 
-                    if len(tx_hashes) == 0:
-                        raise
+        finally:
+            if watch is not None:
+                watch.cancel()
 
-            await asyncio.sleep(0.25)
+    async def _run(self, function, *args):
+        # All the JSON-RPC calls made by `transact_async()` run on a thread pool, so the event loop can keep
+        # on running other transactions while they are waiting for the node.
+        return await asyncio.get_event_loop().run_in_executor(Transact.executor, partial(function, *args))
+
+    async def _transact_again(self, **kwargs) -> Optional[Receipt]:
+        # The nonce has been used already, so the retry gets a new one.
+        self.nonce = None
+        return await Transact.transact_async.__wrapped__(self, **{**kwargs, 'replace': None})
 
     def invocation(self) -> Invocation:
         """Returns the `Invocation` object for this pending Ethereum transaction.
@@ -629,7 +795,7 @@ class Transact:
         Returns:
             :py:class:`pymaker.Invocation` object for this pending Ethereum transaction.
         """
-        return Invocation(self.address, Calldata(self._contract_function()._encode_transaction_data()))
+        return Invocation(self.address, Calldata(self._calldata()))
 
 
 class Transfer:
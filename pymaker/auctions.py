@@ -149,7 +149,7 @@ class Flipper(Contract):
                            guy=Address(array[2]),
                            tic=int(array[3]),
                            end=int(array[4]),
-                           urn=Address(Web3.toHex(array[5])[-40:]),
+                           urn=Address.from_bytes(array[5][-20:]),
                            gal=Address(array[6]),
                            tab=Wad(array[7]))
 
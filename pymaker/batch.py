@@ -0,0 +1,232 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3, HTTPProvider
+from web3.middleware import combine_middlewares
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(endpoint_uri: str) -> requests.Session:
+    with _sessions_lock:
+        if endpoint_uri not in _sessions:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[endpoint_uri] = session
+
+        return _sessions[endpoint_uri]
+
+
+def make_batch_request(provider: HTTPProvider, batch: list) -> list:
+    """Sends a list of JSON-RPC requests to the node as one batch request.
+
+    The requests are sent over a keep-alive session, which is pooled per endpoint.
+
+    Args:
+        provider: The `HTTPProvider` the requests should be sent to.
+        batch: List of `(method, params)` tuples. Parameters need to be already
+            formatted the way the node expects them.
+
+    Returns:
+        List of raw JSON-RPC responses (dictionaries with either `result` or `error`),
+        in the same order as the requests.
+    """
+    assert(isinstance(provider, HTTPProvider))
+    assert(isinstance(batch, list))
+
+    if len(batch) == 0:
+        return []
+
+    request = [{'jsonrpc': '2.0', 'method': method, 'params': params, 'id': i}
+               for i, (method, params) in enumerate(batch)]
+
+    request_kwargs = {'timeout': 10, **provider.get_request_kwargs()}
+    response = _get_session(provider.endpoint_uri).post(provider.endpoint_uri, data=json.dumps(request), **request_kwargs)
+    response.raise_for_status()
+
+    response_json = response.json()
+    if not isinstance(response_json, list) or len(response_json) != len(batch):
+        raise Exception(f"Invalid response to the JSON-RPC batch of {len(batch)} requests: {response_json}")
+
+    responses = {item['id']: item for item in response_json}
+    return [responses[i] for i in range(len(batch))]
+
+
+class _RequestCaptured(Exception):
+    def __init__(self, method, params):
+        self.method = method
+        self.params = params
+
+
+class Batch:
+    """Collects JSON-RPC requests so they can be sent to the node in one round trip.
+
+    Each request immediately returns a `concurrent.futures.Future`, which gets resolved once the whole
+    batch gets executed, either explicitly with `execute()` or at the end of the `batch(web3)` block.
+    Requests and results go through the web3.py middlewares, so the results are exactly
+    what the corresponding `web3.eth` methods would return.
+
+    Only read-only requests should be batched, as middlewares which issue requests
+    of their own (like the transaction signing one) will not work as expected.
+
+    If the node is not accessed over HTTP, requests get sent one by one instead.
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, web3: Web3):
+        assert(isinstance(web3, Web3))
+
+        self.web3 = web3
+        self._requests = []
+
+    def request(self, method: str, params: list) -> Future:
+        """Adds a JSON-RPC request to the batch.
+
+        Args:
+            method: Name of the JSON-RPC method, i.e. `eth_getTransactionReceipt`.
+            params: Parameters of the JSON-RPC method.
+
+        Returns:
+            A future result of the request.
+        """
+        assert(isinstance(method, str))
+        assert(isinstance(params, list))
+
+        future = Future()
+        self._requests.append((method, params, future))
+        return future
+
+    def get_block(self, block_identifier, full_transactions: bool = False) -> Future:
+        if isinstance(block_identifier, (bytes, bytearray)) or \
+                (isinstance(block_identifier, str) and len(block_identifier) == 66):
+            return self.request('eth_getBlockByHash', [block_identifier, full_transactions])
+        else:
+            return self.request('eth_getBlockByNumber', [block_identifier, full_transactions])
+
+    def get_block_number(self) -> Future:
+        return self.request('eth_blockNumber', [])
+
+    def get_syncing(self) -> Future:
+        return self.request('eth_syncing', [])
+
+    def get_transaction_count(self, address: str, block_identifier='latest') -> Future:
+        return self.request('eth_getTransactionCount', [address, block_identifier])
+
+    def get_transaction_receipt(self, transaction_hash) -> Future:
+        return self.request('eth_getTransactionReceipt', [transaction_hash])
+
+    def call(self, transaction: dict, block_identifier='latest') -> Future:
+        return self.request('eth_call', [transaction, block_identifier])
+
+    def execute(self):
+        """Sends all the requests added so far and resolves their futures."""
+        batch, self._requests = self._requests, []
+        if len(batch) == 0:
+            return
+
+        provider = self.web3.providers[0]
+        if not isinstance(provider, HTTPProvider):
+            for method, params, future in batch:
+                try:
+                    future.set_result(self.web3.manager.request_blocking(method, params))
+                except Exception as exception:
+                    future.set_exception(exception)
+            return
+
+        self.logger.debug(f"Sending a batch of {len(batch)} JSON-RPC requests")
+
+        # Requests get passed through the middlewares twice. First time to format the parameters
+        # before sending them to the node, second time to format the responses received.
+        middlewares = list(self.web3.manager.middleware_stack)
+
+        def capture_request(method, params):
+            raise _RequestCaptured(method, params)
+
+        def format_request(method, params):
+            try:
+                combine_middlewares(middlewares, self.web3, capture_request)(method, params)
+            except _RequestCaptured as captured:
+                return captured.method, captured.params
+
+            raise Exception(f"Request {method} has been handled by middlewares, can not be batched")
+
+        try:
+            responses = iter(make_batch_request(provider, [format_request(method, params)
+                                                           for method, params, _ in batch]))
+        except Exception as exception:
+            for _, _, future in batch:
+                future.set_exception(exception)
+            raise
+
+        format_response = combine_middlewares(middlewares, self.web3, lambda method, params: next(responses))
+        for method, params, future in batch:
+            try:
+                response = format_response(method, params)
+                if 'error' in response:
+                    future.set_exception(ValueError(response['error']))
+                else:
+                    future.set_result(response['result'])
+            except Exception as exception:
+                future.set_exception(exception)
+
+    def cancel(self):
+        """Cancels all the requests added so far."""
+        batch, self._requests = self._requests, []
+        for _, _, future in batch:
+            future.cancel()
+
+    def __len__(self):
+        return len(self._requests)
+
+
+@contextmanager
+def batch(web3: Web3):
+    """Sends all the JSON-RPC requests made inside the `with` block as one batch request.
+
+    Usage example:
+
+        with batch(web3) as b:
+            receipt = b.get_transaction_receipt(tx_hash)
+            block_number = b.get_block_number()
+
+        receipt.result(), block_number.result()
+
+    If the `with` block raises an exception, no requests get sent and all the futures get cancelled.
+    """
+    b = Batch(web3)
+    try:
+        yield b
+    except:
+        b.cancel()
+        raise
+    else:
+        b.execute()
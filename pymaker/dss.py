@@ -14,7 +14,9 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import json
 import logging
+import os
 from pprint import pformat
 from typing import Optional, List
 
@@ -25,7 +27,7 @@ from web3.utils.events import get_event_data
 from pymaker import Address, Contract, Transact
 from pymaker.auctions import Flapper, Flipper, Flopper
 from pymaker.token import DSToken
-from pymaker.numeric import Wad, Ray, Rad
+from pymaker.numeric import Wad, Ray, Rad, RadArray, WadArray
 
 
 class Ilk:
@@ -106,7 +108,7 @@ class Urn:
     def fromBytes(urn: bytes):
         assert isinstance(urn, bytes)
 
-        address = Address(Web3.toHex(urn[-20:]))
+        address = Address.from_bytes(urn[-20:])
         return Urn(address)
 
     def __eq__(self, other):
@@ -736,7 +738,7 @@ class Pit(Contract):
     def global_line(self) -> Wad:
         return Wad(self._contract.call().Line())
 
-    def past_frob(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogFrob]:
+    def past_frob(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogFrob]:
         """Synchronously retrieve past LogFrob events.
 
         `LogFrob` events are emitted every time someone frob a CDP.
@@ -744,14 +746,17 @@ class Pit(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogFrob` events represented as :py:class:`pymake.dss.LogFrob` class.
         """
         assert isinstance(number_of_past_blocks, int)
         assert isinstance(event_filter, dict) or (event_filter is None)
+        assert isinstance(stream, bool)
 
-        return self._past_events(self._contract, 'Frob', LogFrob, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'Frob', LogFrob, number_of_past_blocks, event_filter, stream)
 
     def __repr__(self):
         return f"Pit('{self.address}')"
@@ -877,7 +882,7 @@ class Cat(Contract):
     def vat(self) -> Address:
         return Address(self._contract.call().vat())
 
-    def past_bite(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogBite]:
+    def past_bite(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogBite]:
         """Synchronously retrieve past LogBite events.
 
         `LogBite` events are emitted every time someone bite a CDP.
@@ -885,14 +890,169 @@ class Cat(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogBite` events represented as :py:class:`pymake.dss.LogBite` class.
         """
         assert isinstance(number_of_past_blocks, int)
         assert isinstance(event_filter, dict) or (event_filter is None)
+        assert isinstance(stream, bool)
 
-        return self._past_events(self._contract, 'Bite', LogBite, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'Bite', LogBite, number_of_past_blocks, event_filter, stream)
 
     def __repr__(self):
         return f"Cat('{self.address}')"
+
+
+class UrnIndex:
+    """In-memory index of all urns, built from `Frob` and `Bite` events.
+
+    The first `update()` bootstraps the index from the whole `Frob` (`Pit`) and `Bite` (`Cat`) history,
+    every subsequent one only applies events from blocks which have been mined since the previous update,
+    so it is meant to be called on every new block, i.e. from `Lifecycle.on_block()`.
+
+    If `checkpoint_file` is specified, the index gets saved to it after every update and loaded
+    from it on startup, so after a restart only the events mined since the last checkpoint get fetched.
+
+    Notes:
+        Only changes made through the `Pit` and the `Cat` are tracked. Chain reorganizations are not handled,
+        so it's better to keep the index a few blocks behind the latest block.
+
+    Attributes:
+        pit: The `Pit` to read `Frob` events from.
+        cat: The `Cat` to read `Bite` events from.
+        from_block: Block to start reading the events from when bootstrapping the index.
+        checkpoint_file: Optional path of the file to persist the index in.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, pit: Pit, cat: Cat, from_block: int = 0, checkpoint_file: Optional[str] = None):
+        assert isinstance(pit, Pit)
+        assert isinstance(cat, Cat)
+        assert isinstance(from_block, int)
+        assert isinstance(checkpoint_file, str) or (checkpoint_file is None)
+
+        self.pit = pit
+        self.cat = cat
+        self.from_block = from_block
+        self.checkpoint_file = checkpoint_file
+        self.last_block_number = None
+        self._urns = {}
+
+        if self.checkpoint_file is not None and os.path.isfile(self.checkpoint_file):
+            self._load_checkpoint()
+
+    def update(self, block_number: Optional[int] = None) -> int:
+        """Applies all `Frob` and `Bite` events mined up to the given block.
+
+        Args:
+            block_number: Block to update the index to. If not specified, the latest block is used.
+
+        Returns:
+            Number of events applied.
+        """
+        assert isinstance(block_number, int) or (block_number is None)
+
+        if block_number is None:
+            block_number = self.pit.web3.eth.blockNumber
+
+        from_block = self.from_block if self.last_block_number is None else self.last_block_number + 1
+        if from_block > block_number:
+            return 0
+
+        events = self._events(self.pit, 'Frob', LogFrob, from_block, block_number) + \
+                 self._events(self.cat, 'Bite', LogBite, from_block, block_number)
+        events.sort(key=lambda event: (event.raw['blockNumber'], event.raw['logIndex']))
+
+        for event in events:
+            self.apply(event)
+
+        self.last_block_number = block_number
+        self.logger.debug(f"Applied {len(events)} events to the urn index, now at block #{block_number}")
+
+        if self.checkpoint_file is not None:
+            self._save_checkpoint()
+
+        return len(events)
+
+    def apply(self, event):
+        """Applies a single `LogFrob` or `LogBite` event to the index."""
+        assert isinstance(event, (LogFrob, LogBite))
+
+        key = (event.ilk.name, event.urn.address.address)
+        if isinstance(event, LogFrob):
+            ink, art = event.ink, event.art
+        else:
+            ink, art = self._urns.get(key, (Wad(0), Wad(0)))
+            ink, art = Wad.max(ink - event.ink, Wad(0)), Wad.max(art - event.art, Wad(0))
+
+        if ink == Wad(0) and art == Wad(0):
+            self._urns.pop(key, None)
+        else:
+            self._urns[key] = (ink, art)
+
+    def urns(self, ilk: Ilk) -> List[Urn]:
+        """Returns all non-empty urns of the given collateral type."""
+        assert isinstance(ilk, Ilk)
+
+        return [Urn(Address(address), Ilk(ilk.name), ink, art)
+                for (name, address), (ink, art) in sorted(self._urns.items()) if name == ilk.name]
+
+    def unsafe_urns(self, ilk: Ilk, spot: Ray, rate: Ray) -> List[Urn]:
+        """Returns all urns of the given collateral type which can be bitten.
+
+        An urn is unsafe if `ink * spot < art * rate`, which is evaluated for all urns
+        in one pass over arrays of their `ink` and `art`.
+
+        Args:
+            ilk: The collateral type.
+            spot: The collateral price with the safety margin, i.e. `Pit.spot(ilk)`.
+            rate: The accumulated debt rate, i.e. `Vat.ilk(name).rate`.
+        """
+        assert isinstance(ilk, Ilk)
+        assert isinstance(spot, Ray)
+        assert isinstance(rate, Ray)
+
+        urns = self.urns(ilk)
+        collateral = RadArray(WadArray.from_list([urn.ink for urn in urns])) * spot
+        debt = RadArray(WadArray.from_list([urn.art for urn in urns])) * rate
+
+        return [urn for urn, unsafe in zip(urns, collateral.lt(debt)) if unsafe]
+
+    def __len__(self):
+        return len(self._urns)
+
+    @staticmethod
+    def _events(contract: Contract, event: str, cls, from_block: int, to_block: int) -> list:
+        return list(contract._events_in_range(contract._contract, event, cls, from_block, to_block, None))
+
+    def _load_checkpoint(self):
+        with open(self.checkpoint_file, 'r') as file:
+            checkpoint = json.load(file)
+
+        if checkpoint['pit'] != self.pit.address.address or checkpoint['cat'] != self.cat.address.address:
+            self.logger.warning(f"Ignoring urn index checkpoint '{self.checkpoint_file}' as it is for different contracts")
+            return
+
+        self.last_block_number = checkpoint['block_number']
+        self._urns = {(name, address): (Wad(ink), Wad(art)) for name, address, ink, art in checkpoint['urns']}
+        self.logger.info(f"Loaded {len(self._urns)} urns from the urn index checkpoint at block #{self.last_block_number}")
+
+    def _save_checkpoint(self):
+        checkpoint = {'pit': self.pit.address.address,
+                      'cat': self.cat.address.address,
+                      'block_number': self.last_block_number,
+                      'urns': [[name, address, ink.value, art.value]
+                               for (name, address), (ink, art) in sorted(self._urns.items())]}
+
+        # write to a temporary file first, so a crash can not leave a corrupted checkpoint behind
+        with open(f"{self.checkpoint_file}.tmp", 'w') as file:
+            json.dump(checkpoint, file)
+
+        os.replace(f"{self.checkpoint_file}.tmp", self.checkpoint_file)
+
+    def __repr__(self):
+        return f"UrnIndex({self.pit}, {self.cat})"
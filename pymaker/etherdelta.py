@@ -28,7 +28,7 @@ from web3 import Web3
 
 from pymaker import Contract, Address, Transact
 from pymaker.numeric import Wad
-from pymaker.sign import eth_sign, to_vrs
+from pymaker.sign import sign_many, to_vrs
 from pymaker.tightly_packed import encode_address, encode_uint256
 from pymaker.token import ERC20Token
 from pymaker.util import bytes_to_hexstring, hexstring_to_bytes
@@ -276,7 +276,7 @@ class EtherDelta(Contract):
         """
         return Wad(self._contract.call().feeRebate())
 
-    def past_trade(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogTrade]:
+    def past_trade(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogTrade]:
         """Synchronously retrieve past LogTrade events.
 
         `LogTrade` events are emitted by the EtherDelta contract every time someone takes an order.
@@ -284,14 +284,17 @@ class EtherDelta(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogTrade` events represented as :py:class:`pymaker.etherdelta.LogTrade` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'Trade', LogTrade, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'Trade', LogTrade, number_of_past_blocks, event_filter, stream)
 
     def deposit(self, amount: Wad) -> Transact:
         """Deposits `amount` of raw ETH to EtherDelta.
@@ -407,28 +410,59 @@ class EtherDelta(Contract):
             Newly created order as an instance of the :py:class:`pymaker.etherdelta.Order` class.
         """
 
-        assert(isinstance(pay_token, Address))
         assert(isinstance(pay_amount, Wad))
-        assert(isinstance(buy_token, Address))
         assert(isinstance(buy_amount, Wad))
+
+        return self.create_orders(pay_token, [pay_amount], buy_token, [buy_amount], expires)[0]
+
+    def create_orders(self,
+                      pay_token: Address,
+                      pay_amounts: List[Wad],
+                      buy_token: Address,
+                      buy_amounts: List[Wad],
+                      expires: int) -> List[Order]:
+        """Creates many new off-chain orders for the same token pair at once.
+
+        All the orders get signed together, see `pymaker.sign.sign_many()`.
+
+        Args:
+            pay_token: Address of the ERC20 token you want to put on sale.
+            pay_amounts: Amounts of the `pay_token` token you want to put on sale, one for each order.
+            buy_token: Address of the ERC20 token you want to be paid with.
+            buy_amounts:  Amounts of the `buy_token` you want to receive, one for each order.
+            expires: The block number after which the orders will expire.
+
+        Returns:
+            Newly created orders as instances of the :py:class:`pymaker.etherdelta.Order` class.
+        """
+
+        assert(isinstance(pay_token, Address))
+        assert(isinstance(pay_amounts, list))
+        assert(isinstance(buy_token, Address))
+        assert(isinstance(buy_amounts, list))
         assert(isinstance(expires, int) and (expires > 0))
-        assert(pay_amount > Wad(0))
-        assert(buy_amount > Wad(0))
-
-        nonce = self.random_nonce()
-        order_hash = hashlib.sha256(encode_address(self.address) +
-                                    encode_address(buy_token) +
-                                    encode_uint256(buy_amount.value) +
-                                    encode_address(pay_token) +
-                                    encode_uint256(pay_amount.value) +
-                                    encode_uint256(expires) +
-                                    encode_uint256(nonce)).digest()
-
-        signature = eth_sign(order_hash, self.web3)
-        v, r, s = to_vrs(signature)
-
-        return Order(self, Address(self.web3.eth.defaultAccount), pay_token, pay_amount, buy_token, buy_amount,
-                     expires, nonce, v, r, s)
+        assert(len(pay_amounts) == len(buy_amounts))
+        assert(all(isinstance(pay_amount, Wad) and pay_amount > Wad(0) for pay_amount in pay_amounts))
+        assert(all(isinstance(buy_amount, Wad) and buy_amount > Wad(0) for buy_amount in buy_amounts))
+
+        nonces = [self.random_nonce() for _ in pay_amounts]
+        order_hashes = [hashlib.sha256(encode_address(self.address) +
+                                       encode_address(buy_token) +
+                                       encode_uint256(buy_amount.value) +
+                                       encode_address(pay_token) +
+                                       encode_uint256(pay_amount.value) +
+                                       encode_uint256(expires) +
+                                       encode_uint256(nonce)).digest()
+                        for pay_amount, buy_amount, nonce in zip(pay_amounts, buy_amounts, nonces)]
+
+        maker = Address(self.web3.eth.defaultAccount)
+        orders = []
+        for pay_amount, buy_amount, nonce, signature in zip(pay_amounts, buy_amounts, nonces,
+                                                            sign_many(order_hashes, self.web3)):
+            v, r, s = to_vrs(signature)
+            orders.append(Order(self, maker, pay_token, pay_amount, buy_token, buy_amount, expires, nonce, v, r, s))
+
+        return orders
 
     def amount_available(self, order: Order) -> Wad:
         """Returns the amount that is still available (tradeable) for an order.
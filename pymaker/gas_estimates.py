@@ -0,0 +1,150 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+from typing import Optional, Tuple
+
+
+class GasEstimateCache:
+    """Caches gas estimates of repetitive transactions, so they do not need an `eth_estimateGas` call each time.
+
+    Estimates are keyed by the address of the contract called, the function selector and the shape
+    of the parameters (their types, and lengths of the ones of variable size), so for example all
+    `transfer` calls of one token share an estimate no matter what amount they transfer. As the gas
+    usage of such calls still varies a bit, the cache keeps the maximum of all the estimates and all
+    the actual gas usages observed for the key.
+
+    An estimate expires `ttl` seconds after it has been fetched from the node. The fresh estimate
+    fetched then never lowers the cached maximum though, which only gets dropped when a transaction
+    sent with it runs out of gas, in which case `Transact` sends the transaction again with a fresh estimate.
+
+    Please note that `eth_estimateGas` also tells `Transact` in advance that a transaction would fail,
+    so transactions sent with a cached estimate will fail on chain rather than not get sent at all.
+
+    The cache can be shared by many transactions, threads and event loops. It gets used
+    by passing it in the `gas_estimate_cache` keyword argument of `Transact.transact()`.
+
+    Attributes:
+        ttl: Number of seconds after which estimates expire.
+        hits: Number of estimates served from the cache.
+        misses: Number of estimates which had to be fetched from the node.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, ttl: int = 600):
+        assert(isinstance(ttl, int))
+
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._estimates = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(transact) -> Optional[tuple]:
+        """Returns the key the estimate of a `Transact` is cached under.
+
+        Args:
+            transact: The `Transact` instance.
+
+        Returns:
+            A tuple of the contract address, the function selector and the shape of the parameters,
+            or `None` if the estimate does not need caching (i.e. for plain ETH transfers).
+        """
+        if transact.contract is None:
+            return None
+
+        extra = tuple(sorted(transact.extra.keys())) if transact.extra is not None else ()
+        if transact.function_name is None:
+            calldata = transact.parameters[0]
+            return transact.address, calldata[:10], ('bytes', len(calldata)), extra
+
+        return transact.address, transact._calldata()[:10], GasEstimateCache._shape(transact.parameters), extra
+
+    @staticmethod
+    def _shape(value):
+        if isinstance(value, (bytes, bytearray, str)):
+            return type(value).__name__, len(value)
+        elif isinstance(value, (list, tuple)):
+            return tuple(map(GasEstimateCache._shape, value))
+        else:
+            return type(value).__name__
+
+    def estimated_gas(self, transact, from_address) -> Tuple[int, bool]:
+        """Returns the gas estimate of a `Transact`, fetching it from the node only if it is not cached.
+
+        Args:
+            transact: The `Transact` instance.
+            from_address: Address to simulate sending the transaction from.
+
+        Returns:
+            A tuple of the estimate, and a flag which is `True` if the estimate comes from the cache.
+        """
+        key = self.key(transact)
+        if key is not None:
+            with self._lock:
+                entry = self._estimates.get(key)
+                if entry is not None and time.time() - entry[1] < self.ttl:
+                    self.hits += 1
+                    return entry[0], True
+
+                self.misses += 1
+
+        estimate = transact.estimated_gas(from_address)
+
+        if key is not None:
+            with self._lock:
+                entry = self._estimates.get(key)
+                if entry is not None:
+                    estimate = max(estimate, entry[0])
+
+                self._estimates[key] = (estimate, time.time())
+
+        return estimate, False
+
+    def observe(self, transact, gas_used: int):
+        """Raises the cached estimate of a `Transact` if the transaction has used more gas.
+
+        Args:
+            transact: The `Transact` instance.
+            gas_used: Amount of gas used by the transaction.
+        """
+        assert(isinstance(gas_used, int))
+
+        key = self.key(transact)
+        if key is not None:
+            with self._lock:
+                entry = self._estimates.get(key)
+                if entry is not None and gas_used > entry[0]:
+                    self._estimates[key] = (gas_used, entry[1])
+
+    def invalidate(self, transact):
+        """Drops the cached estimate of a `Transact`, so the next one gets fetched from the node.
+
+        Args:
+            transact: The `Transact` instance.
+        """
+        key = self.key(transact)
+        if key is not None:
+            with self._lock:
+                self._estimates.pop(key, None)
+
+    def __repr__(self):
+        return f"GasEstimateCache(ttl={self.ttl}, hits={self.hits}, misses={self.misses})"
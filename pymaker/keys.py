@@ -25,6 +25,7 @@ from web3.middleware import construct_sign_and_send_raw_middleware
 from pymaker import Address
 
 _registered_accounts = {}
+_chain_ids = {}
 
 
 def register_keys(web3: Web3, keys: Optional[list]):
@@ -67,3 +68,33 @@ def register_private_key(web3: Web3, private_key):
 
     _registered_accounts[(web3, Address(account.address))] = account
     web3.middleware_stack.add(construct_sign_and_send_raw_middleware(account))
+
+
+def local_account(web3: Web3, address: Address):
+    """Returns the account registered with `register_private_key()`, or `None` if there isn't one."""
+    assert(isinstance(web3, Web3))
+    assert(isinstance(address, Address))
+
+    return _registered_accounts.get((web3, address))
+
+
+def chain_id(web3: Web3) -> int:
+    """Returns the chain id transactions get signed with, fetched from the node only once.
+
+    The chain id is queried with `eth_chainId`. Only if the node does not support it, the network id
+    (`net_version`) is used instead, which is the same as the chain id on most, but not all, chains.
+    """
+    assert(isinstance(web3, Web3))
+
+    if web3 not in _chain_ids:
+        try:
+            result = web3.manager.request_blocking("eth_chainId", [])
+        except ValueError:
+            result = None
+
+        if result is not None:
+            _chain_ids[web3] = int(result, 16) if isinstance(result, str) else int(result)
+        else:
+            _chain_ids[web3] = int(web3.version.network)
+
+    return _chain_ids[web3]
@@ -25,6 +25,7 @@ import pytz
 from pymaker.sign import eth_sign
 from web3 import Web3
 
+from pymaker.batch import batch
 from pymaker import register_filter_thread, any_filter_thread_present, stop_all_filter_threads, all_filter_threads_alive
 from pymaker.util import AsyncCallback
 
@@ -256,10 +257,14 @@ class Lifecycle:
     def _start_watching_blocks(self):
         def new_block_callback(block_hash):
             self._last_block_time = datetime.datetime.now(tz=pytz.UTC)
-            block = self.web3.eth.getBlock(block_hash)
-            block_number = block['number']
-            if not self.web3.eth.syncing:
-                max_block_number = self.web3.eth.blockNumber
+            with batch(self.web3) as b:
+                block = b.get_block(block_hash)
+                syncing = b.get_syncing()
+                block_number_latest = b.get_block_number()
+
+            block_number = block.result()['number']
+            if not syncing.result():
+                max_block_number = block_number_latest.result()
                 if block_number == max_block_number:
                     def on_start():
                         self.logger.debug(f"Processing block #{block_number} ({block_hash})")
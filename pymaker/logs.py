@@ -0,0 +1,353 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+import requests
+from web3.utils.datastructures import AttributeDict
+from web3.utils.events import get_event_data
+from web3.utils.filters import construct_data_filter_regex, construct_event_filter_params
+
+
+class LogCache:
+    """Persistent on-disk store of historical logs, kept in an SQLite database.
+
+    Logs are stored per chain (identified by the hash of its genesis block), contract address,
+    event signature and event filter, together with the block ranges which have been fetched
+    for them already, so only the missing ranges ever need to be fetched from the node.
+
+    Logs from the most recent `reorg_depth` blocks are never stored, as they can still
+    change because of chain reorganizations.
+
+    Usage example:
+
+        Contract.log_fetcher = LogFetcher(cache=LogCache('~/.pymaker/logs.db'))
+
+    Attributes:
+        path: Path of the SQLite database file.
+        reorg_depth: Number of the most recent blocks which are not cached.
+    """
+
+    def __init__(self, path: str, reorg_depth: int = 12):
+        assert(isinstance(path, str))
+        assert(isinstance(reorg_depth, int))
+        assert(reorg_depth >= 0)
+
+        self.path = os.path.expanduser(path)
+        self.reorg_depth = reorg_depth
+        self._chains = {}
+        self._lock = threading.Lock()
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS ranges"
+                                     " (key TEXT, from_block INTEGER, to_block INTEGER)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS logs"
+                                     " (key TEXT, block_number INTEGER, log_index INTEGER, log BLOB,"
+                                     " PRIMARY KEY (key, block_number, log_index))")
+
+    def key(self, contract_event, argument_filters: Optional[dict]) -> str:
+        """Returns the key logs of the event matching `argument_filters` are stored under."""
+        web3 = contract_event.web3
+        if id(web3) not in self._chains:
+            self._chains[id(web3)] = web3.eth.getBlock(0)['hash'].hex()
+
+        event_abi = contract_event._get_event_abi()
+        signature = f"{event_abi['name']}({','.join(input['type'] for input in event_abi['inputs'])})"
+        event_filter = repr(sorted(argument_filters.items())) if argument_filters else ''
+
+        return f"{self._chains[id(web3)]}/{contract_event.address.lower()}/{signature}/{event_filter}"
+
+    def segments(self, key: str, from_block: int, to_block: int) -> list:
+        """Splits a block range into consecutive segments, which are either fully cached or not cached at all.
+
+        Returns:
+            List of `(from_block, to_block, cached)` tuples.
+        """
+        if from_block > to_block:
+            return []
+
+        with self._lock:
+            ranges = self._connection.execute("SELECT from_block, to_block FROM ranges"
+                                              " WHERE key = ? AND to_block >= ? AND from_block <= ?"
+                                              " ORDER BY from_block", (key, from_block, to_block)).fetchall()
+
+        result = []
+        for range_from, range_to in ranges:
+            if range_from > from_block:
+                result.append((from_block, range_from - 1, False))
+            result.append((max(range_from, from_block), min(range_to, to_block), True))
+            from_block = range_to + 1
+
+        if from_block <= to_block:
+            result.append((from_block, to_block, False))
+
+        return result
+
+    def logs(self, key: str, from_block: int, to_block: int) -> list:
+        """Returns cached logs from a block range, in the order they have been emitted in.
+
+        Logs are returned as `AttributeDict` instances, the same way `web3.py` event filters return them.
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT log FROM logs WHERE key = ? AND block_number BETWEEN ? AND ?"
+                                            " ORDER BY block_number, log_index", (key, from_block, to_block)).fetchall()
+
+        return [_to_attribute_dict(pickle.loads(row[0])) for row in rows]
+
+    def store(self, key: str, from_block: int, to_block: int, logs: list):
+        """Stores all logs from a block range and marks the range as cached."""
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?)",
+                                         [(key, log['blockNumber'], log['logIndex'], pickle.dumps(_to_dict(log)))
+                                          for log in logs])
+
+            # merge the new range with the ones overlapping or adjacent to it, so they do not fragment over time
+            ranges = self._connection.execute("SELECT from_block, to_block FROM ranges"
+                                              " WHERE key = ? AND to_block >= ? AND from_block <= ?",
+                                              (key, from_block - 1, to_block + 1)).fetchall()
+            from_block = min([from_block] + [range_from for range_from, _ in ranges])
+            to_block = max([to_block] + [range_to for _, range_to in ranges])
+
+            self._connection.execute("DELETE FROM ranges WHERE key = ? AND to_block >= ? AND from_block <= ?",
+                                     (key, from_block, to_block))
+            self._connection.execute("INSERT INTO ranges VALUES (?, ?, ?)", (key, from_block, to_block))
+
+    def invalidate(self, from_block: int):
+        """Removes all logs from `from_block` onwards, i.e. after a chain reorganization."""
+        assert(isinstance(from_block, int))
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM logs WHERE block_number >= ?", (from_block,))
+            self._connection.execute("DELETE FROM ranges WHERE from_block >= ?", (from_block,))
+            self._connection.execute("UPDATE ranges SET to_block = ? WHERE to_block >= ?", (from_block - 1, from_block))
+
+
+def _to_dict(value):
+    if isinstance(value, Mapping):
+        return {key: _to_dict(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [_to_dict(item) for item in value]
+    else:
+        return value
+
+
+def _to_attribute_dict(value):
+    if isinstance(value, Mapping):
+        return AttributeDict({key: _to_attribute_dict(item) for key, item in value.items()})
+    elif isinstance(value, list):
+        return [_to_attribute_dict(item) for item in value]
+    else:
+        return value
+
+
+class LogFetcher:
+    """Fetches historical logs of a contract event in block range windows.
+
+    Asking the node for logs from a large block range at once often times out, or gets rejected
+    because of too many results. So the range gets split into windows of `chunk_size` blocks,
+    up to `parallelism` of which are being fetched concurrently. Whenever the node rejects a window
+    because of too many results or a timeout, the window gets split in half and both halves get
+    fetched separately. The remaining windows of the same `fetch()` call are made smaller as well.
+    Any other error gets raised straight away.
+
+    Logs are yielded in the order they have been emitted in, as soon as all logs from preceding
+    windows have been yielded, so the whole result never has to fit in memory. Windows are queried
+    with `eth_getLogs`, so no filters get installed on the node.
+
+    If a `LogCache` is specified, logs get fetched from the node only for block ranges
+    which are not in the cache yet.
+
+    Attributes:
+        chunk_size: Maximum number of blocks fetched in one request.
+        parallelism: Maximum number of windows being fetched concurrently.
+        cache: Optional cache of historical logs.
+    """
+
+    logger = logging.getLogger()
+
+    # parts of the error messages nodes respond with when a window is too large for them
+    SPLIT_ERRORS = ["more than", "too many", "response size", "timeout", "timed out"]
+
+    def __init__(self, chunk_size: int = 10000, parallelism: int = 4, cache: Optional[LogCache] = None):
+        assert(isinstance(chunk_size, int))
+        assert(isinstance(parallelism, int))
+        assert(isinstance(cache, LogCache) or (cache is None))
+        assert(chunk_size > 0)
+        assert(parallelism > 0)
+
+        self.chunk_size = chunk_size
+        self.parallelism = parallelism
+        self.cache = cache
+
+    def fetch(self, contract_event, from_block: int, to_block: int, argument_filters: Optional[dict] = None) -> Iterator[dict]:
+        """Fetches logs of the event from a range of blocks.
+
+        Args:
+            contract_event: The `web3.py` contract event, i.e. `contract.events['LogMake']`.
+            from_block: First block of the range.
+            to_block: Last block of the range.
+            argument_filters: Filter which will be applied to returned logs.
+
+        Returns:
+            Generator of decoded logs, as returned by `web3.py` event filters.
+        """
+        assert(isinstance(from_block, int))
+        assert(isinstance(to_block, int))
+        assert(isinstance(argument_filters, dict) or (argument_filters is None))
+
+        event_abi = contract_event._get_event_abi()
+        data_filter_set, filter_params = construct_event_filter_params(event_abi,
+                                                                       contract_address=contract_event.address,
+                                                                       argument_filters=argument_filters)
+
+        # filters on arguments which are not indexed can not be expressed as topics,
+        # so `web3.py` matches them against the log data on the client side
+        data_filter = construct_data_filter_regex(data_filter_set) if any(data_filter_set) else None
+
+        def decode(logs: list) -> list:
+            return [get_event_data(event_abi, log) for log in logs
+                    if data_filter is None or data_filter.match(log['data'])]
+
+        web3 = contract_event.web3
+        window_size = _WindowSize(self.chunk_size)
+
+        if self.cache is None:
+            for _, _, logs in self._fetch_windows(web3, filter_params, decode, from_block, to_block, window_size):
+                yield from logs
+            return
+
+        key = self.cache.key(contract_event, argument_filters)
+        last_cacheable_block = web3.eth.blockNumber - self.cache.reorg_depth
+        self.cache.invalidate(last_cacheable_block + 1)
+
+        for segment_from, segment_to, cached in self.cache.segments(key, from_block, min(to_block, last_cacheable_block)):
+            if cached:
+                yield from self.cache.logs(key, segment_from, segment_to)
+            else:
+                for window_from, window_to, logs in self._fetch_windows(web3, filter_params, decode,
+                                                                        segment_from, segment_to, window_size):
+                    self.cache.store(key, window_from, window_to, logs)
+                    yield from logs
+
+        for _, _, logs in self._fetch_windows(web3, filter_params, decode, max(from_block, last_cacheable_block + 1),
+                                              to_block, window_size):
+            yield from logs
+
+    def fetch_raw(self, web3, address: str, topics: list, from_block: int, to_block: int) -> Iterator[dict]:
+        """Fetches raw, not decoded logs of a contract from a range of blocks.
+
+        Useful if logs of several different events are needed at once. These logs never get cached.
+
+        Args:
+            web3: An instance of `Web` from `web3.py`.
+            address: Address of the contract.
+            topics: Topic filter, in the format accepted by `eth_getLogs`.
+            from_block: First block of the range.
+            to_block: Last block of the range.
+
+        Returns:
+            Generator of raw logs, as returned by `eth_getLogs`.
+        """
+        assert(isinstance(address, str))
+        assert(isinstance(topics, list))
+        assert(isinstance(from_block, int))
+        assert(isinstance(to_block, int))
+
+        filter_params = {'address': address, 'topics': topics}
+        window_size = _WindowSize(self.chunk_size)
+
+        for _, _, logs in self._fetch_windows(web3, filter_params, list, from_block, to_block, window_size):
+            yield from logs
+
+    def _fetch_windows(self, web3, filter_params: dict, decode, from_block: int, to_block: int,
+                       window_size: '_WindowSize'):
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            pending = deque()
+            try:
+                for window_from, window_to in self._windows(from_block, to_block, window_size):
+                    pending.append((window_from, window_to, executor.submit(self._fetch_window, web3, filter_params,
+                                                                            decode, window_from, window_to,
+                                                                            window_size)))
+
+                    if len(pending) >= self.parallelism:
+                        window_from, window_to, future = pending.popleft()
+                        yield window_from, window_to, future.result()
+
+                while pending:
+                    window_from, window_to, future = pending.popleft()
+                    yield window_from, window_to, future.result()
+            finally:
+                for _, _, future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _windows(from_block: int, to_block: int, window_size: '_WindowSize'):
+        while from_block <= to_block:
+            window_to = min(from_block + window_size.size - 1, to_block)
+            yield from_block, window_to
+            from_block = window_to + 1
+
+    def _fetch_window(self, web3, filter_params: dict, decode, from_block: int, to_block: int,
+                      window_size: '_WindowSize') -> list:
+        try:
+            return decode(web3.eth.getLogs(dict(filter_params, fromBlock=from_block, toBlock=to_block)))
+        except Exception as e:
+            if from_block == to_block or not self._should_split(e):
+                raise
+
+            self.logger.debug(f"Failed to fetch logs from blocks #{from_block}-#{to_block} ({e}), splitting the range")
+
+            window_size.shrink((to_block - from_block + 1) // 2)
+
+            middle = (from_block + to_block) // 2
+            return self._fetch_window(web3, filter_params, decode, from_block, middle, window_size) + \
+                   self._fetch_window(web3, filter_params, decode, middle + 1, to_block, window_size)
+
+    @staticmethod
+    def _should_split(error: Exception) -> bool:
+        if isinstance(error, requests.exceptions.Timeout):
+            return True
+
+        # `web3.py` raises `ValueError` with the JSON-RPC error in it if the node has rejected the request
+        if isinstance(error, ValueError):
+            message = str(error).lower()
+            return any(text in message for text in LogFetcher.SPLIT_ERRORS)
+
+        return False
+
+
+class _WindowSize:
+    # Size of the windows of a single `LogFetcher.fetch()` call, shared by the threads fetching them.
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+
+    def shrink(self, size: int):
+        with self._lock:
+            self.size = max(min(self.size, size), 1)
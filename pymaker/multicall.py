@@ -0,0 +1,145 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+
+from eth_abi import decode_abi
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.utils.abi import get_abi_output_types, map_abi_data
+from web3.utils.normalizers import BASE_RETURN_NORMALIZERS
+
+from pymaker import Contract
+from pymaker.batch import batch
+
+
+class Multicall:
+    """Executes many contract view calls in one round trip to the Ethereum node.
+
+    Calls are collected using `add()`, possibly across many different contract clients
+    (`Tub`, `Vat`, `Flipper` etc.), and then executed together with `execute()` as a single
+    JSON-RPC batch request of `eth_call`s. Each result is decoded according to the contract ABI
+    and then passed to the optional `result_function`, so it can be converted into the same type
+    the contract client would return (i.e. `Wad`, `Ray` or `Address`).
+
+    If the node is not accessed over HTTP, calls get executed one by one instead.
+
+    Usage example:
+
+        multicall = Multicall(web3)
+        tab = multicall.add(tub, 'tab', [int_to_bytes32(1)], Wad)
+        per = multicall.add(tub, 'per', [], Ray)
+        results = multicall.execute()
+        results[tab], results[per]
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+        block_identifier: The block all calls should be executed at. All calls are executed
+            at the same block, so it's better to pass a block number than `'latest'` as the
+            latter can change during the execution if calls get split into many batches.
+        batch_size: Maximum number of calls sent in one JSON-RPC batch request.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, web3: Web3, block_identifier='latest', batch_size: int = 500):
+        assert(isinstance(web3, Web3))
+        assert(isinstance(block_identifier, (int, str)))
+        assert(isinstance(batch_size, int))
+        assert(batch_size > 0)
+
+        self.web3 = web3
+        self.block_identifier = block_identifier
+        self.batch_size = batch_size
+        self._calls = []
+
+    def add(self, contract: Contract, function_name: str, parameters: list, result_function=None) -> int:
+        """Adds a contract view call to be executed.
+
+        Args:
+            contract: The contract client, i.e. an instance of :py:class:`pymaker.sai.Tub`.
+            function_name: Name or signature of the contract function to call.
+            parameters: Parameters of the contract function.
+            result_function: Optional function converting the decoded result, i.e. `Wad`.
+                Results with multiple return values are passed as a list.
+
+        Returns:
+            Index of the result of this call in the list returned by `execute()`.
+        """
+        assert(isinstance(contract, Contract))
+        assert(isinstance(function_name, str))
+        assert(isinstance(parameters, list))
+        assert(callable(result_function) or (result_function is None))
+
+        if '(' in function_name:
+            function = contract._contract.get_function_by_signature(function_name)(*parameters)
+        else:
+            function = contract._contract.get_function_by_name(function_name)(*parameters)
+
+        self._calls.append((function, result_function))
+        return len(self._calls) - 1
+
+    def execute(self) -> list:
+        """Executes all calls added so far.
+
+        Raises an exception if any of the calls fails.
+
+        Returns:
+            A list of results, in the same order the calls have been added.
+        """
+        calls, self._calls = self._calls, []
+
+        results = []
+        for i in range(0, len(calls), self.batch_size):
+            batch = calls[i:i + self.batch_size]
+            self.logger.debug(f"Executing a batch of {len(batch)} calls")
+            return_data = self._eth_calls([self._call_transaction(function) for function, _ in batch])
+            results.extend(self._decode(function, result_function, data)
+                           for (function, result_function), data in zip(batch, return_data))
+
+        return results
+
+    def __len__(self):
+        return len(self._calls)
+
+    @staticmethod
+    def _call_transaction(function) -> dict:
+        return {'to': function.address, 'data': function._encode_transaction_data()}
+
+    @staticmethod
+    def _decode(function, result_function, data: bytes):
+        output_types = get_abi_output_types(function.abi)
+        output_data = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decode_abi(output_types, data))
+        result = output_data[0] if len(output_data) == 1 else output_data
+
+        return result_function(result) if result_function is not None else result
+
+    def _eth_calls(self, transactions: list) -> list:
+        with batch(self.web3) as b:
+            futures = [b.call(transaction, self.block_identifier) for transaction in transactions]
+
+        result = []
+        for transaction, future in zip(transactions, futures):
+            try:
+                result.append(bytes(HexBytes(future.result())))
+            except ValueError as error:
+                raise Exception(f"Call to {transaction['to']} failed: {error}")
+
+        return result
+
+    def __repr__(self):
+        return f"Multicall({len(self._calls)} calls)"
@@ -0,0 +1,166 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+from typing import Optional
+
+from web3 import Web3
+
+
+class NonceManager:
+    """Keeps track of the next nonce of an Ethereum account locally.
+
+    The next nonce gets fetched from the node only when it is needed for the first time (using
+    `parity_nextNonce` on Parity, or the transaction count of the `pending` block otherwise).
+    After that, nonces are handed out locally, so many transactions can be signed and sent
+    back to back without a round trip to the node for each of them.
+
+    Whenever a transaction fails to be sent, the nonce it has reserved might leave a gap
+    or the node might have received transactions from somewhere else, so the manager
+    resynchronizes with the node before handing out the next nonce.
+
+    There is one manager per `Web3` instance and account, see `for_account()`. Nonces are
+    handed out under a short-lived `threading.Lock`, so one manager can be safely used from
+    many threads and event loops at the same time.
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+        account: Address of the account to keep track of the nonce of.
+    """
+
+    logger = logging.getLogger()
+
+    # parts of the error messages nodes respond with when they reject a transaction because of its nonce
+    NONCE_ERRORS = ["nonce too low", "nonce is too low", "correct nonce", "known transaction", "already known",
+                    "already imported", "replacement transaction underpriced"]
+
+    _managers = {}
+    _managers_lock = threading.Lock()
+
+    def __init__(self, web3: Web3, account: str):
+        assert(isinstance(web3, Web3))
+        assert(isinstance(account, str))
+
+        self.web3 = web3
+        self.account = account
+        self._next_nonce = None
+        self._is_parity = None
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+    @staticmethod
+    def for_account(web3: Web3, account: str) -> 'NonceManager':
+        """Returns the manager shared by all transactions sent from `account` through `web3`.
+
+        Args:
+            web3: An instance of `Web` from `web3.py`.
+            account: Address of the account, as a string.
+
+        Returns:
+            The `NonceManager` of the account.
+        """
+        assert(isinstance(web3, Web3))
+        assert(isinstance(account, str))
+
+        # the manager keeps a reference to `web3`, so its `id()` can not get reused
+        key = (id(web3), account.lower())
+        with NonceManager._managers_lock:
+            if key not in NonceManager._managers:
+                NonceManager._managers[key] = NonceManager(web3, account)
+
+            return NonceManager._managers[key]
+
+    def reserve(self) -> int:
+        """Reserves the next nonce of the account.
+
+        Returns:
+            The nonce the next transaction should be sent with.
+        """
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self._node_next_nonce()
+                self.logger.debug(f"Synchronized next nonce of {self.account} with the node, it is {self._next_nonce}")
+
+            nonce = self._next_nonce
+            self._next_nonce += 1
+
+            return nonce
+
+    def reserve_and_send(self, send_function):
+        """Reserves the next nonce of the account and sends a transaction with it straight away.
+
+        Reserving and sending happen under a lock, so transactions sent through this method reach
+        the node in the order of their nonces even if they are sent from many threads at once.
+
+        Args:
+            send_function: Function taking the nonce as its only argument, which sends the transaction.
+
+        Returns:
+            A tuple of the nonce and the value returned by `send_function`.
+        """
+        assert(callable(send_function))
+
+        with self._send_lock:
+            nonce = self.reserve()
+            return nonce, send_function(nonce)
+
+    def resync(self):
+        """Makes the next `reserve()` call fetch the next nonce from the node again.
+
+        Should be called every time a transaction with a reserved nonce has failed to be sent.
+        """
+        with self._lock:
+            self._next_nonce = None
+
+    @staticmethod
+    def is_nonce_error(error: Exception) -> bool:
+        """Tells whether the node has rejected a transaction because of its nonce.
+
+        Only in this case the transaction has certainly not been accepted, so it is safe to send it
+        again with a fresh nonce. Any other error (i.e. a timeout) can happen after the node has
+        accepted the transaction already.
+
+        Args:
+            error: The exception raised while sending the transaction.
+
+        Returns:
+            `True` if the error says the nonce has been used already, `False` otherwise.
+        """
+        # `web3.py` raises `ValueError` with the JSON-RPC error in it if the node has rejected the request
+        if not isinstance(error, ValueError):
+            return False
+
+        message = str(error).lower()
+        return any(text in message for text in NonceManager.NONCE_ERRORS)
+
+    @property
+    def next_nonce(self) -> Optional[int]:
+        """The nonce which will be reserved next, or `None` if it has to be fetched from the node first."""
+        return self._next_nonce
+
+    def _node_next_nonce(self) -> int:
+        if self._is_parity is None:
+            self._is_parity = "parity" in self.web3.version.node.lower()
+
+        if self._is_parity:
+            return int(self.web3.manager.request_blocking("parity_nextNonce", [self.account]), 16)
+        else:
+            return self.web3.eth.getTransactionCount(self.account, block_identifier='pending')
+
+    def __repr__(self):
+        return f"NonceManager('{self.account}')"
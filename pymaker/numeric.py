@@ -23,6 +23,18 @@ from decimal import *
 _context = Context(prec=1000, rounding=ROUND_DOWN)
 
 
+def _div(x: int, y: int) -> int:
+    """Divides two integers, rounding the result towards zero.
+
+    This is what the Maker contracts do for non-negative values (`x / y` on `uint`s). Negative values
+    get truncated as well, which keeps the semantics of the `ROUND_DOWN` decimal context used before.
+    """
+    if (x < 0) == (y < 0):
+        return x // y
+    else:
+        return -(-x // y)
+
+
 @total_ordering
 class Wad:
     """Represents a number with 18 decimal places.
@@ -36,8 +48,11 @@ class Wad:
     Notes:
         The internal representation of `Wad` is an unbounded integer, the last 18 digits of it being treated
         as decimal places. It is similar to the representation used in Maker contracts (`uint128`).
+        Instances use `__slots__` and should be treated as immutable.
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         """Creates a new Wad number.
 
@@ -49,9 +64,9 @@ class Wad:
         if isinstance(value, Wad):
             self.value = value.value
         elif isinstance(value, Ray):
-            self.value = int((Decimal(value.value) // (Decimal(10)**Decimal(9))).quantize(1, context=_context))
+            self.value = _div(value.value, 10**9)
         elif isinstance(value, Rad):
-            self.value = int((Decimal(value.value) // (Decimal(10)**Decimal(27))).quantize(1, context=_context))
+            self.value = _div(value.value, 10**27)
         elif isinstance(value, int):
             # assert(value >= 0)
             self.value = value
@@ -87,22 +102,19 @@ class Wad:
     # z = cast((uint256(x) * y + WAD / 2) / WAD);
     def __mul__(self, other):
         if isinstance(other, Wad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(18))
-            return Wad(int(result.quantize(1, context=_context)))
+            return Wad(_div(self.value * other.value, 10**18))
         elif isinstance(other, Ray):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(27))
-            return Wad(int(result.quantize(1, context=_context)))
+            return Wad(_div(self.value * other.value, 10**27))
         elif isinstance(other, Rad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(45))
-            return Wad(int(result.quantize(1, context=_context)))
+            return Wad(_div(self.value * other.value, 10**45))
         elif isinstance(other, int):
-            return Wad(int((Decimal(self.value) * Decimal(other)).quantize(1, context=_context)))
+            return Wad(self.value * other)
         else:
             raise ArithmeticError
 
     def __truediv__(self, other):
         if isinstance(other, Wad):
-            return Wad(int((Decimal(self.value) * (Decimal(10) ** Decimal(18)) / Decimal(other.value)).quantize(1, context=_context)))
+            return Wad(_div(self.value * 10**18, other.value))
         else:
             raise ArithmeticError
 
@@ -157,8 +169,11 @@ class Ray:
     Notes:
         The internal representation of `Ray` is an unbounded integer, the last 27 digits of it being treated
         as decimal places. It is similar to the representation used in Maker contracts (`uint128`).
+        Instances use `__slots__` and should be treated as immutable.
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         """Creates a new Ray number.
 
@@ -170,9 +185,9 @@ class Ray:
         if isinstance(value, Ray):
             self.value = value.value
         elif isinstance(value, Wad):
-            self.value = int((Decimal(value.value) * (Decimal(10)**Decimal(9))).quantize(1, context=_context))
+            self.value = value.value * 10**9
         elif isinstance(value, Rad):
-            self.value = int((Decimal(value.value) / (Decimal(10)**Decimal(18))).quantize(1, context=_context))
+            self.value = _div(value.value, 10**18)
         elif isinstance(value, int):
             # assert(value >= 0)
             self.value = value
@@ -207,22 +222,19 @@ class Ray:
 
     def __mul__(self, other):
         if isinstance(other, Ray):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(27))
-            return Ray(int(result.quantize(1, context=_context)))
+            return Ray(_div(self.value * other.value, 10**27))
         elif isinstance(other, Wad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(18))
-            return Ray(int(result.quantize(1, context=_context)))
+            return Ray(_div(self.value * other.value, 10**18))
         elif isinstance(other, Rad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(45))
-            return Ray(int(result.quantize(1, context=_context)))
+            return Ray(_div(self.value * other.value, 10**45))
         elif isinstance(other, int):
-            return Ray(int((Decimal(self.value) * Decimal(other)).quantize(1, context=_context)))
+            return Ray(self.value * other)
         else:
             raise ArithmeticError
 
     def __truediv__(self, other):
         if isinstance(other, Ray):
-            return Ray(int((Decimal(self.value) * (Decimal(10) ** Decimal(27)) / Decimal(other.value)).quantize(1, context=_context)))
+            return Ray(_div(self.value * 10**27, other.value))
         else:
             raise ArithmeticError
 
@@ -276,9 +288,11 @@ class Rad:
 
     Notes:
         The internal representation of `Rad` is an unbounded integer, the last 45 digits of it being treated
-        as decimal places.
+        as decimal places. Instances use `__slots__` and should be treated as immutable.
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         """Creates a new Rad number.
 
@@ -290,9 +304,9 @@ class Rad:
         if isinstance(value, Rad):
             self.value = value.value
         elif isinstance(value, Ray):
-            self.value = int((Decimal(value.value) * (Decimal(10)**Decimal(18))).quantize(1, context=_context))
+            self.value = value.value * 10**18
         elif isinstance(value, Wad):
-            self.value = int((Decimal(value.value) * (Decimal(10)**Decimal(27))).quantize(1, context=_context))
+            self.value = value.value * 10**27
         elif isinstance(value, int):
             # assert(value >= 0)
             self.value = value
@@ -327,22 +341,19 @@ class Rad:
 
     def __mul__(self, other):
         if isinstance(other, Rad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(45))
-            return Rad(int(result.quantize(1, context=_context)))
+            return Rad(_div(self.value * other.value, 10**45))
         elif isinstance(other, Ray):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(27))
-            return Rad(int(result.quantize(1, context=_context)))
+            return Rad(_div(self.value * other.value, 10**27))
         elif isinstance(other, Wad):
-            result = Decimal(self.value) * Decimal(other.value) / (Decimal(10) ** Decimal(18))
-            return Rad(int(result.quantize(1, context=_context)))
+            return Rad(_div(self.value * other.value, 10**18))
         elif isinstance(other, int):
-            return Rad(int((Decimal(self.value) * Decimal(other)).quantize(1, context=_context)))
+            return Rad(self.value * other)
         else:
             raise ArithmeticError
 
     def __truediv__(self, other):
         if isinstance(other, Rad):
-            return Rad(int((Decimal(self.value) * (Decimal(10) ** Decimal(45)) / Decimal(other.value)).quantize(1, context=_context)))
+            return Rad(_div(self.value * 10**45, other.value))
         else:
             raise ArithmeticError
 
@@ -382,3 +393,190 @@ class Rad:
     def max(*args):
         """Returns the higher of the Rad values"""
         return reduce(lambda x, y: x if x > y else y, args[1:], args[0])
+
+
+class _FixedPointArray:
+    """Base class for arrays of fixed-point numbers, see `WadArray`, `RayArray` and `RadArray`.
+
+    The numbers are kept as a plain list of integers (the same internal representation `Wad`, `Ray`
+    and `Rad` use), so elementwise operations do not have to create an object for every element.
+    """
+
+    __slots__ = ('values',)
+
+    unit = None
+    decimals = None
+
+    def __init__(self, values):
+        if isinstance(values, _FixedPointArray):
+            if values.decimals > self.decimals:
+                self.values = [_div(value, 10**(values.decimals - self.decimals)) for value in values.values]
+            else:
+                self.values = [value * 10**(self.decimals - values.decimals) for value in values.values]
+        else:
+            self.values = list(values)
+            if not all(isinstance(value, int) for value in self.values):
+                raise ArithmeticError
+
+    @classmethod
+    def from_list(cls, items: list):
+        """Creates a new array from a list of `unit` (i.e. `Wad` for `WadArray`) numbers."""
+        if not all(isinstance(item, cls.unit) for item in items):
+            raise ArithmeticError
+
+        return cls([item.value for item in items])
+
+    def to_list(self) -> list:
+        """Returns the elements of this array as a list of `unit` (i.e. `Wad` for `WadArray`) numbers."""
+        return [self.unit(value) for value in self.values]
+
+    def _operand(self, other, scalar_types: tuple, array_types: tuple):
+        if isinstance(other, array_types):
+            if len(other.values) != len(self.values):
+                raise ArithmeticError("Arrays have different lengths")
+            return other.values, other.decimals
+        elif isinstance(other, scalar_types):
+            return [other.value] * len(self.values), _DECIMALS[type(other)]
+        else:
+            raise ArithmeticError
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return type(self)(self.values[index])
+        else:
+            return self.unit(self.values[index])
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.values})"
+
+    def __str__(self):
+        return "[" + ", ".join(map(str, self.to_list())) + "]"
+
+    def __eq__(self, other):
+        if isinstance(other, type(self)):
+            return self.values == other.values
+        else:
+            raise ArithmeticError
+
+    __hash__ = None
+
+    def __add__(self, other):
+        values, _ = self._operand(other, (self.unit,), (type(self),))
+        return type(self)([x + y for x, y in zip(self.values, values)])
+
+    def __sub__(self, other):
+        values, _ = self._operand(other, (self.unit,), (type(self),))
+        return type(self)([x - y for x, y in zip(self.values, values)])
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return type(self)([x * other for x in self.values])
+
+        values, decimals = self._operand(other, (Wad, Ray, Rad), _FixedPointArray)
+        divisor = 10**decimals
+        return type(self)([_div(x * y, divisor) for x, y in zip(self.values, values)])
+
+    def __truediv__(self, other):
+        values, _ = self._operand(other, (self.unit,), (type(self),))
+        multiplier = 10**self.decimals
+        return type(self)([_div(x * multiplier, y) for x, y in zip(self.values, values)])
+
+    def __abs__(self):
+        return type(self)([abs(x) for x in self.values])
+
+    def _compare(self, other, comparison) -> list:
+        values, _ = self._operand(other, (self.unit,), (type(self),))
+        return [comparison(x, y) for x, y in zip(self.values, values)]
+
+    def lt(self, other) -> list:
+        """Elementwise `<`. Returns a list of booleans."""
+        return self._compare(other, int.__lt__)
+
+    def le(self, other) -> list:
+        """Elementwise `<=`. Returns a list of booleans."""
+        return self._compare(other, int.__le__)
+
+    def gt(self, other) -> list:
+        """Elementwise `>`. Returns a list of booleans."""
+        return self._compare(other, int.__gt__)
+
+    def ge(self, other) -> list:
+        """Elementwise `>=`. Returns a list of booleans."""
+        return self._compare(other, int.__ge__)
+
+    def select(self, mask: list):
+        """Returns a new array containing only the elements for which `mask` is `True`."""
+        return type(self)([value for value, selected in zip(self.values, mask) if selected])
+
+    def argsort(self, reverse: bool = False) -> list:
+        """Returns the indices which would sort this array, i.e. to sort a list of orders by price."""
+        return sorted(range(len(self.values)), key=self.values.__getitem__, reverse=reverse)
+
+    def sorted(self, reverse: bool = False):
+        """Returns a sorted copy of this array."""
+        return type(self)(sorted(self.values, reverse=reverse))
+
+    def min(self):
+        """Returns the lowest element of the array."""
+        return self.unit(min(self.values))
+
+    def max(self):
+        """Returns the highest element of the array."""
+        return self.unit(max(self.values))
+
+    def sum(self):
+        """Returns the sum of all the elements of the array."""
+        return self.unit(sum(self.values))
+
+
+class WadArray(_FixedPointArray):
+    """Represents an array of `Wad` numbers, for pricing whole orderbooks or sets of urns at once.
+
+    Elementwise operations follow the `Wad` semantics exactly: addition, subtraction, division and
+    comparisons work with another `WadArray` of the same length or with a single `Wad`, multiplication
+    works with `WadArray`, `RayArray`, `RadArray`, `Wad`, `Ray`, `Rad` and `int`. The result is always
+    a `WadArray`.
+
+    Attributes:
+        values: The internal representations of the `Wad` elements, as a list of integers.
+    """
+
+    __slots__ = ()
+
+    unit = Wad
+    decimals = 18
+
+
+class RayArray(_FixedPointArray):
+    """Represents an array of `Ray` numbers, see `WadArray`.
+
+    Attributes:
+        values: The internal representations of the `Ray` elements, as a list of integers.
+    """
+
+    __slots__ = ()
+
+    unit = Ray
+    decimals = 27
+
+
+class RadArray(_FixedPointArray):
+    """Represents an array of `Rad` numbers, see `WadArray`.
+
+    Attributes:
+        values: The internal representations of the `Rad` elements, as a list of integers.
+    """
+
+    __slots__ = ()
+
+    unit = Rad
+    decimals = 45
+
+
+_DECIMALS = {Wad: 18, Ray: 27, Rad: 45}
@@ -15,6 +15,12 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import bisect
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
 from pprint import pformat
 from typing import Optional, List, Iterable, Iterator
 
@@ -23,8 +29,10 @@ from web3 import Web3
 from web3.utils.events import get_event_data
 
 from pymaker import Contract, Address, Transact, Receipt
+from pymaker.multicall import Multicall
 from pymaker.numeric import Wad
 from pymaker.token import ERC20Token
+from pymaker.transactional import TxManager
 from pymaker.util import int_to_bytes32, bytes_to_int
 
 
@@ -91,6 +99,33 @@ class Order:
         return pformat(vars(self))
 
 
+class NewOrder:
+    """Represents an order to be placed with `MatchingMarket.make_many()` or `MatchingMarket.replace_orders()`.
+
+    Attributes:
+        pay_token: The address of the token which will be put on sale.
+        pay_amount: The amount of the `pay_token` token which will be put on sale.
+        buy_token: The address of the token we want to be paid with.
+        buy_amount: The amount of the `buy_token` token we want to receive.
+    """
+
+    def __init__(self, pay_token: Address, pay_amount: Wad, buy_token: Address, buy_amount: Wad):
+        assert(isinstance(pay_token, Address))
+        assert(isinstance(pay_amount, Wad))
+        assert(isinstance(buy_token, Address))
+        assert(isinstance(buy_amount, Wad))
+        assert(pay_amount > Wad(0))
+        assert(buy_amount > Wad(0))
+
+        self.pay_token = pay_token
+        self.pay_amount = pay_amount
+        self.buy_token = buy_token
+        self.buy_amount = buy_amount
+
+    def __repr__(self):
+        return pformat(vars(self))
+
+
 class LogMake:
     def __init__(self, log):
         self.order_id = bytes_to_int(log['args']['id'])
@@ -156,6 +191,18 @@ class LogTake:
 
             return LogTake(event_data)
 
+    @classmethod
+    def from_receipt(cls, receipt: Receipt):
+        assert(isinstance(receipt, Receipt))
+
+        if receipt.logs is not None:
+            for log in receipt.logs:
+                if len(log['topics']) > 0 and log['topics'][0] == HexBytes('0x3383e3357c77fd2e3a4b30deea81179bc70a795d053d14d5b7f2f01d0fd4596f'):
+                    log_take_abi = [abi for abi in SimpleMarket.abi if abi.get('name') == 'LogTake'][0]
+                    event_data = get_event_data(log_take_abi, log)
+
+                    yield LogTake(event_data)
+
     def __eq__(self, other):
         assert(isinstance(other, LogTake))
         return self.__dict__ == other.__dict__
@@ -175,6 +222,18 @@ class LogKill:
         self.timestamp = log['args']['timestamp']
         self.raw = log
 
+    @classmethod
+    def from_receipt(cls, receipt: Receipt):
+        assert(isinstance(receipt, Receipt))
+
+        if receipt.logs is not None:
+            for log in receipt.logs:
+                if len(log['topics']) > 0 and log['topics'][0] == HexBytes('0x9577941d28fff863bfbee4694a6a4a56fb09e169619189d2eaa750b5b4819995'):
+                    log_kill_abi = [abi for abi in SimpleMarket.abi if abi.get('name') == 'LogKill'][0]
+                    event_data = get_event_data(log_kill_abi, log)
+
+                    yield LogKill(event_data)
+
     def __repr__(self):
         return pformat(vars(self))
 
@@ -188,21 +247,45 @@ class SimpleMarket(Contract):
     You can find the source code of the `OasisDEX` contracts here:
     <https://github.com/makerdao/maker-otc>.
 
+    Orders are enumerated in JSON-RPC batches of `batch_size` calls, with up to `parallelism` batches
+    in flight at the same time. Ids of orders which have been found to be completely taken or cancelled
+    are remembered, so they never get queried again. If `tombstone_file` is specified, these ids are
+    persisted in it, so they do not need to be queried again after a restart either.
+
     Attributes:
         web3: An instance of `Web` from `web3.py`.
         address: Ethereum address of the `SimpleMarket` contract.
+        parallelism: Maximum number of batches being executed concurrently during order enumeration.
+        batch_size: Maximum number of calls sent in one JSON-RPC batch request during order enumeration.
+        tombstone_file: Optional path of the file to persist ids of inactive orders in.
     """
 
     abi = Contract._load_abi(__name__, 'abi/SimpleMarket.abi')
     bin = Contract._load_bin(__name__, 'abi/SimpleMarket.bin')
 
-    def __init__(self, web3: Web3, address: Address):
+    def __init__(self, web3: Web3, address: Address, parallelism: int = 4, batch_size: int = 100,
+                 tombstone_file: Optional[str] = None):
         assert(isinstance(web3, Web3))
         assert(isinstance(address, Address))
+        assert(isinstance(parallelism, int))
+        assert(isinstance(batch_size, int))
+        assert(isinstance(tombstone_file, str) or (tombstone_file is None))
+        assert(parallelism > 0)
+        assert(batch_size > 0)
 
         self.web3 = web3
         self.address = address
+        self.parallelism = parallelism
+        self.batch_size = batch_size
+        self.tombstone_file = tombstone_file
         self._contract = self._get_contract(web3, self.abi, address)
+        self._dead_orders = set()
+        self._alien_orders = {}
+
+        if self.tombstone_file is not None:
+            self._chain = web3.eth.getBlock(0)['hash'].hex()
+            if os.path.isfile(self.tombstone_file):
+                self._load_tombstones()
 
     @staticmethod
     def deploy(web3: Web3):
@@ -232,7 +315,7 @@ class SimpleMarket(Contract):
         for token in tokens:
             approval_function(token, self.address, 'OasisDEX')
 
-    def past_make(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogMake]:
+    def past_make(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogMake]:
         """Synchronously retrieve past LogMake events.
 
         `LogMake` events are emitted by the Oasis contract every time someone places an order.
@@ -240,16 +323,19 @@ class SimpleMarket(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogMake` events represented as :py:class:`pymaker.oasis.LogMake` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'LogMake', LogMake, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'LogMake', LogMake, number_of_past_blocks, event_filter, stream)
 
-    def past_bump(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogBump]:
+    def past_bump(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogBump]:
         """Synchronously retrieve past LogBump events.
 
         `LogBump` events are emitted by the Oasis contract every time someone calls the `bump()` function.
@@ -257,16 +343,19 @@ class SimpleMarket(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogBump` events represented as :py:class:`pymaker.oasis.LogBump` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'LogBump', LogBump, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'LogBump', LogBump, number_of_past_blocks, event_filter, stream)
 
-    def past_take(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogTake]:
+    def past_take(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogTake]:
         """Synchronously retrieve past LogTake events.
 
         `LogTake` events are emitted by the Oasis contract every time someone takes an order.
@@ -274,16 +363,19 @@ class SimpleMarket(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogTake` events represented as :py:class:`pymaker.oasis.LogTake` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'LogTake', LogTake, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'LogTake', LogTake, number_of_past_blocks, event_filter, stream)
 
-    def past_kill(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogKill]:
+    def past_kill(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogKill]:
         """Synchronously retrieve past LogKill events.
 
         `LogKill` events are emitted by the Oasis contract every time someone cancels an order.
@@ -291,14 +383,17 @@ class SimpleMarket(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogKill` events represented as :py:class:`pymaker.oasis.LogKill` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'LogKill', LogKill, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'LogKill', LogKill, number_of_past_blocks, event_filter, stream)
 
     def get_last_order_id(self) -> int:
         """Get the id of the last order created on the market.
@@ -320,7 +415,9 @@ class SimpleMarket(Contract):
         """
         assert(isinstance(order_id, int))
 
-        array = self._contract.call().offers(order_id)
+        return self._order(order_id, self._contract.call().offers(order_id))
+
+    def _order(self, order_id: int, array: list) -> Optional[Order]:
         if array[5] == 0:
             return None
         else:
@@ -328,6 +425,53 @@ class SimpleMarket(Contract):
                          pay_amount=Wad(array[0]), buy_token=Address(array[3]), buy_amount=Wad(array[2]),
                          timestamp=array[5])
 
+    def _get_orders(self, order_ids: list) -> List[Order]:
+        order_ids = [order_id for order_id in order_ids if order_id not in self._dead_orders]
+
+        def fetch(batch: list) -> list:
+            multicall = Multicall(self.web3, batch_size=self.batch_size)
+            for order_id in batch:
+                multicall.add(self, 'offers', [order_id])
+
+            return [(order_id, self._order(order_id, array)) for order_id, array in zip(batch, multicall.execute())]
+
+        batches = [order_ids[i:i + self.batch_size] for i in range(0, len(order_ids), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            results = [result for results in executor.map(fetch, batches) for result in results]
+
+        # order ids are never reused, so once an order has been completely taken or cancelled
+        # it will never become active again and there is no point in querying it ever again
+        dead_orders = set(order_id for order_id, order in results if order is None)
+        if not dead_orders.issubset(self._dead_orders):
+            self._dead_orders.update(dead_orders)
+            self._save_tombstones()
+
+        return [order for _, order in results if order is not None]
+
+    def _load_tombstones(self):
+        with open(self.tombstone_file, 'r') as file:
+            tombstones = json.load(file)
+
+        if not isinstance(tombstones, dict) or tombstones.get('market') != self.address.address \
+                or tombstones.get('chain') != self._chain:
+            self.logger.warning(f"Ignoring tombstone file '{self.tombstone_file}' as it is for a different market")
+            return
+
+        self._dead_orders = set(tombstones['dead_orders'])
+
+    def _save_tombstones(self):
+        if self.tombstone_file is None:
+            return
+
+        tombstones = {'market': self.address.address,
+                      'chain': self._chain,
+                      'dead_orders': sorted(self._dead_orders)}
+
+        with open(f"{self.tombstone_file}.tmp", 'w') as file:
+            json.dump(tombstones, file)
+
+        os.replace(f"{self.tombstone_file}.tmp", self.tombstone_file)
+
     def get_orders(self, pay_token: Address = None, buy_token: Address = None) -> List[Order]:
         """Get all active orders.
 
@@ -344,8 +488,7 @@ class SimpleMarket(Contract):
         assert((isinstance(pay_token, Address) and isinstance(buy_token, Address))
                or (pay_token is None and buy_token is None))
 
-        orders = [self.get_order(order_id + 1) for order_id in range(self.get_last_order_id())]
-        orders = [order for order in orders if order is not None]
+        orders = self._get_orders(list(range(1, self.get_last_order_id() + 1)))
 
         if pay_token is not None and buy_token is not None:
             orders = list(filter(lambda order: order.pay_token == pay_token and order.buy_token == buy_token, orders))
@@ -363,22 +506,15 @@ class SimpleMarket(Contract):
         """
         assert(isinstance(maker, Address))
 
-        result = []
-        for order_id in range(self.get_last_order_id()):
-            # Query the order.
-            order = self.get_order(order_id + 1)
-            if order is None:
-                continue
+        # We are only interested in orders owned by `maker`. Orders not owned by `maker` are added
+        # to `_alien_orders[maker]`, so the next time `get_orders_by_maker()` is called with the same
+        # parameter we will be able to rule out these orders straight away.
+        alien_orders = self._alien_orders.setdefault(maker, set())
+        orders = self._get_orders([order_id for order_id in range(1, self.get_last_order_id() + 1)
+                                   if order_id not in alien_orders])
 
-            # We are only interested in orders owned by `maker`. In case the order is not owned by `maker`,
-            # we add it to `_alien_orders[maker]` so the next time `get_orders_by_maker()` is called
-            # with the same parameter we will be able to rule out these orders straight away.
-            if order.maker != maker:
-                continue
-
-            result.append(order)
-
-        return result
+        alien_orders.update(order.order_id for order in orders if order.maker != maker)
+        return [order for order in orders if order.maker == maker]
 
     def make(self, pay_token: Address, pay_amount: Wad, buy_token: Address, buy_amount: Wad) -> Transact:
         """Create a new order.
@@ -519,6 +655,10 @@ class MatchingMarket(ExpiringMarket):
         web3: An instance of `Web` from `web3.py`.
         address: Ethereum address of the `MatchingMarket` contract.
         support_address: Ethereum address of the `MakerOtcSupportMethods` contract (optional).
+        parallelism: Maximum number of batches being executed concurrently during order enumeration.
+        batch_size: Maximum number of calls sent in one JSON-RPC batch request during order enumeration.
+        tombstone_file: Optional path of the file to persist ids of inactive orders in.
+        order_book: If `use_order_book` is `True`, an `OasisOrderBook` used by `position()`.
     """
 
     abi = Contract._load_abi(__name__, 'abi/MatchingMarket.abi')
@@ -526,10 +666,16 @@ class MatchingMarket(ExpiringMarket):
 
     abi_support = Contract._load_abi(__name__, 'abi/MakerOtcSupportMethods.abi')
 
-    def __init__(self, web3: Web3, address: Address, support_address: Optional[Address] = None):
+    def __init__(self, web3: Web3, address: Address, support_address: Optional[Address] = None,
+                 parallelism: int = 4, batch_size: int = 100, tombstone_file: Optional[str] = None,
+                 use_order_book: bool = False):
         assert(isinstance(support_address, Address) or (support_address is None))
+        assert(isinstance(use_order_book, bool))
 
-        super(MatchingMarket, self).__init__(web3=web3, address=address)
+        super(MatchingMarket, self).__init__(web3=web3, address=address, parallelism=parallelism,
+                                             batch_size=batch_size, tombstone_file=tombstone_file)
+
+        self.order_book = OasisOrderBook(self) if use_order_book else None
 
         self.support_address = support_address
         self._support_contract = self._get_contract(web3, self.abi_support, self.support_address) \
@@ -633,46 +779,76 @@ class MatchingMarket(ExpiringMarket):
                or (pay_token is None and buy_token is None))
 
         if pay_token is not None and buy_token is not None:
-            orders = []
-
-            if self._support_contract:
-                result = self._support_contract.call().getOffers(self.address.address, pay_token.address, buy_token.address)
-
-                while True:
-                    count = 0
-                    for i in range(0, 100):
-                        if result[3][i] != '0x0000000000000000000000000000000000000000':
-                            count += 1
-
-                            orders.append(Order(market=self,
-                                                order_id=result[0][i],
-                                                maker=Address(result[3][i]),
-                                                pay_token=pay_token,
-                                                pay_amount=Wad(result[1][i]),
-                                                buy_token=buy_token,
-                                                buy_amount=Wad(result[2][i]),
-                                                timestamp=result[4][i]))
-
-                    if count == 100:
-                        next_order_id = self._contract.call().getWorseOffer(orders[-1].order_id)
-                        result = self._support_contract.call().getOffers(self.address.address, next_order_id)
-
-                    else:
-                        break
-
-            else:
-                order_id = self._contract.call().getBestOffer(pay_token.address, buy_token.address)
-                while order_id != 0:
-                    order = self.get_order(order_id)
-                    if order is not None:
-                        orders.append(order)
-
-                    order_id = self._contract.call().getWorseOffer(order_id)
-
+            orders = list(self.iter_orders(pay_token, buy_token))
             return sorted(orders, key=lambda order: order.order_id)
         else:
             return super(ExpiringMarket, self).get_orders(pay_token, buy_token)
 
+    def iter_orders(self, pay_token: Address, buy_token: Address) -> Iterator[Order]:
+        """Enumerate active orders of a token pair, the best first.
+
+        Orders get yielded as soon as they are fetched, so callers interested only in the top of the book
+        can stop the iteration early and avoid fetching the rest of the orderbook.
+
+        If the `MakerOtcSupportMethods` contract is available, orders are fetched in pages of 100 orders
+        and the request for the next page is already being sent while the orders from the current page
+        are being decoded and yielded.
+
+        Args:
+            `pay_token`: Address of the `pay_token` to filter the orders by.
+            `buy_token`: Address of the `buy_token` to filter the orders by.
+
+        Returns:
+            Generator of `Order` objects representing active orders of the pair, sorted by price.
+        """
+        assert(isinstance(pay_token, Address))
+        assert(isinstance(buy_token, Address))
+
+        if self._support_contract is None:
+            order_id = self._contract.call().getBestOffer(pay_token.address, buy_token.address)
+            while order_id != 0:
+                order = self.get_order(order_id)
+                if order is not None:
+                    yield order
+
+                order_id = self._contract.call().getWorseOffer(order_id)
+
+            return
+
+        def next_page(last_order_id: int):
+            next_order_id = self._contract.call().getWorseOffer(last_order_id)
+            return self._support_contract.call().getOffers(self.address.address, next_order_id)
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            page = self._support_contract.call().getOffers(self.address.address, pay_token.address, buy_token.address)
+
+            while True:
+                # if the page is full there may be more orders, so we start fetching the next page straight away
+                if page[3][99] != '0x0000000000000000000000000000000000000000':
+                    next_page_future = executor.submit(next_page, page[0][99])
+                else:
+                    next_page_future = None
+
+                for i in range(0, 100):
+                    if page[3][i] != '0x0000000000000000000000000000000000000000':
+                        yield Order(market=self,
+                                    order_id=page[0][i],
+                                    maker=Address(page[3][i]),
+                                    pay_token=pay_token,
+                                    pay_amount=Wad(page[1][i]),
+                                    buy_token=buy_token,
+                                    buy_amount=Wad(page[2][i]),
+                                    timestamp=page[4][i])
+
+                if next_page_future is None:
+                    break
+
+                page = next_page_future.result()
+
+        finally:
+            executor.shutdown(wait=False)
+
     def make(self, pay_token: Address, pay_amount: Wad, buy_token: Address, buy_amount: Wad, pos: int = None) -> Transact:
         """Create a new order.
 
@@ -738,6 +914,10 @@ class MatchingMarket(ExpiringMarket):
         This method is responsible for calculating the correct insertion position. It is used internally
         by `make` when `pos` argument is omitted (or is `None`).
 
+        If the market has been created with `use_order_book=True`, the position gets looked up in the local
+        orderbook, which only needs to apply events from new blocks before each lookup. Otherwise all orders
+        of the pair get enumerated every time this method gets called.
+
         Args:
             pay_token: Address of the ERC20 token you want to put on sale.
             pay_amount: Amount of the `pay_token` token you want to put on sale.
@@ -752,6 +932,11 @@ class MatchingMarket(ExpiringMarket):
         assert(isinstance(buy_token, Address))
         assert(isinstance(buy_amount, Wad))
 
+        if self.order_book is not None:
+            self.order_book.update()
+            return self.order_book.position(pay_token=pay_token, pay_amount=pay_amount,
+                                            buy_token=buy_token, buy_amount=buy_amount)
+
         self.logger.debug("Enumerating orders for position calculation...")
 
         orders = filter(lambda order: order.pay_amount / order.buy_amount >= pay_amount / buy_amount,
@@ -762,5 +947,368 @@ class MatchingMarket(ExpiringMarket):
         sorted_orders = sorted(orders, key=lambda o: o.pay_amount / o.buy_amount)
         return sorted_orders[0].order_id if len(sorted_orders) > 0 else 0
 
+    def make_many(self, tx_manager: TxManager, orders: List[NewOrder],
+                  max_orders_per_transaction: int = 20) -> List[Transact]:
+        """Create multiple new orders in as few Ethereum transactions as possible.
+
+        See `replace_orders()` for details.
+
+        Args:
+            tx_manager: The `TxManager` to place the orders through.
+            orders: Orders to be placed.
+            max_orders_per_transaction: Maximum number of orders placed in one Ethereum transaction.
+
+        Returns:
+            A list of :py:class:`pymaker.Transact` instances, which can be used to trigger the transactions.
+        """
+        return self.replace_orders(tx_manager, [], orders, max_orders_per_transaction)
+
+    def kill_many(self, tx_manager: TxManager, order_ids: List[int],
+                  max_orders_per_transaction: int = 20) -> List[Transact]:
+        """Cancel multiple existing orders in as few Ethereum transactions as possible.
+
+        See `replace_orders()` for details.
+
+        Args:
+            tx_manager: The `TxManager` the orders have been placed through.
+            order_ids: Ids of the orders to be cancelled.
+            max_orders_per_transaction: Maximum number of orders cancelled in one Ethereum transaction.
+
+        Returns:
+            A list of :py:class:`pymaker.Transact` instances, which can be used to trigger the transactions.
+        """
+        return self.replace_orders(tx_manager, order_ids, [], max_orders_per_transaction)
+
+    def replace_orders(self, tx_manager: TxManager, order_ids: List[int], orders: List[NewOrder],
+                       max_orders_per_transaction: int = 20) -> List[Transact]:
+        """Cancel existing orders and create new ones in as few Ethereum transactions as possible.
+
+        All `kill` and `offer` calls are executed via the `TxManager`, at most `max_orders_per_transaction`
+        of them per Ethereum transaction, orders being cancelled first. As a consequence the new orders
+        are owned by the `TxManager` contract, and only orders owned by it can be cancelled this way.
+        The `TxManager` has to be approved to access our `pay_token` tokens and the market has to be
+        approved to access them via the `TxManager` first, i.e.:
+
+            tx_manager.approve([token], directly())
+            market.approve([token], via_tx_manager(tx_manager))
+
+        Positions (`pos`) of all new orders are calculated upfront, enumerating orders of each token pair
+        only once (or looking them up in the local orderbook if the market has been created with
+        `use_order_book=True`), ignoring the orders which are going to be cancelled.
+
+        When complete, `receipt.result` will contain a list with one entry per order cancelled or created
+        in that transaction, in the same order as they have been passed to this method. Each entry is either
+        the corresponding `LogKill` or `LogMake` event, or `None` if there wasn't any, which happens when
+        a new order got completely matched on creation. `None` is also returned for new orders whose `LogMake`
+        can not be told apart from the ones of other orders in the same transaction.
+
+        Args:
+            tx_manager: The `TxManager` to execute the calls through.
+            order_ids: Ids of the orders to be cancelled.
+            orders: Orders to be placed.
+            max_orders_per_transaction: Maximum number of orders cancelled or created in one Ethereum transaction.
+
+        Returns:
+            A list of :py:class:`pymaker.Transact` instances, which can be used to trigger the transactions.
+        """
+        assert(isinstance(tx_manager, TxManager))
+        assert(isinstance(order_ids, list))
+        assert(isinstance(orders, list))
+        assert(isinstance(max_orders_per_transaction, int))
+        assert(max_orders_per_transaction > 0)
+
+        positions = self._positions(orders, set(order_ids))
+        entries = [(order_id, self.kill(order_id).invocation()) for order_id in order_ids] + \
+                  [(order, self.make(pay_token=order.pay_token, pay_amount=order.pay_amount,
+                                     buy_token=order.buy_token, buy_amount=order.buy_amount, pos=pos).invocation())
+                   for order, pos in zip(orders, positions)]
+
+        transacts = []
+        for index in range(0, len(entries), max_orders_per_transaction):
+            chunk = entries[index:index + max_orders_per_transaction]
+            tokens = list(dict.fromkeys(entry.pay_token for entry, _ in chunk if isinstance(entry, NewOrder)))
+
+            transacts.append(tx_manager.execute(tokens, [invocation for _, invocation in chunk],
+                                                self._replace_orders_result_function(tx_manager,
+                                                                                     [entry for entry, _ in chunk])))
+
+        return transacts
+
+    def _positions(self, orders: List[NewOrder], excluded_order_ids: set) -> List[int]:
+        if self.order_book is not None:
+            self.order_book.update()
+
+        pairs = {}
+        for pair in dict.fromkeys((order.pay_token, order.buy_token) for order in orders):
+            pair_orders = self.order_book.orders(*pair) if self.order_book is not None else self.get_orders(*pair)
+            pairs[pair] = sorted((Fraction(order.buy_amount.value, order.pay_amount.value), order.order_id)
+                                 for order in pair_orders if order.order_id not in excluded_order_ids)
+
+        return [_position(pairs[(order.pay_token, order.buy_token)], order.pay_amount, order.buy_amount)
+                for order in orders]
+
+    @staticmethod
+    def _replace_orders_result_function(tx_manager: TxManager, entries: list):
+        def result_function(receipt) -> list:
+            log_kills = {log_kill.order_id: log_kill for log_kill in LogKill.from_receipt(receipt)}
+            log_makes = iter(MatchingMarket._match_log_makes(tx_manager.address,
+                                                             [entry for entry in entries if isinstance(entry, NewOrder)],
+                                                             receipt))
+
+            return [next(log_makes) if isinstance(entry, NewOrder) else log_kills.get(entry) for entry in entries]
+
+        return result_function
+
+    @staticmethod
+    def _match_log_makes(maker: Address, orders: List[NewOrder], receipt: Receipt) -> List[Optional[LogMake]]:
+        # `LogTake` and `LogMake` events of each `offer` call follow the ones of the preceding call. Every call
+        # emits a `LogTake` for each order it has matched, followed by a `LogMake` unless the new order got
+        # completely matched. As the events do not say which call they come from, all the ways they can be
+        # split between the orders get considered, and a `LogMake` is only assigned to an order if all of them
+        # agree on it.
+        events = sorted([log_take for log_take in LogTake.from_receipt(receipt) if log_take.taker == maker] +
+                        [log_make for log_make in LogMake.from_receipt(receipt) if log_make.maker == maker],
+                        key=lambda event: event.raw['logIndex'])
+
+        def ends(order: NewOrder, start: int) -> list:
+            # all the positions the events of `order` can end at, if they start at `start`
+            result = []
+            for index in range(start, len(events) + 1):
+                if index > start:
+                    result.append(index)
+
+                if index == len(events):
+                    break
+
+                event = events[index]
+                if isinstance(event, LogMake) and event.pay_token == order.pay_token \
+                        and event.buy_token == order.buy_token and event.pay_amount <= order.pay_amount:
+                    result.append(index + 1)
+
+                if not (isinstance(event, LogTake) and event.pay_token == order.buy_token
+                        and event.buy_token == order.pay_token):
+                    break
+
+            return result
+
+        reachable = [{0}]
+        for order in orders:
+            reachable.append({end for start in reachable[-1] for end in ends(order, start)})
+
+        completing = [{len(events)}]
+        for order in reversed(orders):
+            completing.insert(0, {start for start in range(len(events) + 1)
+                                  if any(end in completing[0] for end in ends(order, start))})
+
+        result = []
+        for index, order in enumerate(orders):
+            outcomes = {end - 1 if isinstance(events[end - 1], LogMake) else None
+                        for start in reachable[index] & completing[index]
+                        for end in ends(order, start) if end in completing[index + 1]}
+
+            result.append(events[outcomes.pop()] if len(outcomes) == 1 and None not in outcomes else None)
+
+        return result
+
     def __repr__(self):
         return f"MatchingMarket('{self.address}')"
+
+
+def _position(keys: list, pay_amount: Wad, buy_amount: Wad) -> int:
+    # `keys` is a sorted list of `(Fraction(buy_amount, pay_amount), order_id)` tuples of all orders of a token pair
+    index = bisect.bisect_right(keys, (Fraction(buy_amount.value, pay_amount.value), float('inf')))
+    if index == 0:
+        return 0
+
+    # out of orders with the same price, the oldest one should be used
+    return keys[bisect.bisect_left(keys, (keys[index - 1][0], -1))][1]
+
+
+class OasisOrderBook:
+    """Local copy of the `OasisDEX` orderbook, kept up to date using `LogMake`, `LogTake` and `LogKill` events.
+
+    The orderbook gets loaded once with `load()`, which reads all orders at a single block
+    in JSON-RPC batches. After that, `update()` only fetches the events emitted since the previous update
+    and applies them locally, so it is cheap enough to be called on every new block, i.e. from
+    `Lifecycle.on_block()`.
+
+    Orders of every token pair are kept sorted by price, the best (the one paying the most
+    `pay_token` per `buy_token`) first, so the best order can be looked up in constant time
+    and orders get inserted and removed using a binary search.
+
+    Notes:
+        Chain reorganizations are not handled, so it's better to keep the orderbook a few blocks
+        behind the latest block.
+
+    Attributes:
+        market: The `SimpleMarket`, `ExpiringMarket` or `MatchingMarket` to keep the orderbook of.
+    """
+
+    logger = logging.getLogger()
+
+    def __init__(self, market: SimpleMarket):
+        assert(isinstance(market, SimpleMarket))
+
+        self.market = market
+        self.last_block_number = None
+        self._orders = {}
+        self._keys = {}
+        self._pairs = {}
+
+    def load(self, block_number: Optional[int] = None):
+        """Loads all active orders, discarding the current state of the orderbook.
+
+        Args:
+            block_number: Block to load the orders at. If not specified, the latest block is used.
+        """
+        assert(isinstance(block_number, int) or (block_number is None))
+
+        if block_number is None:
+            block_number = self.market.web3.eth.blockNumber
+
+        last_order_id = self.market._contract.functions.last_offer_id().call(block_identifier=block_number)
+
+        multicall = Multicall(self.market.web3, block_identifier=block_number)
+        for order_id in range(1, last_order_id + 1):
+            multicall.add(self.market, 'offers', [order_id])
+
+        self._orders, self._keys, self._pairs = {}, {}, {}
+        for order_id, array in enumerate(multicall.execute(), start=1):
+            if array[5] != 0:
+                self._add(Order(market=self.market, order_id=order_id, maker=Address(array[4]),
+                                pay_token=Address(array[1]), pay_amount=Wad(array[0]),
+                                buy_token=Address(array[3]), buy_amount=Wad(array[2]), timestamp=array[5]))
+
+        self.last_block_number = block_number
+        self.logger.debug(f"Loaded {len(self._orders)} active orders at block #{block_number}")
+
+    def update(self, block_number: Optional[int] = None) -> int:
+        """Applies all events emitted up to the given block. Loads the orderbook first if it has not been loaded yet.
+
+        Args:
+            block_number: Block to update the orderbook to. If not specified, the latest block is used.
+
+        Returns:
+            Number of events applied.
+        """
+        assert(isinstance(block_number, int) or (block_number is None))
+
+        if block_number is None:
+            block_number = self.market.web3.eth.blockNumber
+
+        if self.last_block_number is None:
+            self.load(block_number)
+            return 0
+
+        if block_number <= self.last_block_number:
+            return 0
+
+        events = []
+        for event, cls in [('LogMake', LogMake), ('LogBump', LogBump), ('LogTake', LogTake), ('LogKill', LogKill)]:
+            events.extend(self.market._events_in_range(self.market._contract, event, cls,
+                                                       self.last_block_number + 1, block_number, None))
+        events.sort(key=lambda event: (event.raw['blockNumber'], event.raw['logIndex']))
+
+        for event in events:
+            self.apply(event)
+
+        self.last_block_number = block_number
+        return len(events)
+
+    def apply(self, event):
+        """Applies a single `LogMake`, `LogBump`, `LogTake` or `LogKill` event to the orderbook."""
+        assert(isinstance(event, (LogMake, LogBump, LogTake, LogKill)))
+
+        if isinstance(event, (LogMake, LogBump)):
+            if event.order_id not in self._orders:
+                self._add(Order(market=self.market, order_id=event.order_id, maker=event.maker,
+                                pay_token=event.pay_token, pay_amount=event.pay_amount,
+                                buy_token=event.buy_token, buy_amount=event.buy_amount, timestamp=event.timestamp))
+
+        elif isinstance(event, LogTake):
+            order = self._remove(event.order_id)
+            if order is not None and order.pay_amount > event.take_amount:
+                self._add(Order(market=self.market, order_id=order.order_id, maker=order.maker,
+                                pay_token=order.pay_token, pay_amount=order.pay_amount - event.take_amount,
+                                buy_token=order.buy_token, buy_amount=order.buy_amount - event.give_amount,
+                                timestamp=order.timestamp))
+
+        elif isinstance(event, LogKill):
+            self._remove(event.order_id)
+
+    def get_order(self, order_id: int) -> Optional[Order]:
+        """Returns the order with the given id, or `None` if it is not active."""
+        assert(isinstance(order_id, int))
+
+        return self._orders.get(order_id)
+
+    def get_orders(self, pay_token: Address = None, buy_token: Address = None) -> List[Order]:
+        """Returns all active orders, sorted by order id, the same way `SimpleMarket.get_orders()` does."""
+        assert((isinstance(pay_token, Address) and isinstance(buy_token, Address))
+               or (pay_token is None and buy_token is None))
+
+        if pay_token is not None and buy_token is not None:
+            orders = self.orders(pay_token, buy_token)
+        else:
+            orders = self._orders.values()
+
+        return sorted(orders, key=lambda order: order.order_id)
+
+    def orders(self, pay_token: Address, buy_token: Address) -> List[Order]:
+        """Returns all active orders of the token pair, sorted by price, the best first."""
+        assert(isinstance(pay_token, Address))
+        assert(isinstance(buy_token, Address))
+
+        return [self._orders[order_id] for _, order_id in self._pairs.get((pay_token, buy_token), [])]
+
+    def best_order(self, pay_token: Address, buy_token: Address) -> Optional[Order]:
+        """Returns the best active order of the token pair, or `None` if there are no orders."""
+        assert(isinstance(pay_token, Address))
+        assert(isinstance(buy_token, Address))
+
+        keys = self._pairs.get((pay_token, buy_token))
+        return self._orders[keys[0][1]] if keys else None
+
+    def position(self, pay_token: Address, pay_amount: Wad, buy_token: Address, buy_amount: Wad) -> int:
+        """Calculate the position (`pos`) new order should be inserted at, see `MatchingMarket.position()`.
+
+        The position is the id of the worst-priced order which is priced at least as good as the new order,
+        found with a binary search over orders of the pair.
+
+        Returns:
+            The position (`pos`) new order should be inserted at, `0` if there is no such order.
+        """
+        assert(isinstance(pay_token, Address))
+        assert(isinstance(pay_amount, Wad))
+        assert(isinstance(buy_token, Address))
+        assert(isinstance(buy_amount, Wad))
+
+        return _position(self._pairs.get((pay_token, buy_token), []), pay_amount, buy_amount)
+
+    def bids(self, base_token: Address, quote_token: Address) -> List[Order]:
+        """Returns orders buying `base_token` for `quote_token`, the best first."""
+        return self.orders(quote_token, base_token)
+
+    def asks(self, base_token: Address, quote_token: Address) -> List[Order]:
+        """Returns orders selling `base_token` for `quote_token`, the best first."""
+        return self.orders(base_token, quote_token)
+
+    def __len__(self):
+        return len(self._orders)
+
+    def _add(self, order: Order):
+        key = (Fraction(order.buy_amount.value, order.pay_amount.value), order.order_id)
+        bisect.insort(self._pairs.setdefault((order.pay_token, order.buy_token), []), key)
+        self._orders[order.order_id] = order
+        self._keys[order.order_id] = key
+
+    def _remove(self, order_id: int) -> Optional[Order]:
+        order = self._orders.pop(order_id, None)
+        if order is not None:
+            keys = self._pairs[(order.pay_token, order.buy_token)]
+            del keys[bisect.bisect_left(keys, self._keys.pop(order_id))]
+
+        return order
+
+    def __repr__(self):
+        return f"OasisOrderBook({self.market})"
@@ -215,7 +215,7 @@ class DSProxyFactory(Contract):
 
         return self._contract.call().isProxy(address.address)
 
-    def past_build(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogCreated]:
+    def past_build(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogCreated]:
         """Synchronously retrieve past LogCreated events.
 
         `LogCreated` events are emitted every time someone build a proxy from the factory.
@@ -223,14 +223,17 @@ class DSProxyFactory(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogCreated` events represented as :py:class:`pymaker.proxy.LogCreated` class.
         """
         assert isinstance(number_of_past_blocks, int)
         assert isinstance(event_filter, dict) or (event_filter is None)
+        assert isinstance(stream, bool)
 
-        return self._past_events(self._contract, 'Created', LogCreated, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'Created', LogCreated, number_of_past_blocks, event_filter, stream)
 
     @classmethod
     def log_created(cls, receipt: Receipt) -> List[LogCreated]:
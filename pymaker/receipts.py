@@ -0,0 +1,213 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+from web3 import Web3
+
+from pymaker.batch import batch
+
+
+class TransactionWatch:
+    """Watches all transactions sent with the same nonce, see `ReceiptWatcher.watch()`.
+
+    The `future` gets resolved with the raw receipt of the first of these transactions
+    which gets mined, or with `None` if the nonce has been used by some other transaction.
+
+    Attributes:
+        account: Address of the account the transactions have been sent from.
+        nonce: Nonce the transactions have been sent with.
+        transaction_hashes: Hashes of the transactions being watched.
+        future: A `concurrent.futures.Future` of the raw receipt.
+    """
+
+    def __init__(self, watcher, account: str, nonce: int):
+        assert(isinstance(account, str))
+        assert(isinstance(nonce, int))
+
+        self.account = account
+        self.nonce = nonce
+        self.transaction_hashes = []
+        self.future = Future()
+        self._watcher = watcher
+        self._misses = 0
+
+    def add(self, transaction_hash):
+        """Adds a transaction (i.e. one with a higher gas price) to the watch."""
+        self.transaction_hashes.append(transaction_hash)
+        self._watcher._wake_up(self)
+
+    def cancel(self):
+        """Stops watching the transactions."""
+        self.future.cancel()
+
+    def __repr__(self):
+        return f"TransactionWatch('{self.account}', {self.nonce})"
+
+
+class ReceiptWatcher:
+    """Waits for receipts of all pending transactions sent through a `Web3` instance at once.
+
+    A single background thread polls the node for the latest block number. Every time a new block
+    appears, receipts of all pending transactions and transaction counts of all accounts they
+    have been sent from are fetched in one JSON-RPC batch request, so the polling cost does not
+    depend on the number of transactions waiting to be mined.
+
+    The thread is only running as long as there are transactions being watched.
+
+    Attributes:
+        web3: An instance of `Web` from `web3.py`.
+        poll_interval: Number of seconds between checks for a new block.
+        max_misses: Number of checks after which a transaction is considered overridden
+            by another one, if the nonce has been used but none of its receipts can be found.
+    """
+
+    logger = logging.getLogger()
+
+    _watchers = {}
+    _watchers_lock = threading.Lock()
+
+    def __init__(self, web3: Web3, poll_interval: float = 0.5, max_misses: int = 5):
+        assert(isinstance(web3, Web3))
+        assert(isinstance(poll_interval, (int, float)))
+        assert(isinstance(max_misses, int))
+
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.max_misses = max_misses
+        self._watches = []
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @staticmethod
+    def for_web3(web3: Web3) -> 'ReceiptWatcher':
+        """Returns the watcher shared by all transactions sent through `web3`."""
+        assert(isinstance(web3, Web3))
+
+        # the watcher keeps a reference to `web3`, so its `id()` can not get reused
+        with ReceiptWatcher._watchers_lock:
+            if id(web3) not in ReceiptWatcher._watchers:
+                ReceiptWatcher._watchers[id(web3)] = ReceiptWatcher(web3)
+
+            return ReceiptWatcher._watchers[id(web3)]
+
+    def watch(self, account: str, nonce: int) -> TransactionWatch:
+        """Starts watching transactions sent from `account` with `nonce`.
+
+        Transactions get added to the watch with `TransactionWatch.add()` as they get sent.
+
+        Args:
+            account: Address of the account the transactions are sent from.
+            nonce: Nonce the transactions are sent with.
+
+        Returns:
+            A `TransactionWatch` instance.
+        """
+        assert(isinstance(account, str))
+        assert(isinstance(nonce, int))
+
+        watch = TransactionWatch(self, account, nonce)
+        with self._lock:
+            self._watches.append(watch)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+        return watch
+
+    def _wake_up(self, watch: TransactionWatch):
+        # transactions which have just been sent could have been mined in a block we have already seen,
+        # so they get checked on the next poll no matter if there is a new block or not
+        with self._lock:
+            self._dirty.add(watch)
+
+    def _run(self):
+        last_block_number = None
+        while True:
+            with self._lock:
+                self._watches = [watch for watch in self._watches if not watch.future.done()]
+                if len(self._watches) == 0:
+                    self._thread = None
+                    return
+
+                watches = list(self._watches)
+                dirty, self._dirty = self._dirty, set()
+
+            try:
+                block_number = self.web3.eth.blockNumber
+                if block_number != last_block_number:
+                    self._check(watches)
+                    last_block_number = block_number
+                elif len(dirty) > 0:
+                    self._check([watch for watch in watches if watch in dirty])
+
+            except Exception as e:
+                self.logger.warning(f"Failed to check for transaction receipts ({e}), will try again")
+
+            time.sleep(self.poll_interval)
+
+    def _check(self, watches: List[TransactionWatch]):
+        watches = [watch for watch in watches if len(watch.transaction_hashes) > 0]
+        if len(watches) == 0:
+            return
+
+        with batch(self.web3) as b:
+            transaction_counts = {account: b.get_transaction_count(account)
+                                  for account in set(watch.account for watch in watches)}
+            receipts = [(watch, [b.get_transaction_receipt(transaction_hash)
+                                 for transaction_hash in list(watch.transaction_hashes)]) for watch in watches]
+
+        for watch, futures in receipts:
+            if watch.future.done():
+                continue
+
+            receipt = next(filter(lambda receipt: receipt is not None and receipt['blockNumber'] is not None,
+                                  map(self._result, futures)), None)
+
+            if receipt is not None:
+                self._resolve(watch, receipt)
+
+            elif (self._result(transaction_counts[watch.account]) or 0) > watch.nonce:
+                # the receipt may not be available yet even if the nonce has already been used,
+                # so the watch gets checked a few more times before giving up
+                watch._misses += 1
+                if watch._misses >= self.max_misses:
+                    self._resolve(watch, None)
+                else:
+                    self._wake_up(watch)
+
+    @staticmethod
+    def _resolve(watch: TransactionWatch, receipt):
+        # the watch could have been cancelled in the meantime
+        if watch.future.set_running_or_notify_cancel():
+            watch.future.set_result(receipt)
+
+    @staticmethod
+    def _result(future: Future) -> Optional[object]:
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def __repr__(self):
+        return f"ReceiptWatcher({self.web3})"
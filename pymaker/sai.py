@@ -15,14 +15,22 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
+from hexbytes import HexBytes
 from web3 import Web3
 
 from pymaker import Address, Contract, Transact
+from pymaker.multicall import Multicall
 from pymaker.numeric import Wad, Ray
 from pymaker.token import ERC20Token
-from pymaker.util import int_to_bytes32
+from pymaker.util import int_to_bytes32, bytes_to_int
+
+
+def _rmul(x: int, y: int) -> int:
+    # same rounding as `rmul` from `ds-math`, so the results match the ones calculated by the contract
+    return (x * y + 10**27 // 2) // 10**27
 
 
 class Cup:
@@ -52,6 +60,26 @@ class Cup:
         return f"Cup(cup_id={self.cup_id}, lad={repr(self.lad)}, art={self.art}, ink={self.ink})"
 
 
+class CupStatus:
+    """Represents details of a single cup together with its debt and safety, as returned by `Tub.scan_cups()`.
+
+    Attributes:
+        cup: Details of the cup.
+        tab: The amount of outstanding debt, in SAI.
+        safe: `True` if the cup is safe, `False` otherwise.
+    """
+    def __init__(self, cup: Cup, tab: Wad, safe: bool):
+        assert(isinstance(cup, Cup))
+        assert(isinstance(tab, Wad))
+        assert(isinstance(safe, bool))
+        self.cup = cup
+        self.tab = tab
+        self.safe = safe
+
+    def __repr__(self):
+        return f"CupStatus(cup={repr(self.cup)}, tab={self.tab}, safe={self.safe})"
+
+
 class Tub(Contract):
     """A client for the `Tub` contract.
 
@@ -500,6 +528,117 @@ class Tub(Contract):
         assert isinstance(cup_id, int)
         return self._contract.call().safe(int_to_bytes32(cup_id))
 
+    def scan_cups(self, from_id: int = 1, to_id: Optional[int] = None, changed_since_block: Optional[int] = None,
+                  block_number: Optional[int] = None, parallelism: int = 4, batch_size: int = 500) -> List[CupStatus]:
+        """Get details, debt and safety of many cups at once.
+
+        Only one `cups()` call is made per cup, all of them sent to the node in JSON-RPC batches
+        of up to `batch_size` calls, with up to `parallelism` batches in flight at the same time.
+        Debt and safety are calculated locally from `chi()`, `tag()`, `mat()` and `par()`,
+        exactly the same way the `tab()` and `safe()` contract methods do it.
+
+        Args:
+            from_id: Id of the first cup to scan.
+            to_id: Id of the last cup to scan. If not specified, `cupi()` is used.
+            changed_since_block: If specified, only cups opened or modified in this block
+                or later (see `cup_ids_changed()`) get scanned.
+            block_number: Block the cups should be scanned at. If not specified, the latest block is used.
+            parallelism: Maximum number of batches being executed concurrently.
+            batch_size: Maximum number of calls sent in one JSON-RPC batch request.
+
+        Returns:
+            List of cup details, ordered by cup id.
+        """
+        assert(isinstance(from_id, int))
+        assert(isinstance(to_id, int) or (to_id is None))
+        assert(isinstance(changed_since_block, int) or (changed_since_block is None))
+        assert(isinstance(block_number, int) or (block_number is None))
+        assert(isinstance(parallelism, int))
+        assert(parallelism > 0)
+
+        if block_number is None:
+            block_number = self.web3.eth.blockNumber
+
+        if to_id is None:
+            to_id = self._contract.functions.cupi().call(block_identifier=block_number)
+
+        if changed_since_block is None:
+            cup_ids = list(range(from_id, to_id + 1))
+        else:
+            cup_ids = [cup_id for cup_id in self.cup_ids_changed(changed_since_block, block_number)
+                       if from_id <= cup_id <= to_id]
+
+        cups = self._cups(cup_ids, block_number, parallelism, batch_size)
+        return self._cup_statuses(cups, block_number)
+
+    def cup_ids_changed(self, from_block: int, to_block: int) -> List[int]:
+        """Get ids of cups opened or modified in a range of blocks.
+
+        The ids are extracted from `LogNewCup` events and from `LogNote` events of all
+        the methods which modify a cup (`lock`, `free`, `draw`, `wipe`, `give`, `shut` and `bite`).
+
+        Please note that the debt and the safety of every cup can change without any of these events,
+        as they depend on the internal debt price, the reference price and the liquidation ratio.
+
+        Args:
+            from_block: First block of the range.
+            to_block: Last block of the range.
+
+        Returns:
+            Sorted list of ids of the cups opened or modified in the range.
+        """
+        assert(isinstance(from_block, int))
+        assert(isinstance(to_block, int))
+
+        new_cup_topic = bytes(self.web3.sha3(text="LogNewCup(address,bytes32)"))
+        # `LogNote` events have the method selector, padded to 32 bytes, as their first topic
+        note_topics = set(bytes(self.web3.sha3(text=f"{method}(bytes32{suffix})"))[0:4] + bytes(28)
+                          for method, suffix in [('lock', ',uint256'), ('free', ',uint256'), ('draw', ',uint256'),
+                                                 ('wipe', ',uint256'), ('give', ',address'), ('shut', ''),
+                                                 ('bite', '')])
+
+        topic_filter = [['0x' + topic.hex() for topic in [new_cup_topic] + sorted(note_topics)]]
+        logs = self.log_fetcher.fetch_raw(self.web3, self.address.address, topic_filter, from_block, to_block)
+
+        cup_ids = set()
+        for log in logs:
+            topics = [bytes(topic) for topic in log['topics']]
+            if len(topics) == 2 and topics[0] == new_cup_topic:
+                cup_ids.add(bytes_to_int(bytes(HexBytes(log['data']))[0:32]))
+            elif len(topics) == 4 and topics[0] in note_topics:
+                cup_ids.add(bytes_to_int(topics[2]))
+
+        return sorted(cup_ids)
+
+    def _cups(self, cup_ids: list, block_number: int, parallelism: int, batch_size: int = 500) -> List[Cup]:
+        def fetch(batch: list) -> list:
+            multicall = Multicall(self.web3, block_identifier=block_number, batch_size=batch_size)
+            for cup_id in batch:
+                multicall.add(self, 'cups', [int_to_bytes32(cup_id)])
+
+            return [Cup(cup_id, Address(array[0]), Wad(array[1]), Wad(array[2]))
+                    for cup_id, array in zip(batch, multicall.execute())]
+
+        batches = [cup_ids[i:i + batch_size] for i in range(0, len(cup_ids), batch_size)]
+        with ThreadPoolExecutor(max_workers=parallelism) as executor:
+            return [cup for cups in executor.map(fetch, batches) for cup in cups]
+
+    def _cup_statuses(self, cups: List[Cup], block_number: int) -> List[CupStatus]:
+        multicall = Multicall(self.web3, block_identifier=block_number)
+        multicall.add(self, 'chi', [])
+        multicall.add(self, 'tag', [])
+        multicall.add(self, 'mat', [])
+        multicall.add(Vox(self.web3, self.vox()), 'par', [])
+        chi, tag, mat, par = multicall.execute()
+
+        def status(cup: Cup) -> CupStatus:
+            tab = _rmul(cup.art.value, chi)
+            pro = _rmul(tag, cup.ink.value)
+            con = _rmul(par, tab)
+            return CupStatus(cup, Wad(tab), pro >= _rmul(con, mat))
+
+        return list(map(status, cups))
+
     def join(self, amount_in_skr: Wad) -> Transact:
         """Buy SKR for GEMs.
 
@@ -643,6 +782,68 @@ class Tub(Contract):
         return f"Tub('{self.address}')"
 
 
+class CupTable:
+    """Keeps an up-to-date local table of all cups of a `Tub`.
+
+    The first `update()` scans all cups. Every subsequent one only re-reads cups opened or modified
+    since the previous update (based on `LogNewCup` and `LogNote` events), and recalculates debt
+    and safety of all cups locally. It is meant to be called on every new block, i.e. from
+    `Lifecycle.on_block()`.
+
+    Attributes:
+        tub: The `Tub` to keep the cup table of.
+        parallelism: Maximum number of batches being executed concurrently during scans.
+    """
+
+    def __init__(self, tub: Tub, parallelism: int = 4):
+        assert(isinstance(tub, Tub))
+        assert(isinstance(parallelism, int))
+
+        self.tub = tub
+        self.parallelism = parallelism
+        self.last_block_number = None
+        self._cups = {}
+
+    def update(self, block_number: Optional[int] = None) -> List[int]:
+        """Brings the table up to date with the given block.
+
+        Args:
+            block_number: Block to update the table to. If not specified, the latest block is used.
+
+        Returns:
+            Ids of the cups which have been re-read from the `Tub`.
+        """
+        assert(isinstance(block_number, int) or (block_number is None))
+
+        if block_number is None:
+            block_number = self.tub.web3.eth.blockNumber
+
+        if self.last_block_number is not None and block_number <= self.last_block_number:
+            return []
+
+        if self.last_block_number is None:
+            statuses = self.tub.scan_cups(block_number=block_number, parallelism=self.parallelism)
+            cup_ids = [status.cup.cup_id for status in statuses]
+        else:
+            cup_ids = self.tub.cup_ids_changed(self.last_block_number + 1, block_number)
+            cups = self.tub._cups(cup_ids, block_number, self.parallelism)
+            unchanged = [status.cup for cup_id, status in self._cups.items() if cup_id not in cup_ids]
+            statuses = self.tub._cup_statuses(cups + unchanged, block_number)
+
+        self._cups.update({status.cup.cup_id: status for status in statuses})
+        self.last_block_number = block_number
+
+        return cup_ids
+
+    def cups(self) -> Dict[int, CupStatus]:
+        """Returns all cups in the table, keyed by cup id."""
+        return dict(self._cups)
+
+    def unsafe_cups(self) -> List[CupStatus]:
+        """Returns all cups which are not safe, ordered by cup id."""
+        return [status for _, status in sorted(self._cups.items()) if not status.safe]
+
+
 class Tap(Contract):
     """A client for the `Tap` contract.
 
@@ -15,16 +15,31 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Tuple
+import multiprocessing
+import os
+import threading
+from multiprocessing.pool import Pool
+from typing import List, Tuple
 
+from eth_account import Account
 from eth_account.messages import defunct_hash_message
 from eth_utils import encode_hex
 from web3 import Web3
 
 from pymaker import Address
+from pymaker.batch import batch
 from pymaker.keys import _registered_accounts
 from pymaker.util import bytes_to_hexstring
 
+# below this number of messages, starting and feeding the worker processes costs more than it saves
+SIGNING_POOL_THRESHOLD = 16
+
+_signing_pools = {}
+_signing_pools_lock = threading.Lock()
+
+# private key of the account the current worker process signs messages for
+_worker_private_key = None
+
 
 def eth_sign(message: bytes, web3: Web3):
     assert(isinstance(message, bytes))
@@ -43,14 +58,82 @@ def eth_sign(message: bytes, web3: Web3):
             "eth_sign", [web3.eth.defaultAccount, encode_hex(message)],
         ))
 
-        # for `EthereumJS TestRPC/v2.2.1/ethereum-js`
-        if signature.endswith("00"):
-            signature = signature[:-2] + "1b"
+        return _normalize_rpc_signature(signature)
 
-        if signature.endswith("01"):
-            signature = signature[:-2] + "1c"
 
-        return signature
+def sign_many(messages: List[bytes], web3: Web3) -> List[str]:
+    """Signs many messages with the `web3.eth.defaultAccount` account at once.
+
+    If the account has been registered with `pymaker.keys.register_private_key()`, messages get signed
+    locally, spread over a pool of worker processes (one per CPU) if there are at least
+    `SIGNING_POOL_THRESHOLD` of them. Otherwise all the `eth_sign` requests get sent
+    to the node as one JSON-RPC batch request.
+
+    Worker processes are started with the `spawn` method, so like with any other use of `multiprocessing`
+    the main module of the program has to be safe to import (i.e. guarded by `if __name__ == '__main__'`).
+
+    Args:
+        messages: Messages to sign.
+        web3: An instance of `Web` from `web3.py`.
+
+    Returns:
+        Signatures as hex strings starting with `0x`, in the same order as `messages`.
+    """
+    assert(isinstance(messages, list))
+    assert(all(isinstance(message, bytes) for message in messages))
+    assert(isinstance(web3, Web3))
+
+    local_account = _registered_accounts.get((web3, Address(web3.eth.defaultAccount)))
+
+    if local_account:
+        if len(messages) >= SIGNING_POOL_THRESHOLD and (os.cpu_count() or 1) > 1:
+            chunk_size = max(1, len(messages) // (4 * os.cpu_count()))
+            return _get_signing_pool(local_account).map(_sign_in_worker, messages, chunksize=chunk_size)
+        else:
+            return [_sign_message(message, local_account.privateKey) for message in messages]
+
+    else:
+        with batch(web3) as b:
+            futures = [b.request("eth_sign", [web3.eth.defaultAccount, encode_hex(message)]) for message in messages]
+
+        return [_normalize_rpc_signature(bytes_to_hexstring(future.result())) for future in futures]
+
+
+def _sign_message(message: bytes, private_key) -> str:
+    return Account.signHash(defunct_hash_message(primitive=message), private_key=private_key).signature.hex()
+
+
+def _sign_in_worker(message: bytes) -> str:
+    return _sign_message(message, _worker_private_key)
+
+
+def _init_signing_worker(private_key):
+    global _worker_private_key
+    _worker_private_key = private_key
+
+
+def _get_signing_pool(account) -> Pool:
+    # There is one pool per account, so its private key gets passed to each worker process only once,
+    # when the process starts. Processes are spawned rather than forked, as forking a process which runs
+    # many threads (i.e. `Transact.executor`) can leave the children deadlocked on locks held at that time.
+    with _signing_pools_lock:
+        if account.address not in _signing_pools:
+            context = multiprocessing.get_context('spawn')
+            _signing_pools[account.address] = context.Pool(os.cpu_count(), initializer=_init_signing_worker,
+                                                           initargs=(account.privateKey,))
+
+        return _signing_pools[account.address]
+
+
+def _normalize_rpc_signature(signature: str) -> str:
+    # for `EthereumJS TestRPC/v2.2.1/ethereum-js`
+    if signature.endswith("00"):
+        signature = signature[:-2] + "1b"
+
+    if signature.endswith("01"):
+        signature = signature[:-2] + "1c"
+
+    return signature
 
 
 def to_vrs(signature: str) -> Tuple[int, bytes, bytes]:
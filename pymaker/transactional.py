@@ -80,12 +80,13 @@ class TxManager(Contract):
     def owner(self) -> Address:
         return Address(self._contract.call().owner())
 
-    def execute(self, tokens: List[Address], invocations: List[Invocation]) -> Transact:
+    def execute(self, tokens: List[Address], invocations: List[Invocation], result_function=None) -> Transact:
         """Executes multiple contract methods in one Ethereum transaction.
 
         Args:
             tokens: List of addresses of ERC20 token the invocations should be able to access.
             invocations: A list of invocations (contract methods) to be executed.
+            result_function: Optional function returning `receipt.result` of the transaction.
 
         Returns:
             A :py:class:`pymaker.Transact` instance, which can be used to trigger the transaction.
@@ -104,8 +105,10 @@ class TxManager(Contract):
 
         assert(isinstance(tokens, list))
         assert(isinstance(invocations, list))
+        assert(callable(result_function) or (result_function is None))
 
-        return Transact(self, self.web3, self.abi, self.address, self._contract, 'execute', [token_addresses(), script()])
+        return Transact(self, self.web3, self.abi, self.address, self._contract, 'execute', [token_addresses(), script()],
+                        None, result_function)
 
     def __repr__(self):
         return f"TxManager('{self.address}')"
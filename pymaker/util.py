@@ -42,17 +42,30 @@ def http_response_summary(response) -> str:
     return f"{response.status_code} {response.reason} ({text})"
 
 
+_event_loops = threading.local()
+
+
 def synchronize(futures) -> list:
     if len(futures) > 0:
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(asyncio.gather(*futures, loop=loop))
-        finally:
-            loop.close()
+        # each thread keeps reusing its own event loop, so it does not get created and closed on every call
+        loop = getattr(_event_loops, 'loop', None)
+        if loop is None or loop.is_closed():
+            loop = _event_loops.loop = asyncio.new_event_loop()
+
+        return loop.run_until_complete(asyncio.gather(*futures, loop=loop))
     else:
         return []
 
 
+def _close_event_loop():
+    # closes the event loop `synchronize()` has been reusing in the current thread, if there is one,
+    # has to be called before short-lived threads finish, as otherwise their loops would never get closed
+    loop = getattr(_event_loops, 'loop', None)
+    if loop is not None:
+        _event_loops.loop = None
+        loop.close()
+
+
 def eth_balance(web3: Web3, address) -> Wad:
     return Wad(web3.eth.getBalance(address.address))
 
@@ -131,11 +144,14 @@ class AsyncCallback:
         """
         if self.thread is None or not self.thread.is_alive():
             def thread_target():
-                if on_start is not None:
-                    on_start()
-                self.callback()
-                if on_finish is not None:
-                    on_finish()
+                try:
+                    if on_start is not None:
+                        on_start()
+                    self.callback()
+                    if on_finish is not None:
+                        on_finish()
+                finally:
+                    _close_event_loop()
 
             self.thread = threading.Thread(target=thread_target)
             self.thread.start()
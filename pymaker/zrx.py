@@ -23,13 +23,16 @@ from pprint import pformat
 from typing import List, Optional
 
 import requests
+from eth_utils import keccak
 from hexbytes import HexBytes
 from web3 import Web3
 from web3.utils.events import get_event_data
 
 from pymaker import Contract, Address, Transact
+from pymaker.multicall import Multicall
 from pymaker.numeric import Wad
-from pymaker.sign import eth_sign, to_vrs
+from pymaker.sign import sign_many, to_vrs
+from pymaker.tightly_packed import encode_address, encode_uint256
 from pymaker.token import ERC20Token
 from pymaker.util import bytes_to_hexstring, hexstring_to_bytes, http_response_summary
 
@@ -71,6 +74,7 @@ class Order:
         self.ec_signature_r = ec_signature_r
         self.ec_signature_s = ec_signature_s
         self.ec_signature_v = ec_signature_v
+        self._order_hash = None
 
     # this is not a proper 0x order_id, it's just so `OrderBookManager` can uniquely identify orders
     @property
@@ -149,6 +153,21 @@ class Order:
             }
         }
 
+    def _hashed_fields(self) -> tuple:
+        # all the fields the order hash depends on, so a cached hash can be told apart from a stale one
+        return (self.maker,
+                self.taker,
+                self.maker_fee,
+                self.taker_fee,
+                self.pay_token,
+                self.pay_amount,
+                self.buy_token,
+                self.buy_amount,
+                self.salt,
+                self.fee_recipient,
+                self.expiration,
+                self.exchange_contract_address)
+
     def __eq__(self, other):
         assert(isinstance(other, Order))
         return self.maker == other.maker and \
@@ -190,7 +209,7 @@ class Order:
                f" '{self.exchange_contract_address}', '{self.salt}')"
 
     def __repr__(self):
-        return pformat(vars(self))
+        return pformat({key: value for key, value in vars(self).items() if key != '_order_hash'})
 
 
 class LogCancel:
@@ -322,7 +341,7 @@ class ZrxExchange(Contract):
         for token in tokens + [ERC20Token(web3=self.web3, address=self.zrx_token())]:
             approval_function(token, self.token_transfer_proxy(), '0x Exchange contract')
 
-    def past_fill(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogFill]:
+    def past_fill(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogFill]:
         """Synchronously retrieve past LogFill events.
 
         `LogFill` events are emitted by the 0x contract every time someone fills an order.
@@ -330,16 +349,19 @@ class ZrxExchange(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogFill` events represented as :py:class:`pymaker.zrx.LogFill` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'LogFill', LogFill, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'LogFill', LogFill, number_of_past_blocks, event_filter, stream)
 
-    def past_cancel(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogCancel]:
+    def past_cancel(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogCancel]:
         """Synchronously retrieve past LogCancel events.
 
         `LogCancel` events are emitted by the 0x contract every time someone cancels an order.
@@ -347,14 +369,17 @@ class ZrxExchange(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogCancel` events represented as :py:class:`pymaker.zrx.LogCancel` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'LogCancel', LogCancel, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'LogCancel', LogCancel, number_of_past_blocks, event_filter, stream)
 
     def create_order(self,
                      pay_token: Address,
@@ -404,6 +429,9 @@ class ZrxExchange(Contract):
     def get_order_hash(self, order: Order) -> str:
         """Calculates hash of an order.
 
+        The hash is calculated locally, the same way the `getOrderHash` method of the exchange
+        contract does, and gets cached on the order until any of its fields changes.
+
         Args:
             order: Order you want to calculate the hash of.
 
@@ -415,8 +443,24 @@ class ZrxExchange(Contract):
         # the hash depends on the exchange contract address as well
         assert(order.exchange_contract_address == self.address)
 
-        result = self._contract.call().getOrderHash(self._order_addresses(order), self._order_values(order))
-        return bytes_to_hexstring(result)
+        hashed_fields = order._hashed_fields()
+        if order._order_hash is None or order._order_hash[0] != hashed_fields:
+            order_hash = keccak(encode_address(self.address) +
+                                encode_address(order.maker) +
+                                encode_address(order.taker) +
+                                encode_address(order.pay_token) +
+                                encode_address(order.buy_token) +
+                                encode_address(order.fee_recipient) +
+                                encode_uint256(order.pay_amount.value) +
+                                encode_uint256(order.buy_amount.value) +
+                                encode_uint256(order.maker_fee.value) +
+                                encode_uint256(order.taker_fee.value) +
+                                encode_uint256(order.expiration) +
+                                encode_uint256(order.salt))
+
+            order._order_hash = (hashed_fields, bytes_to_hexstring(order_hash))
+
+        return order._order_hash[1]
 
     def get_unavailable_buy_amount(self, order: Order) -> Wad:
         """Return the order amount which was either taken or cancelled.
@@ -432,6 +476,27 @@ class ZrxExchange(Contract):
 
         return Wad(self._contract.call().getUnavailableTakerTokenAmount(hexstring_to_bytes(self.get_order_hash(order))))
 
+    def get_unavailable_buy_amounts(self, orders: List[Order]) -> List[Wad]:
+        """Return the order amounts which were either taken or cancelled, for many orders at once.
+
+        All the `getUnavailableTakerTokenAmount` calls are executed together using
+        :py:class:`pymaker.multicall.Multicall`.
+
+        Args:
+            orders: Orders you want to get the unavailable amounts of.
+
+        Returns:
+            The unavailable amounts of the orders, in the same order as `orders`.
+        """
+        assert(isinstance(orders, list))
+
+        multicall = Multicall(self.web3)
+        for order in orders:
+            assert(isinstance(order, Order))
+            multicall.add(self, 'getUnavailableTakerTokenAmount', [hexstring_to_bytes(self.get_order_hash(order))], Wad)
+
+        return multicall.execute()
+
     def sign_order(self, order: Order) -> Order:
         """Signs an order so it can be submitted to the relayer.
 
@@ -446,7 +511,28 @@ class ZrxExchange(Contract):
         """
         assert(isinstance(order, Order))
 
-        signature = eth_sign(hexstring_to_bytes(self.get_order_hash(order)), self.web3)
+        return self.sign_orders([order])[0]
+
+    def sign_orders(self, orders: List[Order]) -> List[Order]:
+        """Signs many orders at once, see `pymaker.sign.sign_many()`.
+
+        Orders will be signed by the `web3.eth.defaultAccount` account.
+
+        Args:
+            orders: Orders you want to sign.
+
+        Returns:
+            Signed orders, in the same order as `orders`.
+        """
+        assert(isinstance(orders, list))
+        assert(all(isinstance(order, Order) for order in orders))
+
+        signatures = sign_many([hexstring_to_bytes(self.get_order_hash(order)) for order in orders], self.web3)
+
+        return [self._signed_order(order, signature) for order, signature in zip(orders, signatures)]
+
+    @staticmethod
+    def _signed_order(order: Order, signature: str) -> Order:
         v, r, s = to_vrs(signature)
 
         signed_order = copy.copy(order)
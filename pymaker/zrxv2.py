@@ -24,14 +24,17 @@ from pprint import pformat
 from typing import List, Optional
 
 import requests
-from eth_abi import encode_single, encode_abi, decode_single
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.registry import registry
+from eth_utils import keccak
 from hexbytes import HexBytes
 from web3 import Web3
 from web3.utils.events import get_event_data
 
-from pymaker import Contract, Address, Transact
+from pymaker import Contract, Address, Transact, Receipt
+from pymaker.batch import batch
 from pymaker.numeric import Wad
-from pymaker.sign import eth_sign, to_vrs
+from pymaker.sign import sign_many, to_vrs
 from pymaker.token import ERC20Token
 from pymaker.util import bytes_to_hexstring, hexstring_to_bytes, http_response_summary
 
@@ -123,6 +126,7 @@ class Order:
         self.expiration = expiration
         self.exchange_contract_address = exchange_contract_address
         self.signature = signature
+        self._order_hash = None
 
     # this is not a proper 0x order_id, it's just so `OrderBookManager` can uniquely identify orders
     @property
@@ -196,6 +200,22 @@ class Order:
             "signature": self.signature
         }
 
+    def _hashed_fields(self) -> tuple:
+        # all the fields the order hash depends on, so a cached hash can be told apart from a stale one
+        return (self.sender,
+                self.maker,
+                self.taker,
+                self.maker_fee,
+                self.taker_fee,
+                self.pay_asset,
+                self.pay_amount,
+                self.buy_asset,
+                self.buy_amount,
+                self.salt,
+                self.fee_recipient,
+                self.expiration,
+                self.exchange_contract_address)
+
     def __eq__(self, other):
         assert(isinstance(other, Order))
         return self.sender == other.sender and \
@@ -234,6 +254,46 @@ class Order:
                f" '{self.pay_asset}', '{self.pay_amount}'," \
                f" '{self.exchange_contract_address}', '{self.salt}')"
 
+    def __repr__(self):
+        return pformat({key: value for key, value in vars(self).items() if key != '_order_hash'})
+
+
+class OrderInfo:
+    """Status of a 0x V2 order, as returned by the `getOrderInfo` method of the exchange contract.
+
+    Attributes:
+        status: Status of the order (`OrderInfo.FILLABLE`, `OrderInfo.CANCELLED` etc.).
+        order_hash: Hash of the order as a hex string starting with `0x`.
+        filled_buy_amount: The amount of the order which has been filled so far,
+            expressed in terms of the `buy_asset`.
+    """
+
+    INVALID = 0
+    INVALID_MAKER_ASSET_AMOUNT = 1
+    INVALID_TAKER_ASSET_AMOUNT = 2
+    FILLABLE = 3
+    EXPIRED = 4
+    FULLY_FILLED = 5
+    CANCELLED = 6
+
+    def __init__(self, status: int, order_hash: str, filled_buy_amount: Wad):
+        assert(isinstance(status, int))
+        assert(isinstance(order_hash, str))
+        assert(isinstance(filled_buy_amount, Wad))
+
+        self.status = status
+        self.order_hash = order_hash
+        self.filled_buy_amount = filled_buy_amount
+
+    def unavailable_buy_amount(self, order: Order) -> Wad:
+        """Returns the amount of `order` which is no longer available, either taken or cancelled."""
+        assert(isinstance(order, Order))
+
+        if self.status == OrderInfo.FILLABLE:
+            return self.filled_buy_amount
+        else:
+            return order.buy_amount
+
     def __repr__(self):
         return pformat(vars(self))
 
@@ -248,6 +308,41 @@ class LogCancel:
         self.order_hash = bytes_to_hexstring(log['args']['orderHash'])
         self.raw = log
 
+    @classmethod
+    def from_receipt(cls, receipt: Receipt):
+        assert(isinstance(receipt, Receipt))
+
+        if receipt.logs is not None:
+            for log in receipt.logs:
+                if len(log['topics']) > 0 and log['topics'][0] == HexBytes('0xdc47b3613d9fe400085f6dbdc99453462279057e6207385042827ed6b1a62cf7'):
+                    log_cancel_abi = [abi for abi in ZrxExchangeV2.abi if abi.get('name') == 'Cancel'][0]
+                    event_data = get_event_data(log_cancel_abi, log)
+
+                    yield LogCancel(event_data)
+
+    def __repr__(self):
+        return pformat(vars(self))
+
+
+class LogCancelUpTo:
+    def __init__(self, log):
+        self.maker = Address(log['args']['makerAddress'])
+        self.sender = Address(log['args']['senderAddress'])
+        self.order_epoch = int(log['args']['orderEpoch'])
+        self.raw = log
+
+    @classmethod
+    def from_receipt(cls, receipt: Receipt):
+        assert(isinstance(receipt, Receipt))
+
+        if receipt.logs is not None:
+            for log in receipt.logs:
+                if len(log['topics']) > 0 and log['topics'][0] == HexBytes('0x82af639571738f4ebd4268fb0363d8957ebe1bbb9e78dba5ebd69eed39b154f0'):
+                    log_cancel_up_to_abi = [abi for abi in ZrxExchangeV2.abi if abi.get('name') == 'CancelUpTo'][0]
+                    event_data = get_event_data(log_cancel_up_to_abi, log)
+
+                    yield LogCancelUpTo(event_data)
+
     def __repr__(self):
         return pformat(vars(self))
 
@@ -278,6 +373,16 @@ class LogFill:
 
             return LogFill(event_data)
 
+    @classmethod
+    def from_receipt(cls, receipt: Receipt):
+        assert(isinstance(receipt, Receipt))
+
+        if receipt.logs is not None:
+            for log in receipt.logs:
+                log_fill = LogFill.from_event(dict(log))
+                if log_fill is not None:
+                    yield log_fill
+
     def __eq__(self, other):
         assert(isinstance(other, LogFill))
         return self.__dict__ == other.__dict__
@@ -304,6 +409,35 @@ class ZrxExchangeV2(Contract):
 
     ORDER_INFO_TYPE = '(address,address,address,address,uint256,uint256,uint256,uint256,uint256,uint256,bytes,bytes)'
 
+    # maximum number of orders whose status gets fetched in a single `getOrdersInfo` call, each order takes
+    # around 15000 gas so the call stays well within the gas limit even for orders with long asset data
+    ORDERS_INFO_CHUNK_SIZE = 100
+
+    _GET_ORDER_INFO_SELECTOR = keccak(text=f"getOrderInfo({ORDER_INFO_TYPE})")[0:4]
+    _GET_ORDERS_INFO_SELECTOR = keccak(text=f"getOrdersInfo({ORDER_INFO_TYPE}[])")[0:4]
+    _FILL_ORDER_SELECTOR = keccak(text=f"fillOrder({ORDER_INFO_TYPE},uint256,bytes)")[0:4]
+    _CANCEL_ORDER_SELECTOR = keccak(text=f"cancelOrder({ORDER_INFO_TYPE})")[0:4]
+    _BATCH_FILL_ORDERS_SELECTOR = keccak(text=f"batchFillOrders({ORDER_INFO_TYPE}[],uint256[],bytes[])")[0:4]
+    _MARKET_SELL_ORDERS_SELECTOR = keccak(text=f"marketSellOrders({ORDER_INFO_TYPE}[],uint256,bytes[])")[0:4]
+    _MARKET_BUY_ORDERS_SELECTOR = keccak(text=f"marketBuyOrders({ORDER_INFO_TYPE}[],uint256,bytes[])")[0:4]
+    _BATCH_CANCEL_ORDERS_SELECTOR = keccak(text=f"batchCancelOrders({ORDER_INFO_TYPE}[])")[0:4]
+
+    _order_encoder = registry.get_encoder(f"({ORDER_INFO_TYPE})")
+    _orders_encoder = registry.get_encoder(f"({ORDER_INFO_TYPE}[])")
+    _fill_order_encoder = registry.get_encoder(f"({ORDER_INFO_TYPE},uint256,bytes)")
+    _batch_fill_orders_encoder = registry.get_encoder(f"({ORDER_INFO_TYPE}[],uint256[],bytes[])")
+    _market_orders_encoder = registry.get_encoder(f"({ORDER_INFO_TYPE}[],uint256,bytes[])")
+    _order_info_decoder = registry.get_decoder("((uint8,bytes32,uint256))")
+    _orders_info_decoder = registry.get_decoder("((uint8,bytes32,uint256)[])")
+
+    # see <https://github.com/0xProject/0x-protocol-specification/blob/master/v2/v2-specification.md#hashing-an-order>
+    EIP712_DOMAIN_SCHEMA_HASH = keccak(text="EIP712Domain(string name,string version,address verifyingContract)")
+    EIP712_ORDER_SCHEMA_HASH = keccak(text="Order(address makerAddress,address takerAddress,"
+                                           "address feeRecipientAddress,address senderAddress,"
+                                           "uint256 makerAssetAmount,uint256 takerAssetAmount,"
+                                           "uint256 makerFee,uint256 takerFee,uint256 expirationTimeSeconds,"
+                                           "uint256 salt,bytes makerAssetData,bytes takerAssetData)")
+
     @staticmethod
     def deploy(web3: Web3, zrx_asset: str):
         """Deploy a new instance of the 0x `Exchange` contract.
@@ -325,6 +459,10 @@ class ZrxExchangeV2(Contract):
         self.web3 = web3
         self.address = address
         self._contract = self._get_contract(web3, self.abi, address)
+        self._domain_separator = keccak(self.EIP712_DOMAIN_SCHEMA_HASH +
+                                        keccak(text="0x Protocol") +
+                                        keccak(text="2") +
+                                        hexstring_to_bytes(address.address).rjust(32, b'\x00'))
 
     def zrx_asset(self) -> str:
         """Get the asset data of the ZRX token contract associated with this `ExchangeV2` contract.
@@ -373,7 +511,7 @@ class ZrxExchangeV2(Contract):
         for token in tokens:  # TODO  + [ERC20Token(web3=self.web3, address=self.zrx_token())]
             approval_function(token, self.asset_transfer_proxy(ERC20Asset.ID), '0x ERC20Proxy contract')
 
-    def past_fill(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogFill]:
+    def past_fill(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogFill]:
         """Synchronously retrieve past LogFill events.
 
         `LogFill` events are emitted by the 0x contract every time someone fills an order.
@@ -381,16 +519,19 @@ class ZrxExchangeV2(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogFill` events represented as :py:class:`pymaker.zrx.LogFill` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'Fill', LogFill, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'Fill', LogFill, number_of_past_blocks, event_filter, stream)
 
-    def past_cancel(self, number_of_past_blocks: int, event_filter: dict = None) -> List[LogCancel]:
+    def past_cancel(self, number_of_past_blocks: int, event_filter: dict = None, stream: bool = False) -> List[LogCancel]:
         """Synchronously retrieve past LogCancel events.
 
         `LogCancel` events are emitted by the 0x contract every time someone cancels an order.
@@ -398,14 +539,17 @@ class ZrxExchangeV2(Contract):
         Args:
             number_of_past_blocks: Number of past Ethereum blocks to retrieve the events from.
             event_filter: Filter which will be applied to returned events.
+            stream: If `True`, a generator yielding the events in order gets returned instead
+                of a list, so the events do not have to fit in memory all at once.
 
         Returns:
             List of past `LogCancel` events represented as :py:class:`pymaker.zrx.LogCancel` class.
         """
         assert(isinstance(number_of_past_blocks, int))
         assert(isinstance(event_filter, dict) or (event_filter is None))
+        assert(isinstance(stream, bool))
 
-        return self._past_events(self._contract, 'Cancel', LogCancel, number_of_past_blocks, event_filter)
+        return self._past_events(self._contract, 'Cancel', LogCancel, number_of_past_blocks, event_filter, stream)
 
     def create_order(self,
                      pay_asset: Asset,
@@ -454,18 +598,18 @@ class ZrxExchangeV2(Contract):
     def _get_order_info(self, order):
         assert(isinstance(order, Order))
 
-        method_signature = self.web3.sha3(text=f"getOrderInfo({self.ORDER_INFO_TYPE})")[0:4]
-        method_parameters = encode_single(f"({self.ORDER_INFO_TYPE})", [self._order_tuple(order)])
-
-        request = bytes_to_hexstring(method_signature + method_parameters)
+        request = bytes_to_hexstring(self._GET_ORDER_INFO_SELECTOR + self._order_encoder([self._order_tuple(order)]))
         response = self.web3.eth.call({'to': self.address.address, 'data': request})
-        response_decoded = decode_single("((uint8,bytes32,uint256))", response)
+        response_decoded = self._order_info_decoder(ContextFramesBytesIO(response))
 
         return response_decoded
 
     def get_order_hash(self, order: Order) -> str:
         """Calculates hash of an order.
 
+        The hash is calculated locally, following the EIP712 scheme used by the 0x V2 exchange
+        contract, and gets cached on the order until any of its fields changes.
+
         Args:
             order: Order you want to calculate the hash of.
 
@@ -477,7 +621,28 @@ class ZrxExchangeV2(Contract):
         # the hash depends on the exchange contract address as well
         assert(order.exchange_contract_address == self.address)
 
-        return bytes_to_hexstring(self._get_order_info(order)[0][1])
+        hashed_fields = order._hashed_fields()
+        if order._order_hash is None or order._order_hash[0] != hashed_fields:
+            order._order_hash = (hashed_fields, bytes_to_hexstring(self._eip712_order_hash(order)))
+
+        return order._order_hash[1]
+
+    def _eip712_order_hash(self, order: Order) -> bytes:
+        struct_hash = keccak(self.EIP712_ORDER_SCHEMA_HASH +
+                             hexstring_to_bytes(order.maker.address).rjust(32, b'\x00') +
+                             hexstring_to_bytes(order.taker.address).rjust(32, b'\x00') +
+                             hexstring_to_bytes(order.fee_recipient.address).rjust(32, b'\x00') +
+                             hexstring_to_bytes(order.sender.address).rjust(32, b'\x00') +
+                             order.pay_amount.value.to_bytes(32, byteorder='big') +
+                             order.buy_amount.value.to_bytes(32, byteorder='big') +
+                             order.maker_fee.value.to_bytes(32, byteorder='big') +
+                             order.taker_fee.value.to_bytes(32, byteorder='big') +
+                             order.expiration.to_bytes(32, byteorder='big') +
+                             order.salt.to_bytes(32, byteorder='big') +
+                             keccak(hexstring_to_bytes(order.pay_asset.serialize())) +
+                             keccak(hexstring_to_bytes(order.buy_asset.serialize())))
+
+        return keccak(b'\x19\x01' + self._domain_separator + struct_hash)
 
     def get_unavailable_buy_amount(self, order: Order) -> Wad:
         """Return the order amount which was either taken or cancelled.
@@ -493,16 +658,51 @@ class ZrxExchangeV2(Contract):
 
         order_info = self._get_order_info(order)[0]
 
-        if order_info[0] in [0,         # INVALID,                     // Default value
-                             1,         # INVALID_MAKER_ASSET_AMOUNT,  // Order does not have a valid maker asset amount
-                             2,         # INVALID_TAKER_ASSET_AMOUNT,  // Order does not have a valid taker asset amount
-                             4,         # EXPIRED,                     // Order has already expired
-                             5,         # FULLY_FILLED,                // Order is fully filled
-                             6]:        # CANCELLED                    // Order has been cancelled
-            return order.buy_amount
+        return OrderInfo(order_info[0], bytes_to_hexstring(order_info[1]), Wad(order_info[2])) \
+            .unavailable_buy_amount(order)
 
-        else:
-            return Wad(order_info[2])
+    def get_orders_info(self, orders: List[Order]) -> List[OrderInfo]:
+        """Return the status of many orders at once.
+
+        The statuses are fetched using the `getOrdersInfo` method of the exchange contract. Orders get
+        split into chunks of `ORDERS_INFO_CHUNK_SIZE`, so each call stays within the gas limit, and
+        all the chunks are sent to the node in a single JSON-RPC batch request.
+
+        Args:
+            orders: Orders you want to get the status of.
+
+        Returns:
+            List of :py:class:`pymaker.zrxv2.OrderInfo`, in the same order as `orders`.
+        """
+        assert(isinstance(orders, list))
+        assert(all(isinstance(order, Order) for order in orders))
+
+        chunks = [orders[i:i + self.ORDERS_INFO_CHUNK_SIZE] for i in range(0, len(orders), self.ORDERS_INFO_CHUNK_SIZE)]
+        with batch(self.web3) as b:
+            futures = [b.call({'to': self.address.address,
+                               'data': bytes_to_hexstring(self._GET_ORDERS_INFO_SELECTOR +
+                                                          self._orders_encoder([list(map(self._order_tuple, chunk))]))})
+                       for chunk in chunks]
+
+        return [OrderInfo(order_info[0], bytes_to_hexstring(order_info[1]), Wad(order_info[2]))
+                for future in futures
+                for order_info in self._orders_info_decoder(ContextFramesBytesIO(bytes(HexBytes(future.result()))))[0]]
+
+    def get_unavailable_buy_amounts(self, orders: List[Order]) -> List[Wad]:
+        """Return the order amounts which were either taken or cancelled, for many orders at once.
+
+        Uses `get_orders_info()`, so statuses of all the orders are fetched in one round trip to the node.
+
+        Args:
+            orders: Orders you want to get the unavailable amounts of.
+
+        Returns:
+            The unavailable amounts of the orders, in the same order as `orders`.
+        """
+        assert(isinstance(orders, list))
+
+        return [order_info.unavailable_buy_amount(order)
+                for order, order_info in zip(orders, self.get_orders_info(orders))]
 
     def sign_order(self, order: Order) -> Order:
         """Signs an order so it can be submitted to the relayer.
@@ -517,7 +717,28 @@ class ZrxExchangeV2(Contract):
         """
         assert(isinstance(order, Order))
 
-        signature = eth_sign(hexstring_to_bytes(self.get_order_hash(order)), self.web3)
+        return self.sign_orders([order])[0]
+
+    def sign_orders(self, orders: List[Order]) -> List[Order]:
+        """Signs many orders at once, see `pymaker.sign.sign_many()`.
+
+        Orders will be signed by the `web3.eth.defaultAccount` account.
+
+        Args:
+            orders: Orders you want to sign.
+
+        Returns:
+            Signed orders, in the same order as `orders`.
+        """
+        assert(isinstance(orders, list))
+        assert(all(isinstance(order, Order) for order in orders))
+
+        signatures = sign_many([hexstring_to_bytes(self.get_order_hash(order)) for order in orders], self.web3)
+
+        return [self._signed_order(order, signature) for order, signature in zip(orders, signatures)]
+
+    @staticmethod
+    def _signed_order(order: Order, signature: str) -> Order:
         v, r, s = to_vrs(signature)
 
         signed_order = copy.copy(order)
@@ -540,12 +761,11 @@ class ZrxExchangeV2(Contract):
         assert(isinstance(order, Order))
         assert(isinstance(fill_buy_amount, Wad))
 
-        method_signature = self.web3.sha3(text=f"fillOrder({self.ORDER_INFO_TYPE},uint256,bytes)")[0:4]
-        method_parameters = encode_single(f"({self.ORDER_INFO_TYPE},uint256,bytes)", [self._order_tuple(order),
-                                                                                      fill_buy_amount.value,
-                                                                                      hexstring_to_bytes(order.signature)])
+        method_parameters = self._fill_order_encoder([self._order_tuple(order),
+                                                      fill_buy_amount.value,
+                                                      hexstring_to_bytes(order.signature)])
 
-        request = bytes_to_hexstring(method_signature + method_parameters)
+        request = bytes_to_hexstring(self._FILL_ORDER_SELECTOR + method_parameters)
 
         return Transact(self, self.web3, self.abi, self.address, self._contract, None,
                         [request])
@@ -561,13 +781,161 @@ class ZrxExchangeV2(Contract):
         """
         assert(isinstance(order, Order))
 
-        method_signature = self.web3.sha3(text=f"cancelOrder({self.ORDER_INFO_TYPE})")[0:4]
-        method_parameters = encode_single(f"({self.ORDER_INFO_TYPE})", [self._order_tuple(order)])
+        request = bytes_to_hexstring(self._CANCEL_ORDER_SELECTOR + self._order_encoder([self._order_tuple(order)]))
+
+        return Transact(self, self.web3, self.abi, self.address, self._contract, None,
+                        [request])
+
+    def batch_fill_orders(self, orders: List[Order], fill_buy_amounts: List[Wad]) -> Transact:
+        """Fills many orders in one transaction.
+
+        Args:
+            orders: The orders to be filled.
+            fill_buy_amounts: The amounts (in terms of `buy_asset` of each order) to be filled.
+
+        Returns:
+            A :py:class:`pymaker.Transact` instance, which can be used to trigger the transaction.
+            The `result` of its receipt is a list with a :py:class:`pymaker.zrxv2.LogFill` for each
+            of the `orders`, or `None` for the orders which have not been filled.
+        """
+        assert(isinstance(orders, list))
+        assert(isinstance(fill_buy_amounts, list))
+        assert(all(isinstance(order, Order) for order in orders))
+        assert(all(isinstance(fill_buy_amount, Wad) for fill_buy_amount in fill_buy_amounts))
+        assert(len(orders) == len(fill_buy_amounts))
+
+        method_parameters = self._batch_fill_orders_encoder([list(map(self._order_tuple, orders)),
+                                                             [fill_buy_amount.value for fill_buy_amount in fill_buy_amounts],
+                                                             [hexstring_to_bytes(order.signature) for order in orders]])
+
+        request = bytes_to_hexstring(self._BATCH_FILL_ORDERS_SELECTOR + method_parameters)
+
+        return Transact(self, self.web3, self.abi, self.address, self._contract, None,
+                        [request], result_function=self._fills_result_function(orders))
+
+    def market_sell_orders(self, orders: List[Order], fill_buy_amount: Wad) -> Transact:
+        """Fills orders one after another until `fill_buy_amount` has been sold, in one transaction.
+
+        All the orders need to have the same `buy_asset`, which is the asset being sold.
+
+        Args:
+            orders: The orders to be filled, in the order they should be filled in.
+            fill_buy_amount: The total amount (in terms of `buy_asset` of the orders) to be sold.
+
+        Returns:
+            A :py:class:`pymaker.Transact` instance, which can be used to trigger the transaction.
+            The `result` of its receipt is a list with a :py:class:`pymaker.zrxv2.LogFill` for each
+            of the `orders`, or `None` for the orders which have not been filled.
+        """
+        assert(isinstance(fill_buy_amount, Wad))
+
+        return self._market_orders(self._MARKET_SELL_ORDERS_SELECTOR, orders, fill_buy_amount)
+
+    def market_buy_orders(self, orders: List[Order], fill_pay_amount: Wad) -> Transact:
+        """Fills orders one after another until `fill_pay_amount` has been bought, in one transaction.
+
+        All the orders need to have the same `pay_asset`, which is the asset being bought.
+
+        Args:
+            orders: The orders to be filled, in the order they should be filled in.
+            fill_pay_amount: The total amount (in terms of `pay_asset` of the orders) to be bought.
+
+        Returns:
+            A :py:class:`pymaker.Transact` instance, which can be used to trigger the transaction.
+            The `result` of its receipt is a list with a :py:class:`pymaker.zrxv2.LogFill` for each
+            of the `orders`, or `None` for the orders which have not been filled.
+        """
+        assert(isinstance(fill_pay_amount, Wad))
+
+        return self._market_orders(self._MARKET_BUY_ORDERS_SELECTOR, orders, fill_pay_amount)
+
+    def _market_orders(self, method_signature: bytes, orders: List[Order], fill_amount: Wad) -> Transact:
+        assert(isinstance(orders, list))
+        assert(all(isinstance(order, Order) for order in orders))
+
+        method_parameters = self._market_orders_encoder([list(map(self._order_tuple, orders)),
+                                                         fill_amount.value,
+                                                         [hexstring_to_bytes(order.signature) for order in orders]])
 
         request = bytes_to_hexstring(method_signature + method_parameters)
 
         return Transact(self, self.web3, self.abi, self.address, self._contract, None,
-                        [request])
+                        [request], result_function=self._fills_result_function(orders))
+
+    def _fills_result_function(self, orders: List[Order]):
+        order_hashes = list(map(self.get_order_hash, orders))
+
+        def result_function(receipt: Receipt) -> List[Optional[LogFill]]:
+            # the same order can be passed more than once, in which case its fills get matched
+            # with its occurrences in the order they have been logged in
+            log_fills = {}
+            for log_fill in LogFill.from_receipt(receipt):
+                log_fills.setdefault(log_fill.order_hash, []).append(log_fill)
+
+            return [log_fills[order_hash].pop(0) if log_fills.get(order_hash) else None for order_hash in order_hashes]
+
+        return result_function
+
+    def batch_cancel_orders(self, orders: List[Order]) -> Transact:
+        """Cancels many orders in one transaction.
+
+        Args:
+            orders: Orders you want to cancel.
+
+        Returns:
+            A :py:class:`pymaker.Transact` instance, which can be used to trigger the transaction.
+            The `result` of its receipt is a list with a :py:class:`pymaker.zrxv2.LogCancel` for each
+            of the `orders`, or `None` for the orders which have not been cancelled.
+        """
+        assert(isinstance(orders, list))
+        assert(all(isinstance(order, Order) for order in orders))
+
+        request = bytes_to_hexstring(self._BATCH_CANCEL_ORDERS_SELECTOR +
+                                     self._orders_encoder([list(map(self._order_tuple, orders))]))
+
+        order_hashes = list(map(self.get_order_hash, orders))
+
+        def result_function(receipt: Receipt) -> List[Optional[LogCancel]]:
+            log_cancels = {log_cancel.order_hash: log_cancel for log_cancel in LogCancel.from_receipt(receipt)}
+            return [log_cancels.get(order_hash) for order_hash in order_hashes]
+
+        return Transact(self, self.web3, self.abi, self.address, self._contract, None,
+                        [request], result_function=result_function)
+
+    def cancel_orders_up_to(self, salt: int) -> Transact:
+        """Cancels all orders of `web3.eth.defaultAccount` with a salt lower than `salt`, in one transaction.
+
+        Orders created with `create_order()` use the current timestamp in milliseconds as their salt,
+        so passing `random_salt()` cancels all the orders created so far.
+
+        Args:
+            salt: Orders with a salt lower than this one get cancelled.
+
+        Returns:
+            A :py:class:`pymaker.Transact` instance, which can be used to trigger the transaction.
+            The `result` of its receipt is the :py:class:`pymaker.zrxv2.LogCancelUpTo` event.
+        """
+        assert(isinstance(salt, int))
+        assert(salt > 0)
+
+        # the exchange contract cancels orders with a salt lower than `targetOrderEpoch + 1`
+        return Transact(self, self.web3, self.abi, self.address, self._contract, 'cancelOrdersUpTo',
+                        [salt - 1], result_function=lambda receipt: next(LogCancelUpTo.from_receipt(receipt), None))
+
+    def get_order_epoch(self, maker: Address, sender: Address = _ZERO_ADDRESS) -> int:
+        """Returns the lowest salt an order of `maker` can have without being cancelled by `cancel_orders_up_to()`.
+
+        Args:
+            maker: Address of the order maker.
+            sender: Address of the order sender, orders created with `create_order()` have no sender.
+
+        Returns:
+            The order epoch of `maker`.
+        """
+        assert(isinstance(maker, Address))
+        assert(isinstance(sender, Address))
+
+        return self._contract.call().orderEpoch(maker.address, sender.address)
 
     @staticmethod
     def _order_tuple(order):
@@ -0,0 +1,110 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+from web3 import Web3
+from web3.providers import BaseProvider
+
+from pymaker.batch import batch
+from pymaker.deployment import Deployment
+from pymaker.numeric import Wad
+
+
+class StaticProvider(BaseProvider):
+    # a provider which is not an `HTTPProvider`, answering requests for the block number and the latest block only
+    def __init__(self):
+        self.requests = []
+
+    def make_request(self, method, params):
+        self.requests.append(method)
+
+        if method == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': len(self.requests), 'result': '0x5'}
+        elif method == 'eth_getBlockByNumber':
+            return {'jsonrpc': '2.0', 'id': len(self.requests), 'result': {'number': '0x5'}}
+        else:
+            return {'jsonrpc': '2.0', 'id': len(self.requests), 'error': {'code': -32601, 'message': 'Method not found'}}
+
+
+class TestBatch:
+    def test_should_return_same_results_as_web3(self, deployment: Deployment):
+        # given
+        receipt = deployment.gem.mint(Wad.from_number(1)).transact()
+        receipt_block_number = receipt.raw_receipt['blockNumber']
+        web3 = deployment.web3
+
+        # when
+        with batch(web3) as b:
+            block_number = b.get_block_number()
+            block = b.get_block(receipt_block_number)
+            block_by_hash = b.get_block(web3.eth.getBlock(receipt_block_number)['hash'])
+            transaction_count = b.get_transaction_count(deployment.our_address.address)
+            transaction_receipt = b.get_transaction_receipt(receipt.transaction_hash)
+            syncing = b.get_syncing()
+
+        # then
+        assert block_number.result() == web3.eth.blockNumber
+        assert block.result() == web3.eth.getBlock(receipt_block_number)
+        assert block_by_hash.result() == block.result()
+        assert transaction_count.result() == web3.eth.getTransactionCount(deployment.our_address.address)
+        assert transaction_receipt.result() == web3.eth.getTransactionReceipt(receipt.transaction_hash)
+        assert syncing.result() is False
+
+    def test_should_resolve_futures_only_after_the_batch(self, deployment: Deployment):
+        with batch(deployment.web3) as b:
+            block_number = b.get_block_number()
+
+            # expect
+            assert not block_number.done()
+
+        assert block_number.done()
+
+    def test_should_fail_only_the_failed_request(self, deployment: Deployment):
+        # when
+        with batch(deployment.web3) as b:
+            unknown = b.request('eth_unknownMethod', [])
+            block_number = b.get_block_number()
+
+        # then
+        with pytest.raises(ValueError):
+            unknown.result()
+        assert block_number.result() == deployment.web3.eth.blockNumber
+
+    def test_should_cancel_requests_if_block_raises(self, deployment: Deployment):
+        # when
+        with pytest.raises(RuntimeError):
+            with batch(deployment.web3) as b:
+                block_number = b.get_block_number()
+                raise RuntimeError("Failure")
+
+        # then
+        assert block_number.cancelled()
+
+    def test_should_send_requests_one_by_one_for_other_providers(self):
+        # given
+        provider = StaticProvider()
+        web3 = Web3(provider)
+
+        # when
+        with batch(web3) as b:
+            block_number = b.get_block_number()
+            block = b.get_block('latest')
+
+        # then
+        assert block_number.result() == 5
+        assert block.result()['number'] == 5
+        assert provider.requests == ['eth_blockNumber', 'eth_getBlockByNumber']
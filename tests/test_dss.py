@@ -23,7 +23,7 @@ from tests.helpers import time_travel_by, snapshot, reset
 from pymaker import Address
 from pymaker.auctions import Flipper
 from pymaker.deployment import DssDeployment
-from pymaker.dss import Cat, Ilk, Urn
+from pymaker.dss import Cat, Ilk, Urn, UrnIndex
 from pymaker.numeric import Ray, Wad, Rad
 
 
@@ -151,6 +151,63 @@ class TestPit:
         assert last_frob_event.urn.address == our_address
 
 
+class TestUrnIndex:
+    def test_should_match_vat(self, our_address, d: DssDeployment):
+        # given
+        collateral = d.collaterals[0]
+        assert collateral.adapter.join(Urn(our_address), Wad.from_number(3)).transact()
+        assert d.pit.frob(collateral.ilk, Wad.from_number(3), Wad(0)).transact()
+
+        # when
+        index = UrnIndex(d.pit, d.cat)
+        index.update()
+
+        # then
+        assert index.urns(collateral.ilk) == [d.vat.urn(collateral.ilk, our_address)]
+        assert index.urns(collateral.ilk)[0].ink == d.vat.urn(collateral.ilk, our_address).ink
+        assert index.urns(collateral.ilk)[0].art == d.vat.urn(collateral.ilk, our_address).art
+
+        # when
+        assert d.pit.frob(collateral.ilk, Wad(0), Wad.from_number(1)).transact()
+
+        # then
+        assert index.update() == 1
+        assert index.urns(collateral.ilk)[0].art == d.vat.urn(collateral.ilk, our_address).art
+        assert index.update() == 0
+
+    def test_unsafe_urns(self, our_address, d: DssDeployment):
+        # given
+        collateral = d.collaterals[0]
+        assert collateral.adapter.join(Urn(our_address), Wad.from_number(1)).transact()
+        assert d.pit.frob(collateral.ilk, Wad.from_number(1), Wad(10)).transact()
+        index = UrnIndex(d.pit, d.cat)
+        index.update()
+
+        # when
+        urn = d.vat.urn(collateral.ilk, our_address)
+        rate = d.vat.ilk(collateral.ilk.name).rate
+        spot = d.pit.spot(collateral.ilk)
+
+        # then
+        assert index.unsafe_urns(collateral.ilk, spot, rate) == []
+        assert index.unsafe_urns(collateral.ilk, Ray(0), rate) == [urn]
+
+    def test_should_bootstrap_from_checkpoint(self, our_address, d: DssDeployment, tmpdir):
+        # given
+        collateral = d.collaterals[0]
+        checkpoint_file = str(tmpdir.join("urns.json"))
+        index = UrnIndex(d.pit, d.cat, checkpoint_file=checkpoint_file)
+        index.update()
+
+        # when
+        restored_index = UrnIndex(d.pit, d.cat, checkpoint_file=checkpoint_file)
+
+        # then
+        assert restored_index.last_block_number == index.last_block_number
+        assert restored_index.urns(collateral.ilk) == index.urns(collateral.ilk)
+        assert restored_index.update(index.last_block_number) == 0
+
+
 class TestCat:
     def test_empty_flips(self, d: DssDeployment):
         nflip = d.cat.nflip()
@@ -92,6 +92,30 @@ class TestEtherDelta:
         # then
         assert self.etherdelta.balance_of_token(self.token1.address, self.our_address) == Wad.from_number(1.3)
 
+    def test_create_orders(self):
+        # given
+        self.etherdelta.approve([self.token1, self.token2], directly())
+        self.etherdelta.deposit_token(self.token1.address, Wad.from_number(10)).transact()
+
+        # when
+        orders = self.etherdelta.create_orders(pay_token=self.token1.address,
+                                               pay_amounts=[Wad.from_number(1), Wad.from_number(2)],
+                                               buy_token=self.token2.address,
+                                               buy_amounts=[Wad.from_number(3), Wad.from_number(4)],
+                                               expires=100000000)
+
+        # then
+        assert len(orders) == 2
+        assert orders[0].pay_amount == Wad.from_number(1)
+        assert orders[0].buy_amount == Wad.from_number(3)
+        assert orders[1].pay_amount == Wad.from_number(2)
+        assert orders[1].buy_amount == Wad.from_number(4)
+        assert orders[0].nonce != orders[1].nonce
+
+        # and
+        assert self.etherdelta.amount_available(orders[0]) == Wad.from_number(3)
+        assert self.etherdelta.amount_available(orders[1]) == Wad.from_number(4)
+
     def test_offchain_order_happy_path(self):
         # given
         self.etherdelta.approve([self.token1, self.token2], directly())
@@ -0,0 +1,123 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+
+from web3 import Web3, HTTPProvider
+
+from pymaker import Address
+from pymaker.gas_estimates import GasEstimateCache
+from pymaker.numeric import Wad
+from pymaker.token import DSToken
+
+
+class TestGasEstimateCache:
+    def setup_method(self):
+        self.web3 = Web3(HTTPProvider("http://localhost:8555"))
+        self.web3.eth.defaultAccount = self.web3.eth.accounts[0]
+        self.our_address = Address(self.web3.eth.defaultAccount)
+        self.second_address = Address(self.web3.eth.accounts[1])
+        self.token = DSToken.deploy(self.web3, 'ABC')
+        self.token.mint(Wad(1000000)).transact()
+        self.gas_estimate_cache = GasEstimateCache()
+
+    def test_should_share_estimates_between_calls_of_the_same_shape(self):
+        # when
+        self.token.transfer(self.second_address, Wad(500)).transact(gas_estimate_cache=self.gas_estimate_cache)
+        self.token.transfer(self.second_address, Wad(700)).transact(gas_estimate_cache=self.gas_estimate_cache)
+        self.token.transfer(self.second_address, Wad(900)).transact(gas_estimate_cache=self.gas_estimate_cache)
+
+        # then
+        assert self.gas_estimate_cache.misses == 1
+        assert self.gas_estimate_cache.hits == 2
+        assert self.token.balance_of(self.second_address) == Wad(2100)
+
+    def test_should_key_estimates_by_address_function_and_parameter_shape(self):
+        # given
+        other_token = DSToken.deploy(self.web3, 'DEF')
+
+        # expect
+        assert GasEstimateCache.key(self.token.transfer(self.second_address, Wad(1))) == \
+               GasEstimateCache.key(self.token.transfer(self.our_address, Wad(2)))
+        assert GasEstimateCache.key(self.token.transfer(self.second_address, Wad(1))) != \
+               GasEstimateCache.key(other_token.transfer(self.second_address, Wad(1)))
+        assert GasEstimateCache.key(self.token.transfer(self.second_address, Wad(1))) != \
+               GasEstimateCache.key(self.token.approve(self.second_address, Wad(1)))
+
+    def test_should_expire_estimates(self):
+        # given
+        self.gas_estimate_cache = GasEstimateCache(ttl=0)
+
+        # when
+        self.token.transfer(self.second_address, Wad(500)).transact(gas_estimate_cache=self.gas_estimate_cache)
+        self.token.transfer(self.second_address, Wad(500)).transact(gas_estimate_cache=self.gas_estimate_cache)
+
+        # then
+        assert self.gas_estimate_cache.misses == 2
+        assert self.gas_estimate_cache.hits == 0
+
+    def test_should_keep_the_maximum_gas_used(self):
+        # given
+        transact = self.token.transfer(self.second_address, Wad(500))
+        estimate, _ = self.gas_estimate_cache.estimated_gas(transact, self.our_address)
+
+        # when
+        self.gas_estimate_cache.observe(transact, estimate + 1000)
+        self.gas_estimate_cache.observe(transact, estimate - 1000)
+
+        # then
+        assert self.gas_estimate_cache.estimated_gas(transact, self.our_address) == (estimate + 1000, True)
+
+    def test_should_keep_the_maximum_gas_used_when_the_estimate_expires(self):
+        # given
+        self.gas_estimate_cache = GasEstimateCache(ttl=0)
+        transact = self.token.transfer(self.second_address, Wad(500))
+        estimate, _ = self.gas_estimate_cache.estimated_gas(transact, self.our_address)
+        self.gas_estimate_cache.observe(transact, estimate + 1000)
+
+        # when
+        result = self.gas_estimate_cache.estimated_gas(transact, self.our_address)
+
+        # then
+        assert result == (estimate + 1000, False)
+        assert self.gas_estimate_cache.misses == 2
+
+    def test_should_retry_with_a_fresh_estimate_after_running_out_of_gas(self):
+        # given
+        transact = self.token.transfer(self.second_address, Wad(500))
+        self.gas_estimate_cache._estimates[GasEstimateCache.key(transact)] = (25000, time.time())
+
+        # when
+        receipt = transact.transact(gas_buffer=0, gas_estimate_cache=self.gas_estimate_cache)
+
+        # then
+        assert receipt is not None
+        assert receipt.successful
+        assert self.token.balance_of(self.second_address) == Wad(500)
+        # and
+        assert self.gas_estimate_cache.hits == 1
+        assert self.gas_estimate_cache.misses == 1
+
+    def test_should_not_cache_eth_transfers(self):
+        # given
+        from pymaker import eth_transfer
+        transact = eth_transfer(self.web3, self.second_address, Wad(1))
+
+        # expect
+        assert GasEstimateCache.key(transact) is None
+        assert self.gas_estimate_cache.estimated_gas(transact, self.our_address) == (21000, False)
+        assert self.gas_estimate_cache.misses == 0
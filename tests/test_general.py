@@ -65,6 +65,41 @@ class TestAddress:
     def test_should_be_hashable(self):
         assert is_hashable(Address('0x0000011111000001111100000111110000011111'))
 
+    def test_should_share_normalized_representation(self):
+        # given
+        address1 = Address('0x0000011111000001111100000111110000011111')
+        address2 = Address('0x0000011111000001111100000111110000011111'.upper().replace('X', 'x'))
+
+        # expect
+        assert address1.address is address2.address
+
+    def test_creation_from_bytes(self):
+        # expect
+        assert Address.from_bytes(b'\0\0\x01\x11\x11\0\0\x01\x11\x11\0\0\x01\x11\x11\0\0\x01\x11\x11') == \
+               Address('0x0000011111000001111100000111110000011111')
+
+    def test_creation_from_bytearray(self):
+        # expect
+        assert Address(bytearray(b'\0\0\x01\x11\x11\0\0\x01\x11\x11\0\0\x01\x11\x11\0\0\x01\x11\x11')) == \
+               Address('0x0000011111000001111100000111110000011111')
+
+    def test_should_count_cache_hits_and_misses(self):
+        # given
+        Address('0x0000011111000001111100000111110000033333')
+        cache_info = Address.cache_info()
+
+        # when
+        Address('0x0000011111000001111100000111110000033333')
+        Address('0x0000011111000001111100000111110000044444')
+
+        # then
+        assert Address.cache_info().hits == cache_info.hits + 1
+        assert Address.cache_info().misses == cache_info.misses + 1
+
+    def test_should_not_have_instance_dict(self):
+        with pytest.raises(AttributeError):
+            Address('0x0000011111000001111100000111110000011111').foo = 1
+
     def test_equality(self):
         # given
         address1a = Address('0x0000011111000001111100000111110000011111')
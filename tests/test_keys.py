@@ -16,10 +16,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import pkg_resources
+from mock import MagicMock
 from web3 import Web3, HTTPProvider
 
 from pymaker import Address, Wad, eth_transfer
-from pymaker.keys import register_key_file, register_key
+from pymaker.gas import IncreasingGasPrice
+from pymaker.keys import register_key_file, register_key, chain_id
 from pymaker.token import DSToken
 
 
@@ -111,3 +113,61 @@ def test_multiple_local_accounts():
     # [these operations were successful]
     assert token.balance_of(local_account_1) == Wad.from_number(100000)
     assert token.balance_of(local_account_2) == Wad.from_number(50000)
+
+
+def test_local_accounts_sign_transactions_locally():
+    # given
+    web3 = Web3(HTTPProvider("http://localhost:8555"))
+    web3.eth.defaultAccount = Address('0x13314e21cd6d343ceb857073f3f6d9368919d1ef').address
+
+    # and
+    keyfile_path = pkg_resources.resource_filename(__name__, "accounts/4_0x13314e21cd6d343ceb857073f3f6d9368919d1ef.json")
+    passfile_path = pkg_resources.resource_filename(__name__, "accounts/pass")
+    register_key_file(web3, keyfile_path, passfile_path)
+
+    # and
+    eth_transfer(web3, Address(web3.eth.defaultAccount), Wad.from_number(100)) \
+        .transact(from_address=Address(web3.eth.accounts[0]))
+    token = DSToken.deploy(web3, 'XYZ')
+
+    # and
+    web3.eth.sendRawTransaction = MagicMock(side_effect=web3.eth.sendRawTransaction)
+    web3.eth.sendTransaction = MagicMock(side_effect=web3.eth.sendTransaction)
+
+    # when
+    receipt = token.mint(Wad.from_number(150000)).transact(gas_price=IncreasingGasPrice(1000, 100, 60, None))
+
+    # then
+    assert receipt is not None
+    assert token.balance_of(Address(web3.eth.defaultAccount)) == Wad.from_number(150000)
+    assert web3.eth.getTransaction(receipt.transaction_hash)['gasPrice'] == 1000
+
+    # and
+    # [the transaction has been signed locally and sent as a raw transaction]
+    assert web3.eth.sendRawTransaction.call_count == 1
+    assert web3.eth.sendTransaction.call_count == 0
+
+
+def test_chain_id_should_come_from_eth_chain_id():
+    # given
+    web3 = Web3(HTTPProvider("http://localhost:8555"))
+    web3.manager.request_blocking = MagicMock(side_effect=lambda method, params: {'eth_chainId': '0x3d',
+                                                                                  'net_version': '1'}[method])
+
+    # expect
+    assert chain_id(web3) == 61
+
+
+def test_chain_id_should_fall_back_to_net_version():
+    # given
+    def request_blocking(method, params):
+        if method == 'eth_chainId':
+            raise ValueError({'code': -32601, 'message': 'Method not found'})
+
+        return {'net_version': '1'}[method]
+
+    web3 = Web3(HTTPProvider("http://localhost:8555"))
+    web3.manager.request_blocking = MagicMock(side_effect=request_blocking)
+
+    # expect
+    assert chain_id(web3) == 1
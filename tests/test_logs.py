@@ -0,0 +1,263 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import types
+from unittest.mock import Mock
+
+import pytest
+import requests
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3.utils.datastructures import AttributeDict
+
+from pymaker.logs import LogFetcher, LogCache
+
+
+EVENT_ABI = {'anonymous': False, 'name': 'LogMake', 'type': 'event',
+             'inputs': [{'indexed': True, 'name': 'id', 'type': 'bytes32'},
+                        {'indexed': False, 'name': 'pay_amt', 'type': 'uint128'}]}
+
+ADDRESS = '0x0000000000000000000000000000000000000001'
+
+
+def raw_log(block_number: int) -> AttributeDict:
+    return AttributeDict({'blockNumber': block_number, 'logIndex': 0, 'transactionIndex': 0,
+                          'transactionHash': HexBytes('0x01'), 'blockHash': HexBytes('0x02'), 'address': ADDRESS,
+                          'topics': [HexBytes(event_abi_to_log_topic(EVENT_ABI)),
+                                     HexBytes(block_number.to_bytes(32, 'big'))],
+                          'data': '0x' + (block_number % 2).to_bytes(32, 'big').hex()})
+
+
+def mocked_contract_event(max_blocks_per_request: int = None, block_number: int = 1000,
+                          error: Exception = ValueError("query returned more than 10000 results")) -> Mock:
+    def get_logs(filter_params):
+        from_block, to_block = filter_params['fromBlock'], filter_params['toBlock']
+        if max_blocks_per_request is not None and to_block - from_block + 1 > max_blocks_per_request:
+            raise error
+
+        return [raw_log(number) for number in range(from_block, to_block + 1)]
+
+    contract_event = Mock()
+    contract_event.address = ADDRESS
+    contract_event._get_event_abi = Mock(return_value=EVENT_ABI)
+    contract_event.web3.eth.getLogs = Mock(side_effect=get_logs)
+    contract_event.web3.eth.blockNumber = block_number
+    contract_event.web3.eth.getBlock = Mock(return_value={'hash': HexBytes('0x01')})
+    return contract_event
+
+
+def fetched_ranges(contract_event: Mock) -> list:
+    return [(call[0][0]['fromBlock'], call[0][0]['toBlock'])
+            for call in contract_event.web3.eth.getLogs.call_args_list]
+
+
+class TestLogFetcher:
+    def test_should_fetch_logs_in_order(self):
+        # given
+        contract_event = mocked_contract_event()
+        log_fetcher = LogFetcher(chunk_size=10, parallelism=3)
+
+        # when
+        logs = list(log_fetcher.fetch(contract_event, 5, 104))
+
+        # then
+        assert [log['blockNumber'] for log in logs] == list(range(5, 105))
+        assert contract_event.web3.eth.getLogs.call_count == 10
+
+    def test_should_decode_logs_without_installing_filters(self):
+        # given
+        contract_event = mocked_contract_event()
+        log_fetcher = LogFetcher(chunk_size=10)
+
+        # when
+        logs = list(log_fetcher.fetch(contract_event, 0, 9))
+
+        # then
+        assert logs[3].event == 'LogMake'
+        assert logs[3].args.id == (3).to_bytes(32, 'big')
+        assert logs[3].args.pay_amt == 1
+        assert not contract_event.createFilter.called
+        assert not contract_event.web3.eth.filter.called
+
+    def test_should_apply_argument_filters(self):
+        # given
+        contract_event = mocked_contract_event()
+        log_fetcher = LogFetcher(chunk_size=10)
+
+        # when
+        logs = list(log_fetcher.fetch(contract_event, 0, 9, {'id': (3).to_bytes(32, 'big'), 'pay_amt': 1}))
+
+        # then
+        assert contract_event.web3.eth.getLogs.call_args[0][0]['topics'][1] == '0x' + (3).to_bytes(32, 'big').hex()
+        assert [log.blockNumber for log in logs] == [1, 3, 5, 7, 9]
+
+    def test_should_fetch_raw_logs(self):
+        # given
+        contract_event = mocked_contract_event(max_blocks_per_request=3)
+        log_fetcher = LogFetcher(chunk_size=16, parallelism=2)
+        topics = [['0x' + event_abi_to_log_topic(EVENT_ABI).hex()]]
+
+        # when
+        logs = list(log_fetcher.fetch_raw(contract_event.web3, ADDRESS, topics, 0, 99))
+
+        # then
+        assert logs == [raw_log(number) for number in range(0, 100)]
+        assert all(call[0][0]['address'] == ADDRESS and call[0][0]['topics'] == topics
+                   for call in contract_event.web3.eth.getLogs.call_args_list)
+
+    def test_should_return_a_generator(self):
+        # given
+        log_fetcher = LogFetcher(chunk_size=10)
+
+        # when
+        logs = log_fetcher.fetch(mocked_contract_event(), 0, 1000000)
+
+        # then
+        assert isinstance(logs, types.GeneratorType)
+        assert next(logs).blockNumber == 0
+        logs.close()
+
+    def test_should_split_windows_rejected_by_the_node(self):
+        # given
+        contract_event = mocked_contract_event(max_blocks_per_request=3)
+        log_fetcher = LogFetcher(chunk_size=16, parallelism=2)
+
+        # when
+        logs = list(log_fetcher.fetch(contract_event, 0, 99))
+
+        # then
+        assert [log['blockNumber'] for log in logs] == list(range(0, 100))
+        assert all(to_block - from_block + 1 <= 3 for from_block, to_block in fetched_ranges(contract_event)[-10:])
+
+    def test_should_split_windows_which_timed_out(self):
+        # given
+        contract_event = mocked_contract_event(max_blocks_per_request=3, error=requests.exceptions.ReadTimeout())
+        log_fetcher = LogFetcher(chunk_size=16, parallelism=2)
+
+        # when
+        logs = list(log_fetcher.fetch(contract_event, 0, 99))
+
+        # then
+        assert [log['blockNumber'] for log in logs] == list(range(0, 100))
+
+    def test_should_not_split_windows_on_other_errors(self):
+        # given
+        contract_event = mocked_contract_event(max_blocks_per_request=3, error=requests.exceptions.ConnectionError())
+        log_fetcher = LogFetcher(chunk_size=16, parallelism=1)
+
+        # expect
+        with pytest.raises(requests.exceptions.ConnectionError):
+            list(log_fetcher.fetch(contract_event, 0, 99))
+
+        # and
+        assert fetched_ranges(contract_event) == [(0, 15)]
+
+    def test_should_not_shrink_windows_of_subsequent_fetches(self):
+        # given
+        log_fetcher = LogFetcher(chunk_size=16, parallelism=2)
+        list(log_fetcher.fetch(mocked_contract_event(max_blocks_per_request=3), 0, 99))
+
+        # when
+        contract_event = mocked_contract_event()
+        list(log_fetcher.fetch(contract_event, 0, 99))
+
+        # then
+        assert contract_event.web3.eth.getLogs.call_count == 7
+
+    def test_should_pass_the_error_if_a_single_block_fails(self):
+        # given
+        log_fetcher = LogFetcher(chunk_size=16)
+
+        # expect
+        with pytest.raises(ValueError):
+            list(log_fetcher.fetch(mocked_contract_event(max_blocks_per_request=0), 0, 99))
+
+
+class TestLogCache:
+    def test_should_fetch_only_missing_ranges(self, tmpdir):
+        # given
+        contract_event = mocked_contract_event(block_number=1000)
+        log_fetcher = LogFetcher(chunk_size=100, cache=LogCache(str(tmpdir.join("logs.db")), reorg_depth=10))
+        assert [log['blockNumber'] for log in log_fetcher.fetch(contract_event, 100, 299)] == list(range(100, 300))
+
+        # when
+        contract_event.web3.eth.getLogs.reset_mock()
+        logs = list(log_fetcher.fetch(contract_event, 50, 349))
+
+        # then
+        assert [log['blockNumber'] for log in logs] == list(range(50, 350))
+        assert fetched_ranges(contract_event) == [(50, 99), (300, 349)]
+
+    def test_should_not_cache_recent_blocks(self, tmpdir):
+        # given
+        contract_event = mocked_contract_event(block_number=1000)
+        log_fetcher = LogFetcher(chunk_size=100, cache=LogCache(str(tmpdir.join("logs.db")), reorg_depth=10))
+        list(log_fetcher.fetch(contract_event, 900, 1000))
+
+        # when
+        contract_event.web3.eth.getLogs.reset_mock()
+        logs = list(log_fetcher.fetch(contract_event, 900, 1000))
+
+        # then
+        assert [log['blockNumber'] for log in logs] == list(range(900, 1001))
+        assert fetched_ranges(contract_event) == [(991, 1000)]
+
+    def test_should_persist_the_cache(self, tmpdir):
+        # given
+        contract_event = mocked_contract_event()
+        list(LogFetcher(cache=LogCache(str(tmpdir.join("logs.db")))).fetch(contract_event, 0, 99))
+
+        # when
+        contract_event.web3.eth.getLogs.reset_mock()
+        logs = list(LogFetcher(cache=LogCache(str(tmpdir.join("logs.db")))).fetch(contract_event, 0, 99))
+
+        # then
+        assert len(logs) == 100
+        assert fetched_ranges(contract_event) == []
+
+    def test_should_invalidate_blocks_after_reorg(self, tmpdir):
+        # given
+        contract_event = mocked_contract_event()
+        log_cache = LogCache(str(tmpdir.join("logs.db")))
+        log_fetcher = LogFetcher(chunk_size=100, cache=log_cache)
+        list(log_fetcher.fetch(contract_event, 0, 199))
+
+        # when
+        log_cache.invalidate(150)
+        contract_event.web3.eth.getLogs.reset_mock()
+        logs = list(log_fetcher.fetch(contract_event, 0, 199))
+
+        # then
+        assert len(logs) == 200
+        assert fetched_ranges(contract_event) == [(150, 199)]
+
+    def test_should_return_logs_of_the_same_type_as_web3(self, tmpdir):
+        # given
+        contract_event = mocked_contract_event()
+        log_fetcher = LogFetcher(chunk_size=100, cache=LogCache(str(tmpdir.join("logs.db"))))
+        fetched_logs = list(log_fetcher.fetch(contract_event, 0, 99))
+
+        # when
+        cached_logs = list(log_fetcher.fetch(contract_event, 0, 99))
+
+        # then
+        assert contract_event.web3.eth.getLogs.call_count == 1
+        assert cached_logs == fetched_logs
+        assert isinstance(cached_logs[0], AttributeDict)
+        assert isinstance(cached_logs[0].args, AttributeDict)
+        assert isinstance(cached_logs[0].transactionHash, HexBytes)
+        assert cached_logs[1].args.id == (1).to_bytes(32, 'big')
@@ -0,0 +1,79 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pymaker import Address
+from pymaker.deployment import Deployment
+from pymaker.multicall import Multicall
+from pymaker.numeric import Wad, Ray
+from pymaker.util import int_to_bytes32
+
+
+class TestMulticall:
+    def test_should_execute_calls_across_contracts(self, deployment: Deployment):
+        # given
+        multicall = Multicall(deployment.web3)
+        tap = multicall.add(deployment.tub, 'tap', [], Address)
+        per = multicall.add(deployment.tub, 'per', [], Ray)
+        balance = multicall.add(deployment.gem, 'balanceOf', [deployment.our_address.address], Wad)
+        supply = multicall.add(deployment.skr, 'totalSupply', [])
+
+        # when
+        results = multicall.execute()
+
+        # then
+        assert results[tap] == deployment.tub.tap()
+        assert results[per] == deployment.tub.per()
+        assert results[balance] == deployment.gem.balance_of(deployment.our_address)
+        assert results[supply] == 0
+
+    def test_should_return_multiple_values_as_list(self, deployment: Deployment):
+        # given
+        deployment.tub.join(Wad.from_number(10)).transact()
+        deployment.tub.open().transact()
+        deployment.tub.lock(1, Wad.from_number(4)).transact()
+
+        # when
+        multicall = Multicall(deployment.web3)
+        multicall.add(deployment.tub, 'cups', [int_to_bytes32(1)])
+        cup = multicall.execute()[0]
+
+        # then
+        assert Address(cup[0]) == deployment.our_address
+        assert Wad(cup[1]) == Wad.from_number(4)
+
+    def test_should_split_calls_into_batches(self, deployment: Deployment):
+        # given
+        multicall = Multicall(deployment.web3, batch_size=3)
+        for _ in range(10):
+            multicall.add(deployment.tub, 'per', [], Ray)
+
+        # expect
+        assert multicall.execute() == [deployment.tub.per()] * 10
+        assert len(multicall) == 0
+
+    def test_should_execute_calls_at_given_block(self, deployment: Deployment):
+        # given
+        block_number = deployment.web3.eth.blockNumber
+        deployment.tub.join(Wad.from_number(10)).transact()
+
+        # when
+        multicall = Multicall(deployment.web3, block_identifier=block_number)
+        multicall.add(deployment.skr, 'totalSupply', [], Wad)
+
+        # then
+        assert multicall.execute() == [Wad(0)]
+
@@ -0,0 +1,142 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from web3 import Web3, HTTPProvider
+
+from pymaker import Address, Transact
+from pymaker.nonce import NonceManager
+from pymaker.numeric import Wad
+from pymaker.token import DSToken
+
+
+class TestNonceManager:
+    def setup_method(self):
+        self.web3 = Web3(HTTPProvider("http://localhost:8555"))
+        self.web3.eth.defaultAccount = self.web3.eth.accounts[0]
+        self.our_address = Address(self.web3.eth.defaultAccount)
+        self.second_address = Address(self.web3.eth.accounts[1])
+        self.token = DSToken.deploy(self.web3, 'ABC')
+        self.token.mint(Wad(1000000)).transact()
+        self.nonce_manager = NonceManager.for_account(self.web3, self.web3.eth.defaultAccount)
+
+    def test_should_be_shared_per_account(self):
+        # expect
+        assert NonceManager.for_account(self.web3, self.web3.eth.defaultAccount.lower()) is self.nonce_manager
+        assert NonceManager.for_account(self.web3, self.web3.eth.accounts[1]) is not self.nonce_manager
+
+    def test_should_reserve_consecutive_nonces(self):
+        # given
+        transaction_count = self.web3.eth.getTransactionCount(self.our_address.address)
+
+        # expect
+        assert self.nonce_manager.reserve() == transaction_count
+        assert self.nonce_manager.reserve() == transaction_count + 1
+
+    def test_should_reserve_unique_nonces_from_many_threads(self):
+        # when
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            nonces = list(executor.map(lambda _: self.nonce_manager.reserve(), range(100)))
+
+        # then
+        assert len(set(nonces)) == 100
+        assert max(nonces) - min(nonces) == 99
+
+    def test_should_resync_with_the_node(self):
+        # given
+        transaction_count = self.web3.eth.getTransactionCount(self.our_address.address)
+        self.nonce_manager.reserve()
+        self.nonce_manager.reserve()
+
+        # when
+        self.nonce_manager.resync()
+
+        # then
+        assert self.nonce_manager.next_nonce is None
+        assert self.nonce_manager.reserve() == transaction_count
+
+    def test_should_recover_from_transactions_sent_outside_of_pymaker(self):
+        # given
+        self.web3.eth.sendTransaction({'from': self.our_address.address, 'to': self.second_address.address, 'value': 1})
+
+        # when
+        receipt = self.token.transfer(self.second_address, Wad(500)).transact()
+
+        # then
+        assert receipt is not None
+        assert receipt.successful
+        assert self.token.balance_of(self.second_address) == Wad(500)
+
+    def test_should_not_leave_a_nonce_gap_if_a_transaction_can_not_be_sent(self):
+        # given
+        transaction_count = self.web3.eth.getTransactionCount(self.our_address.address)
+
+        # when
+        with pytest.raises(Exception):
+            self.token.transfer(self.second_address, Wad(500)).transact(gas=10**12)
+
+        # then
+        assert self.nonce_manager.reserve() == transaction_count
+
+    def test_should_not_resend_a_transaction_if_sending_it_timed_out(self, monkeypatch):
+        # given
+        original_func = Transact._func
+        calls = []
+
+        def timing_out_func(transact, *args):
+            calls.append(args)
+            original_func(transact, *args)
+            raise requests.exceptions.ReadTimeout()
+
+        monkeypatch.setattr(Transact, '_func', timing_out_func)
+
+        # when
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            self.token.transfer(self.second_address, Wad(500)).transact()
+
+        # then
+        assert len(calls) == 1
+        assert self.token.balance_of(self.second_address) == Wad(500)
+        # and
+        assert self.nonce_manager.next_nonce is None
+
+    def test_should_recognize_nonce_errors(self):
+        # expect
+        assert NonceManager.is_nonce_error(ValueError({'code': -32000, 'message': 'nonce too low'}))
+        assert NonceManager.is_nonce_error(ValueError({'code': -32000, 'message': 'known transaction: 0x01'}))
+        assert NonceManager.is_nonce_error(ValueError({'code': -32000,
+                                                       'message': 'replacement transaction underpriced'}))
+        assert not NonceManager.is_nonce_error(ValueError({'code': -32000, 'message': 'insufficient funds'}))
+        assert not NonceManager.is_nonce_error(requests.exceptions.ReadTimeout())
+
+    @pytest.mark.asyncio
+    async def test_should_send_many_transactions_back_to_back(self):
+        # when
+        receipts = await asyncio.gather(*[self.token.transfer(self.second_address, Wad(1)).transact_async()
+                                          for _ in range(10)])
+
+        # then
+        assert all(receipt is not None and receipt.successful for receipt in receipts)
+        assert self.token.balance_of(self.second_address) == Wad(10)
+        assert self.nonce_manager.next_nonce == self.web3.eth.getTransactionCount(self.our_address.address)
+
+    def test_should_have_printable_representation(self):
+        assert repr(self.nonce_manager) == f"NonceManager('{self.web3.eth.defaultAccount}')"
@@ -17,7 +17,7 @@
 
 import pytest
 
-from pymaker.numeric import Wad, Ray, Rad
+from pymaker.numeric import Wad, Ray, Rad, WadArray, RayArray
 from tests.helpers import is_hashable
 
 
@@ -105,6 +105,19 @@ class TestWad:
         assert Wad(40) / Wad.from_number(20) == Wad(2)
         assert Wad.from_number(0.2) / Wad.from_number(0.1) == Wad.from_number(2)
 
+    def test_should_multiply_and_divide_large_values_exactly(self):
+        assert Wad(123456789012345678901234567890123) * Wad(10**18 + 7) == Wad(123456789012345679765432090976542)
+        assert Wad(123456789012345678901234567890123) / Wad(10**18 + 7) == Wad(123456789012345678037037044803703)
+
+    def test_should_round_negative_values_towards_zero(self):
+        assert Wad(-7) * Wad.from_number(0.5) == Wad(-3)
+        assert Wad(-7) / Wad.from_number(2) == Wad(-3)
+        assert Wad(Ray(-1999999999)) == Wad(-1)
+
+    def test_should_fail_to_divide_by_zero(self):
+        with pytest.raises(ZeroDivisionError):
+            Wad(4) / Wad(0)
+
     def test_should_fail_to_divide_by_rays(self):
         with pytest.raises(ArithmeticError):
             Wad(4) / Ray(2)
@@ -183,6 +196,10 @@ class TestWad:
     def test_should_be_hashable(self):
         assert is_hashable(Wad(123))
 
+    def test_should_not_have_instance_dict(self):
+        with pytest.raises(AttributeError):
+            Wad(123).foo = 1
+
     def test_min_value(self):
         assert Wad.min(Wad(10), Wad(20)) == Wad(10)
         assert Wad.min(Wad(25), Wad(15)) == Wad(15)
@@ -391,6 +408,10 @@ class TestRay:
     def test_should_be_hashable(self):
         assert is_hashable(Ray(123))
 
+    def test_should_not_have_instance_dict(self):
+        with pytest.raises(AttributeError):
+            Ray(123).foo = 1
+
     def test_min_value(self):
         assert Ray.min(Ray(10), Ray(20)) == Ray(10)
         assert Ray.min(Ray(25), Ray(15)) == Ray(15)
@@ -631,6 +652,10 @@ class TestRad:
     def test_should_be_hashable(self):
         assert is_hashable(Rad(123))
 
+    def test_should_not_have_instance_dict(self):
+        with pytest.raises(AttributeError):
+            Rad(123).foo = 1
+
     def test_min_value(self):
         assert Rad.min(Rad(10), Rad(20)) == Rad(10)
         assert Rad.min(Rad(25), Rad(15)) == Rad(15)
@@ -681,3 +706,67 @@ class TestRad:
         assert round(Rad.from_number(123.4567), 2) == Rad.from_number(123.46)
         assert round(Rad.from_number(123.4567), 0) == Rad.from_number(123.0)
         assert round(Rad.from_number(123.4567), -2) == Rad.from_number(100.0)
+
+
+class TestWadArray:
+    def test_should_convert_to_and_from_list_of_wads(self):
+        wads = [Wad(1), Wad.from_number(2.5), Wad(-3)]
+        assert WadArray.from_list(wads).to_list() == wads
+        assert list(WadArray.from_list(wads)) == wads
+        assert WadArray([1, 2]).values == [1, 2]
+
+    def test_should_fail_to_instantiate_from_other_types(self):
+        with pytest.raises(ArithmeticError):
+            WadArray([1.5])
+        with pytest.raises(ArithmeticError):
+            WadArray.from_list([Ray(1)])
+
+    def test_should_instantiate_from_a_ray_array(self):
+        assert WadArray(RayArray([10000000000000001019999999999, -1999999999])) == \
+               WadArray([10000000000000001019, -1])
+
+    def test_should_index_and_slice(self):
+        array = WadArray([1, 2, 3])
+        assert len(array) == 3
+        assert array[1] == Wad(2)
+        assert array[1:] == WadArray([2, 3])
+
+    def test_add_and_subtract(self):
+        assert WadArray([1, 2]) + WadArray([10, 20]) == WadArray([11, 22])
+        assert WadArray([1, 2]) - Wad(1) == WadArray([0, 1])
+
+    def test_should_fail_to_add_arrays_of_different_lengths(self):
+        with pytest.raises(ArithmeticError):
+            WadArray([1, 2]) + WadArray([1])
+
+    def test_should_fail_to_add_rays(self):
+        with pytest.raises(ArithmeticError):
+            WadArray([1, 2]) + Ray(1)
+
+    def test_multiply_and_divide_like_wads(self):
+        xs = [Wad(2), Wad.from_number(2.99999), Wad(-7), Wad(123456789012345678901234567890123)]
+        ys = [Wad.from_number(3), Wad(3), Wad.from_number(0.5), Wad(10**18 + 7)]
+        rays = [Ray(499999999999999999999999999), Ray(10**27), Ray.from_number(3), Ray(-5)]
+
+        assert (WadArray.from_list(xs) * WadArray.from_list(ys)).to_list() == [x * y for x, y in zip(xs, ys)]
+        assert (WadArray.from_list(xs) / WadArray.from_list(ys)).to_list() == [x / y for x, y in zip(xs, ys)]
+        assert (WadArray.from_list(xs) * RayArray.from_list(rays)).to_list() == [x * r for x, r in zip(xs, rays)]
+        assert (WadArray.from_list(xs) * Ray(10**26)).to_list() == [x * Ray(10**26) for x in xs]
+        assert (WadArray.from_list(xs) * 3).to_list() == [x * 3 for x in xs]
+
+    def test_compare(self):
+        array = WadArray([1, 5, 10])
+        assert array.lt(Wad(5)) == [True, False, False]
+        assert array.le(Wad(5)) == [True, True, False]
+        assert array.gt(WadArray([0, 5, 20])) == [True, False, False]
+        assert array.ge(WadArray([0, 5, 20])) == [True, True, False]
+        assert array.select(array.ge(Wad(5))) == WadArray([5, 10])
+
+    def test_sort_and_reduce(self):
+        array = WadArray([5, -1, 10, 3])
+        assert array.sorted() == WadArray([-1, 3, 5, 10])
+        assert array.sorted(reverse=True) == WadArray([10, 5, 3, -1])
+        assert array.argsort() == [1, 3, 0, 2]
+        assert array.min() == Wad(-1)
+        assert array.max() == Wad(10)
+        assert array.sum() == Wad(17)
@@ -14,6 +14,8 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
 from typing import List
 from unittest.mock import Mock
 
@@ -23,9 +25,10 @@ from web3 import HTTPProvider
 from web3 import Web3
 
 from pymaker import Address, Wad, Contract
-from pymaker.approval import directly
-from pymaker.oasis import SimpleMarket, ExpiringMarket, MatchingMarket, Order
+from pymaker.approval import directly, via_tx_manager
+from pymaker.oasis import SimpleMarket, ExpiringMarket, MatchingMarket, Order, OasisOrderBook, NewOrder
 from pymaker.token import DSToken
+from pymaker.transactional import TxManager
 from tests.helpers import wait_until_mock_called, is_hashable
 
 PAST_BLOCKS = 100
@@ -250,6 +253,51 @@ class GeneralMarketTest:
         assert self.otc.get_orders() == []
         assert self.otc.get_last_order_id() == 1
 
+    def test_order_book_should_match_get_orders(self):
+        # given
+        self.otc.approve([self.token1, self.token2], directly())
+        self.otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                      buy_token=self.token2.address, buy_amount=Wad.from_number(3)).transact()
+        order_book = OasisOrderBook(self.otc)
+        order_book.load()
+
+        # when
+        self.otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                      buy_token=self.token2.address, buy_amount=Wad.from_number(2)).transact()
+        self.otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                      buy_token=self.token2.address, buy_amount=Wad.from_number(4)).transact()
+        self.otc.bump(1).transact()
+        self.otc.take(2, Wad.from_number(0.25)).transact()
+        self.otc.kill(3).transact(gas=4000000)
+
+        # then
+        assert order_book.update() == 5
+
+        def details(orders: List[Order]) -> list:
+            return [(order.order_id, order.maker, order.pay_token, order.pay_amount,
+                     order.buy_token, order.buy_amount, order.timestamp) for order in orders]
+
+        assert details(order_book.get_orders()) == details(self.otc.get_orders())
+        assert details(order_book.get_orders(self.token1.address, self.token2.address)) == \
+               details(self.otc.get_orders(self.token1.address, self.token2.address))
+
+    def test_order_book_should_sort_orders_by_price(self):
+        # given
+        self.otc.approve([self.token1, self.token2], directly())
+        for buy_amount in [3, 2, 4]:
+            self.otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                          buy_token=self.token2.address, buy_amount=Wad.from_number(buy_amount)).transact()
+
+        # when
+        order_book = OasisOrderBook(self.otc)
+        order_book.update()
+
+        # then
+        assert [order.order_id for order in order_book.asks(self.token1.address, self.token2.address)] == [2, 1, 3]
+        assert order_book.best_order(self.token1.address, self.token2.address).order_id == 2
+        assert order_book.bids(self.token1.address, self.token2.address) == []
+        assert order_book.best_order(self.token2.address, self.token1.address) is None
+
     def test_no_past_events_on_startup(self):
         assert self.otc.past_make(PAST_BLOCKS) == []
         assert self.otc.past_bump(PAST_BLOCKS) == []
@@ -274,6 +322,18 @@ class GeneralMarketTest:
         assert past_make[0].timestamp != 0
         assert past_make[0].raw['blockNumber'] > 0
 
+    def test_past_make_stream(self):
+        # when
+        self.otc.approve([self.token1], directly())
+        self.otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                      buy_token=self.token2.address, buy_amount=Wad.from_number(2)).transact()
+
+        # then
+        past_make = list(self.otc.past_make(PAST_BLOCKS, stream=True))
+        assert len(past_make) == 1
+        assert past_make[0].order_id == 1
+        assert past_make[0].raw == self.otc.past_make(PAST_BLOCKS)[0].raw
+
     def test_past_bump(self):
         # when
         self.otc.approve([self.token1], directly())
@@ -359,6 +419,61 @@ class TestSimpleMarket(GeneralMarketTest):
         GeneralMarketTest.setup_method(self)
         self.otc = SimpleMarket.deploy(self.web3)
 
+    def test_get_orders_should_remember_inactive_orders(self, tmpdir):
+        # given
+        tombstone_file = str(tmpdir.join("tombstones.json"))
+        otc = SimpleMarket(self.web3, self.otc.address, parallelism=2, batch_size=2, tombstone_file=tombstone_file)
+        otc.approve([self.token1, self.token2], directly())
+        for _ in range(5):
+            otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                     buy_token=self.token2.address, buy_amount=Wad.from_number(2)).transact()
+
+        # when
+        otc.kill(2).transact()
+        otc.take(4, Wad.from_number(1)).transact()
+
+        # then
+        assert [order.order_id for order in otc.get_orders()] == [1, 3, 5]
+        assert otc._dead_orders == {2, 4}
+
+        # and
+        restarted_otc = SimpleMarket(self.web3, self.otc.address, tombstone_file=tombstone_file)
+        assert restarted_otc._dead_orders == {2, 4}
+        assert [order.order_id for order in restarted_otc.get_orders()] == [1, 3, 5]
+
+    def test_should_ignore_tombstones_of_other_markets(self, tmpdir):
+        # given
+        tombstone_file = str(tmpdir.join("tombstones.json"))
+        otc = SimpleMarket(self.web3, self.otc.address, tombstone_file=tombstone_file)
+        otc.approve([self.token1], directly())
+        otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                 buy_token=self.token2.address, buy_amount=Wad.from_number(2)).transact()
+        otc.kill(1).transact()
+        assert otc.get_orders() == []
+        assert otc._dead_orders == {1}
+
+        # when
+        other_otc = SimpleMarket(self.web3, SimpleMarket.deploy(self.web3).address, tombstone_file=tombstone_file)
+        other_otc.approve([self.token1], directly())
+        other_otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                       buy_token=self.token2.address, buy_amount=Wad.from_number(2)).transact()
+
+        # then
+        assert other_otc._dead_orders == set()
+        assert [order.order_id for order in other_otc.get_orders()] == [1]
+
+    def test_get_orders_by_maker_should_remember_alien_orders(self):
+        # given
+        self.otc.approve([self.token1], directly())
+        self.otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                      buy_token=self.token2.address, buy_amount=Wad.from_number(2)).transact()
+        other_address = Address(self.web3.eth.accounts[1])
+
+        # expect
+        assert self.otc.get_orders_by_maker(other_address) == []
+        assert self.otc._alien_orders[other_address] == {1}
+        assert len(self.otc.get_orders_by_maker(self.our_address)) == 1
+
     def test_fail_when_no_contract_under_that_address(self):
         # expect
         with pytest.raises(Exception):
@@ -462,6 +577,84 @@ class TestMatchingMarket(GeneralMarketTest):
         assert self.otc.get_order(6).maker == self.our_address
         assert self.otc.get_order(6).timestamp != 0
 
+    def test_iter_orders_should_yield_best_orders_first(self):
+        # given
+        self.otc.approve([self.token1], directly())
+        for buy_amount in [2, 1.8, 2.2, 1.9]:
+            self.otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                          buy_token=self.token2.address, buy_amount=Wad.from_number(buy_amount)).transact()
+
+        # when
+        orders = self.otc.iter_orders(self.token1.address, self.token2.address)
+
+        # then
+        assert [order.order_id for order in itertools.islice(orders, 2)] == [2, 4]
+        assert [order.order_id for order in self.otc.iter_orders(self.token1.address, self.token2.address)] == [2, 4, 1, 3]
+        assert list(self.otc.iter_orders(self.token2.address, self.token1.address)) == []
+
+    def test_make_many_and_kill_many_via_tx_manager(self):
+        # given
+        tx = TxManager.deploy(self.web3)
+        tx.approve([self.token1], directly())
+        self.otc.approve([self.token1], via_tx_manager(tx))
+
+        # when
+        transacts = self.otc.make_many(tx, [NewOrder(self.token1.address, Wad.from_number(1),
+                                                     self.token2.address, Wad.from_number(amount))
+                                            for amount in [2, 3, 4]], max_orders_per_transaction=2)
+        receipts = [transact.transact() for transact in transacts]
+
+        # then
+        assert len(transacts) == 2
+        assert [log_make.order_id for receipt in receipts for log_make in receipt.result] == [1, 2, 3]
+        assert self.otc.get_order(1).maker == tx.address
+        assert self.token1.balance_of(tx.address) == Wad(0)
+
+        # when
+        receipt = self.otc.kill_many(tx, [1, 3])[0].transact()
+
+        # then
+        assert [log_kill.order_id for log_kill in receipt.result] == [1, 3]
+        assert [order.order_id for order in self.otc.get_orders(self.token1.address, self.token2.address)] == [2]
+
+    def test_replace_orders_via_tx_manager(self):
+        # given
+        tx = TxManager.deploy(self.web3)
+        tx.approve([self.token1], directly())
+        self.otc.approve([self.token1], via_tx_manager(tx))
+        self.otc.make_many(tx, [NewOrder(self.token1.address, Wad.from_number(1),
+                                         self.token2.address, Wad.from_number(amount))
+                                for amount in [2, 3]])[0].transact()
+
+        # when
+        transacts = self.otc.replace_orders(tx, [1], [NewOrder(self.token1.address, Wad.from_number(1),
+                                                               self.token2.address, Wad.from_number(2.5))])
+        receipt = transacts[0].transact()
+
+        # then
+        assert len(transacts) == 1
+        assert [event.order_id for event in receipt.result] == [1, 3]
+        assert [order.order_id for order in self.otc.iter_orders(self.token1.address, self.token2.address)] == [3, 2]
+
+    def test_make_many_should_match_log_makes_with_orders_which_have_not_been_completely_matched(self):
+        # given
+        tx = TxManager.deploy(self.web3)
+        tx.approve([self.token1], directly())
+        self.otc.approve([self.token1], via_tx_manager(tx))
+        # and
+        self.otc.approve([self.token2], directly())
+        self.otc.make(pay_token=self.token2.address, pay_amount=Wad.from_number(2),
+                      buy_token=self.token1.address, buy_amount=Wad.from_number(1)).transact()
+
+        # when
+        receipt = self.otc.make_many(tx, [NewOrder(self.token1.address, Wad.from_number(1),
+                                                   self.token2.address, Wad.from_number(2))
+                                          for _ in range(3)])[0].transact()
+
+        # then
+        assert receipt.result[0] is None
+        assert [log_make.order_id for log_make in receipt.result[1:]] == [2, 3]
+
     def test_should_have_printable_representation(self):
         assert repr(self.otc) == f"MatchingMarket('{self.otc.address}')"
 
@@ -534,6 +727,28 @@ class TestMatchingMarketPosition:
         assert self.otc.position(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
                                  buy_token=self.token2.address, buy_amount=Wad.from_number(35)) == 4
 
+    def test_should_calculate_correct_order_position_using_order_book(self):
+        # given
+        otc = MatchingMarket(web3=self.web3, address=self.otc.address, use_order_book=True)
+
+        # expect
+        assert otc.position(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                            buy_token=self.token2.address, buy_amount=Wad.from_number(35)) == 4
+        assert otc.position(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                            buy_token=self.token2.address, buy_amount=Wad.from_number(10)) == 0
+
+        # when
+        otc.make(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                 buy_token=self.token2.address, buy_amount=Wad.from_number(35)).transact()
+        otc.kill(1).transact()
+
+        # then
+        for amount in [10, 11, 12, 35, 36, 60]:
+            assert otc.position(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                                buy_token=self.token2.address, buy_amount=Wad.from_number(amount)) == \
+                   self.otc.position(pay_token=self.token1.address, pay_amount=Wad.from_number(1),
+                                     buy_token=self.token2.address, buy_amount=Wad.from_number(amount))
+
     @pytest.mark.skip(reason="Works unreliably with ganache-cli")
     def test_should_use_correct_order_position_by_default(self):
         # when
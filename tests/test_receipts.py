@@ -0,0 +1,96 @@
+# This file is part of Maker Keeper Framework.
+#
+# Copyright (C) 2018 reverendus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import time
+
+import pytest
+from web3 import Web3, HTTPProvider
+
+from pymaker import Address
+from pymaker.numeric import Wad
+from pymaker.receipts import ReceiptWatcher
+from pymaker.token import DSToken
+
+
+class TestReceiptWatcher:
+    def setup_method(self):
+        self.web3 = Web3(HTTPProvider("http://localhost:8555"))
+        self.web3.eth.defaultAccount = self.web3.eth.accounts[0]
+        self.our_address = Address(self.web3.eth.defaultAccount)
+        self.second_address = Address(self.web3.eth.accounts[1])
+        self.token = DSToken.deploy(self.web3, 'ABC')
+        self.token.mint(Wad(1000000)).transact()
+        self.watcher = ReceiptWatcher(self.web3, poll_interval=0.1)
+
+    def test_should_be_shared_per_web3(self):
+        # expect
+        assert ReceiptWatcher.for_web3(self.web3) is ReceiptWatcher.for_web3(self.web3)
+
+    @pytest.mark.timeout(10)
+    def test_should_resolve_with_receipt(self):
+        # given
+        nonce = self.web3.eth.getTransactionCount(self.our_address.address)
+        tx_hash = self.web3.eth.sendTransaction({'from': self.our_address.address,
+                                                 'to': self.second_address.address, 'value': 1})
+
+        # when
+        watch = self.watcher.watch(self.our_address.address, nonce)
+        watch.add(tx_hash)
+
+        # then
+        assert watch.future.result()['transactionHash'] == tx_hash
+
+    @pytest.mark.timeout(10)
+    def test_should_resolve_with_none_if_nonce_has_been_used_by_other_transaction(self):
+        # given
+        nonce = self.web3.eth.getTransactionCount(self.our_address.address)
+        self.web3.eth.sendTransaction({'from': self.our_address.address, 'to': self.second_address.address, 'value': 1})
+
+        # when
+        watch = self.watcher.watch(self.our_address.address, nonce)
+        watch.add('0x' + '12' * 32)
+
+        # then
+        assert watch.future.result() is None
+
+    @pytest.mark.timeout(10)
+    def test_should_stop_polling_when_nothing_is_watched(self):
+        # given
+        watch = self.watcher.watch(self.our_address.address, 2**32)
+        assert self.watcher._thread is not None
+
+        # when
+        watch.cancel()
+        time.sleep(0.5)
+
+        # then
+        assert self.watcher._thread is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.timeout(30)
+    async def test_should_wait_for_many_transactions_at_once(self):
+        # when
+        receipts = await asyncio.gather(*[self.token.transfer(self.second_address, Wad(1)).transact_async()
+                                          for _ in range(20)])
+
+        # then
+        assert all(receipt is not None and receipt.successful for receipt in receipts)
+        assert self.token.balance_of(self.second_address) == Wad(20)
+
+    def test_should_have_printable_representation(self):
+        assert repr(self.watcher).startswith("ReceiptWatcher(")
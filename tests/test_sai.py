@@ -17,11 +17,12 @@
 
 import pytest
 
-from pymaker import Address
+from pymaker import Address, Contract
 from pymaker.deployment import Deployment
 from pymaker.feed import DSValue
+from pymaker.logs import LogFetcher
 from pymaker.numeric import Wad, Ray
-from pymaker.sai import Tub, Tap, Top, Vox
+from pymaker.sai import Tub, Tap, Top, Vox, CupTable
 from tests.helpers import time_travel_by
 
 
@@ -306,6 +307,100 @@ class TestTub:
         # then
         assert deployment.tub.safe(1)
 
+    def test_scan_cups(self, deployment: Deployment):
+        # given
+        deployment.tub.join(Wad.from_number(10)).transact()
+        deployment.tub.mold_cap(Wad.from_number(100000)).transact()
+        deployment.tub.mold_mat(Ray.from_number(1.5)).transact()
+        DSValue(web3=deployment.web3, address=deployment.tub.pip()).poke_with_int(Wad.from_number(250).value).transact()
+
+        # and
+        for _ in range(3):
+            deployment.tub.open().transact()
+        deployment.tub.lock(1, Wad.from_number(4)).transact()
+        deployment.tub.draw(1, Wad.from_number(500)).transact()
+        deployment.tub.lock(2, Wad.from_number(2)).transact()
+        deployment.tub.draw(2, Wad.from_number(300)).transact()
+        DSValue(web3=deployment.web3, address=deployment.tub.pip()).poke_with_int(Wad.from_number(200).value).transact()
+
+        # when
+        statuses = deployment.tub.scan_cups(parallelism=2, batch_size=2)
+
+        # then
+        assert [status.cup.cup_id for status in statuses] == [1, 2, 3]
+        for status in statuses:
+            assert status.cup.lad == deployment.tub.lad(status.cup.cup_id)
+            assert status.cup.ink == deployment.tub.ink(status.cup.cup_id)
+            assert status.tab == deployment.tub.tab(status.cup.cup_id)
+            assert status.safe == deployment.tub.safe(status.cup.cup_id)
+        assert [status.safe for status in statuses] == [True, False, True]
+
+    def test_scan_cups_changed_since_block(self, deployment: Deployment):
+        # given
+        deployment.tub.join(Wad.from_number(10)).transact()
+        DSValue(web3=deployment.web3, address=deployment.tub.pip()).poke_with_int(Wad.from_number(250).value).transact()
+        deployment.tub.open().transact()
+        deployment.tub.open().transact()
+        block_number = deployment.web3.eth.blockNumber
+
+        # when
+        deployment.tub.lock(2, Wad.from_number(1)).transact()
+        deployment.tub.open().transact()
+
+        # then
+        assert deployment.tub.cup_ids_changed(block_number + 1, deployment.web3.eth.blockNumber) == [2, 3]
+        assert [status.cup.cup_id for status in deployment.tub.scan_cups(changed_since_block=block_number + 1)] == [2, 3]
+
+    def test_cup_ids_changed_in_small_windows(self, deployment: Deployment, monkeypatch):
+        # given
+        monkeypatch.setattr(Contract, 'log_fetcher', LogFetcher(chunk_size=1))
+        deployment.tub.join(Wad.from_number(10)).transact()
+        for _ in range(4):
+            deployment.tub.open().transact()
+        block_number = deployment.web3.eth.blockNumber
+
+        # when
+        deployment.tub.lock(1, Wad.from_number(1)).transact()
+        deployment.tub.give(3, Address(deployment.web3.eth.accounts[1])).transact()
+        deployment.tub.shut(4).transact()
+        deployment.tub.join(Wad.from_number(1)).transact()
+
+        # then
+        assert deployment.tub.cup_ids_changed(block_number + 1, deployment.web3.eth.blockNumber) == [1, 3, 4]
+
+    def test_cup_table(self, deployment: Deployment):
+        # given
+        deployment.tub.join(Wad.from_number(10)).transact()
+        deployment.tub.mold_cap(Wad.from_number(100000)).transact()
+        DSValue(web3=deployment.web3, address=deployment.tub.pip()).poke_with_int(Wad.from_number(250).value).transact()
+        deployment.tub.open().transact()
+        cup_table = CupTable(deployment.tub)
+
+        # when
+        assert cup_table.update() == [1]
+
+        # then
+        assert cup_table.cups()[1].cup.ink == Wad(0)
+        assert cup_table.unsafe_cups() == []
+
+        # when
+        deployment.tub.lock(1, Wad.from_number(4)).transact()
+        deployment.tub.draw(1, Wad.from_number(1000)).transact()
+        deployment.tub.open().transact()
+
+        # then
+        assert cup_table.update() == [1, 2]
+        assert cup_table.cups()[1].cup.ink == Wad.from_number(4)
+        assert cup_table.cups()[1].tab == deployment.tub.tab(1)
+        assert len(cup_table.cups()) == 2
+
+        # when
+        DSValue(web3=deployment.web3, address=deployment.tub.pip()).poke_with_int(Wad.from_number(150).value).transact()
+
+        # then
+        assert cup_table.update() == []
+        assert [status.cup.cup_id for status in cup_table.unsafe_cups()] == [1]
+
     def test_mold_gap_and_gap(self, deployment: Deployment):
         # given
         assert deployment.tub.gap() == Wad.from_number(1)
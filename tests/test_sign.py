@@ -15,12 +15,15 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+
 import pkg_resources
+from eth_account import Account
 from web3 import Web3, HTTPProvider
 
 from pymaker import Address
-from pymaker.keys import register_key_file
-from pymaker.sign import eth_sign
+from pymaker.keys import register_key_file, register_private_key
+from pymaker.sign import eth_sign, sign_many
 
 
 def test_signing():
@@ -65,3 +68,74 @@ def test_signing_with_key_and_rpc_should_return_same_result():
 
     # then
     assert rpc_signature == local_signature
+
+
+def test_signing_many_messages_should_return_the_same_result_as_eth_sign():
+    # given
+    web3 = Web3(HTTPProvider("http://localhost:8555"))
+    web3.eth.defaultAccount = web3.eth.accounts[0]
+
+    # and
+    messages = [bytes(f"abc{i}", 'utf-8') for i in range(20)]
+
+    # when
+    signatures = sign_many(messages, web3)
+
+    # then
+    assert signatures == [eth_sign(message, web3) for message in messages]
+
+
+def test_signing_many_messages_with_key_and_rpc_should_return_same_result():
+    # given
+    web3 = Web3(HTTPProvider("http://localhost:8555"))
+    web3.eth.defaultAccount = web3.eth.accounts[0]
+
+    assert Address(web3.eth.defaultAccount) == Address('0x9596c16d7bf9323265c2f2e22f43e6c80eb3d943')
+
+    # and
+    messages = [bytes(f"abc{i}", 'utf-8') for i in range(20)]
+
+    rpc_signatures = sign_many(messages, web3)
+
+    # when
+    keyfile_path = pkg_resources.resource_filename(__name__, "accounts/0_0x9596c16d7bf9323265c2f2e22f43e6c80eb3d943.json")
+    passfile_path = pkg_resources.resource_filename(__name__, "accounts/pass")
+
+    register_key_file(web3, keyfile_path, passfile_path)
+
+    # and
+    web3.manager.request_blocking = None
+
+    # and
+    local_signatures = sign_many(messages, web3)
+
+    # then
+    assert rpc_signatures == local_signatures
+
+
+def test_signing_many_messages_in_worker_processes(monkeypatch):
+    # given
+    web3 = Web3(HTTPProvider("http://localhost:8555"))
+    account = Account.create()
+    register_private_key(web3, account.privateKey)
+    web3.eth.defaultAccount = account.address
+
+    # and
+    # [the pool of worker processes only gets used on machines with more than one CPU]
+    monkeypatch.setattr(os, 'cpu_count', lambda: 2)
+    messages = [bytes(f"abc{i}", 'utf-8') for i in range(20)]
+
+    # when
+    signatures = sign_many(messages, web3)
+
+    # then
+    assert signatures == [eth_sign(message, web3) for message in messages]
+
+
+def test_signing_no_messages():
+    # given
+    web3 = Web3(HTTPProvider("http://localhost:8555"))
+    web3.eth.defaultAccount = web3.eth.accounts[0]
+
+    # expect
+    assert sign_many([], web3) == []
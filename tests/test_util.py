@@ -281,3 +281,23 @@ class TestAsyncCallback:
 
         # then
         assert mock.mock_calls == [call.on_start(), call.callback(), call.on_finish()]
+
+    def test_should_close_the_event_loop_used_by_the_callback(self):
+        # given
+        loops = []
+
+        async def running_loop():
+            return asyncio.get_event_loop()
+
+        def callback():
+            loops.extend(synchronize([running_loop(), running_loop()]))
+            loops.extend(synchronize([running_loop()]))
+
+        # when
+        async_callback = AsyncCallback(callback)
+        async_callback.trigger()
+        async_callback.wait()
+
+        # then
+        assert len(set(loops)) == 1
+        assert loops[0].is_closed()
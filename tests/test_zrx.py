@@ -27,6 +27,7 @@ from pymaker.approval import directly
 from pymaker.deployment import deploy_contract
 from pymaker.numeric import Wad
 from pymaker.token import DSToken, ERC20Token
+from pymaker.util import bytes_to_hexstring
 from pymaker.zrx import ZrxExchange, Order, ZrxRelayerApi
 from tests.helpers import is_hashable, wait_until_mock_called
 
@@ -109,6 +110,28 @@ class TestZrx:
         assert order_hash.startswith('0x')
         assert len(order_hash) == 66
 
+    def test_get_order_hash_should_match_the_contract(self):
+        # given
+        order = self.exchange.create_order(pay_token=Address("0x0202020202020202020202020202020202020202"),
+                                           pay_amount=Wad.from_number(100),
+                                           buy_token=Address("0x0101010101010101010101010101010101010101"),
+                                           buy_amount=Wad.from_number(2.5), expiration=1763920792)
+
+        # when
+        order_hash = self.exchange.get_order_hash(order)
+
+        # then
+        assert order_hash == bytes_to_hexstring(self.exchange._contract.call().getOrderHash(
+            self.exchange._order_addresses(order), self.exchange._order_values(order)))
+
+        # when
+        order.maker_fee = Wad.from_number(0.5)
+
+        # then
+        assert self.exchange.get_order_hash(order) != order_hash
+        assert self.exchange.get_order_hash(order) == bytes_to_hexstring(self.exchange._contract.call().getOrderHash(
+            self.exchange._order_addresses(order), self.exchange._order_values(order)))
+
     def test_sign_order(self):
         # given
         order = self.exchange.create_order(pay_token=Address("0x0202020202020202020202020202020202020202"),
@@ -126,6 +149,24 @@ class TestZrx:
         assert len(signed_order.ec_signature_s) == 66
         assert signed_order.ec_signature_v in [27, 28]
 
+    def test_sign_orders(self):
+        # given
+        orders = [self.exchange.create_order(pay_token=Address("0x0202020202020202020202020202020202020202"),
+                                             pay_amount=Wad.from_number(100 + i),
+                                             buy_token=Address("0x0101010101010101010101010101010101010101"),
+                                             buy_amount=Wad.from_number(2.5), expiration=2763920792)
+                  for i in range(3)]
+
+        # when
+        signed_orders = self.exchange.sign_orders(orders)
+
+        # then
+        for order, signed_order in zip(orders, signed_orders):
+            expected_order = self.exchange.sign_order(order)
+            assert signed_order.ec_signature_r == expected_order.ec_signature_r
+            assert signed_order.ec_signature_s == expected_order.ec_signature_s
+            assert signed_order.ec_signature_v == expected_order.ec_signature_v
+
     def test_cancel_order(self):
         # given
         self.exchange.approve([self.token1, self.token2], directly())
@@ -146,6 +187,23 @@ class TestZrx:
         # then
         assert self.exchange.get_unavailable_buy_amount(signed_order) == Wad.from_number(4)
 
+    def test_get_unavailable_buy_amounts(self):
+        # given
+        self.exchange.approve([self.token1, self.token2], directly())
+        # and
+        signed_orders = [self.exchange.sign_order(self.exchange.create_order(pay_token=self.token1.address,
+                                                                             pay_amount=Wad.from_number(10),
+                                                                             buy_token=self.token2.address,
+                                                                             buy_amount=Wad.from_number(4 + i),
+                                                                             expiration=2763920792))
+                         for i in range(3)]
+
+        # when
+        self.exchange.cancel_order(signed_orders[1]).transact()
+
+        # then
+        assert self.exchange.get_unavailable_buy_amounts(signed_orders) == [Wad(0), Wad.from_number(5), Wad(0)]
+
     def test_fill_order(self):
         # given
         self.exchange.approve([self.token1, self.token2], directly())
@@ -29,7 +29,7 @@ from pymaker.deployment import deploy_contract
 from pymaker.numeric import Wad
 from pymaker.token import DSToken, ERC20Token
 from pymaker.util import bytes_to_hexstring
-from pymaker.zrxv2 import ZrxExchangeV2, Order, ZrxRelayerApiV2, ERC20Asset
+from pymaker.zrxv2 import ZrxExchangeV2, Order, OrderInfo, ZrxRelayerApiV2, ERC20Asset
 from tests.helpers import is_hashable, wait_until_mock_called
 
 PAST_BLOCKS = 100
@@ -119,6 +119,31 @@ class TestZrxV2:
         assert order_hash.startswith('0x')
         assert len(order_hash) == 66
 
+    def test_get_order_hash_should_match_the_contract(self):
+        # given
+        order = self.exchange.create_order(pay_asset=ERC20Asset(Address("0x0202020202020202020202020202020202020202")),
+                                           pay_amount=Wad.from_number(100),
+                                           buy_asset=ERC20Asset(Address("0x0101010101010101010101010101010101010101")),
+                                           buy_amount=Wad.from_number(2.5), expiration=1763920792)
+
+        # expect
+        assert self.exchange.get_order_hash(order) == bytes_to_hexstring(self.exchange._get_order_info(order)[0][1])
+
+    def test_get_order_hash_should_change_when_order_changes(self):
+        # given
+        order = self.exchange.create_order(pay_asset=ERC20Asset(Address("0x0202020202020202020202020202020202020202")),
+                                           pay_amount=Wad.from_number(100),
+                                           buy_asset=ERC20Asset(Address("0x0101010101010101010101010101010101010101")),
+                                           buy_amount=Wad.from_number(2.5), expiration=1763920792)
+        order_hash = self.exchange.get_order_hash(order)
+
+        # when
+        order.maker_fee = Wad.from_number(0.5)
+
+        # then
+        assert self.exchange.get_order_hash(order) != order_hash
+        assert self.exchange.get_order_hash(order) == bytes_to_hexstring(self.exchange._get_order_info(order)[0][1])
+
     def test_sign_order(self):
         # given
         order = self.exchange.create_order(pay_asset=ERC20Asset(Address("0x0202020202020202020202020202020202020202")),
@@ -134,6 +159,22 @@ class TestZrxV2:
         assert signed_order.signature.endswith('03')
         assert len(signed_order.signature) == 134
 
+    def test_sign_orders(self):
+        # given
+        orders = [self.exchange.create_order(pay_asset=ERC20Asset(Address("0x0202020202020202020202020202020202020202")),
+                                             pay_amount=Wad.from_number(100 + i),
+                                             buy_asset=ERC20Asset(Address("0x0101010101010101010101010101010101010101")),
+                                             buy_amount=Wad.from_number(2.5), expiration=2763920792)
+                  for i in range(3)]
+
+        # when
+        signed_orders = self.exchange.sign_orders(orders)
+
+        # then
+        assert [signed_order.signature for signed_order in signed_orders] == \
+               [self.exchange.sign_order(order).signature for order in orders]
+        assert all(order.signature is None for order in orders)
+
     def test_cancel_order(self):
         # given
         self.exchange.approve([self.token1, self.token2], directly())
@@ -154,6 +195,37 @@ class TestZrxV2:
         # then
         assert self.exchange.get_unavailable_buy_amount(signed_order) == Wad.from_number(4)
 
+    def test_get_orders_info(self):
+        # given
+        self.exchange.approve([self.token1, self.token2], directly())
+        # and
+        signed_orders = [self.exchange.sign_order(self.exchange.create_order(pay_asset=ERC20Asset(self.token1.address),
+                                                                             pay_amount=Wad.from_number(10),
+                                                                             buy_asset=ERC20Asset(self.token2.address),
+                                                                             buy_amount=Wad.from_number(4 + i),
+                                                                             expiration=2763920792))
+                         for i in range(3)]
+        # and
+        self.exchange.ORDERS_INFO_CHUNK_SIZE = 2
+
+        # when
+        self.exchange.cancel_order(signed_orders[1]).transact()
+        self.exchange.fill_order(signed_orders[2], Wad.from_number(1.5)).transact()
+
+        # then
+        orders_info = self.exchange.get_orders_info(signed_orders)
+        assert [order_info.status for order_info in orders_info] == [OrderInfo.FILLABLE,
+                                                                     OrderInfo.CANCELLED,
+                                                                     OrderInfo.FILLABLE]
+        assert [order_info.order_hash for order_info in orders_info] == list(map(self.exchange.get_order_hash,
+                                                                                 signed_orders))
+        # and
+        assert self.exchange.get_unavailable_buy_amounts(signed_orders) == [Wad(0),
+                                                                            Wad.from_number(5),
+                                                                            Wad.from_number(1.5)]
+        assert self.exchange.get_unavailable_buy_amounts(signed_orders) == \
+               list(map(self.exchange.get_unavailable_buy_amount, signed_orders))
+
     def test_fill_order(self):
         # given
         self.exchange.approve([self.token1, self.token2], directly())
@@ -174,6 +246,116 @@ class TestZrxV2:
         # then
         assert self.exchange.get_unavailable_buy_amount(signed_order) == Wad.from_number(3.5)
 
+    def signed_orders(self, count: int) -> list:
+        return [self.exchange.sign_order(self.exchange.create_order(pay_asset=ERC20Asset(self.token1.address),
+                                                                    pay_amount=Wad.from_number(10),
+                                                                    buy_asset=ERC20Asset(self.token2.address),
+                                                                    buy_amount=Wad.from_number(4),
+                                                                    expiration=2763920792 + i))
+                for i in range(count)]
+
+    def test_batch_fill_orders(self):
+        # given
+        self.exchange.approve([self.token1, self.token2], directly())
+        signed_orders = self.signed_orders(2)
+
+        # when
+        receipt = self.exchange.batch_fill_orders(signed_orders, [Wad.from_number(1.5), Wad.from_number(4)]).transact()
+
+        # then
+        assert [log_fill.order_hash for log_fill in receipt.result] == list(map(self.exchange.get_order_hash,
+                                                                                signed_orders))
+        assert [log_fill.filled_buy_amount for log_fill in receipt.result] == [Wad.from_number(1.5),
+                                                                               Wad.from_number(4)]
+        # and
+        assert self.exchange.get_unavailable_buy_amounts(signed_orders) == [Wad.from_number(1.5), Wad.from_number(4)]
+
+    def test_batch_fill_orders_should_match_fills_of_the_same_order(self):
+        # given
+        self.exchange.approve([self.token1, self.token2], directly())
+        signed_order = self.signed_orders(1)[0]
+
+        # when
+        receipt = self.exchange.batch_fill_orders([signed_order, signed_order],
+                                                  [Wad.from_number(1.5), Wad.from_number(2)]).transact()
+
+        # then
+        assert [log_fill.filled_buy_amount for log_fill in receipt.result] == [Wad.from_number(1.5),
+                                                                               Wad.from_number(2)]
+        # and
+        assert self.exchange.get_unavailable_buy_amount(signed_order) == Wad.from_number(3.5)
+
+    def test_market_sell_orders(self):
+        # given
+        self.exchange.approve([self.token1, self.token2], directly())
+        signed_orders = self.signed_orders(3)
+
+        # when
+        receipt = self.exchange.market_sell_orders(signed_orders, Wad.from_number(5)).transact()
+
+        # then
+        assert receipt.result[0].filled_buy_amount == Wad.from_number(4)
+        assert receipt.result[1].filled_buy_amount == Wad.from_number(1)
+        assert receipt.result[2] is None
+        # and
+        assert self.exchange.get_unavailable_buy_amounts(signed_orders) == [Wad.from_number(4),
+                                                                            Wad.from_number(1),
+                                                                            Wad(0)]
+
+    def test_market_buy_orders(self):
+        # given
+        self.exchange.approve([self.token1, self.token2], directly())
+        signed_orders = self.signed_orders(3)
+
+        # when
+        receipt = self.exchange.market_buy_orders(signed_orders, Wad.from_number(12.5)).transact()
+
+        # then
+        assert receipt.result[0].filled_pay_amount == Wad.from_number(10)
+        assert receipt.result[1].filled_pay_amount == Wad.from_number(2.5)
+        assert receipt.result[2] is None
+        # and
+        assert self.exchange.get_unavailable_buy_amounts(signed_orders) == [Wad.from_number(4),
+                                                                            Wad.from_number(1),
+                                                                            Wad(0)]
+
+    def test_batch_cancel_orders(self):
+        # given
+        self.exchange.approve([self.token1, self.token2], directly())
+        signed_orders = self.signed_orders(2)
+
+        # when
+        receipt = self.exchange.batch_cancel_orders(signed_orders).transact()
+
+        # then
+        assert [log_cancel.order_hash for log_cancel in receipt.result] == list(map(self.exchange.get_order_hash,
+                                                                                    signed_orders))
+        # and
+        assert [order_info.status for order_info in self.exchange.get_orders_info(signed_orders)] == \
+               [OrderInfo.CANCELLED, OrderInfo.CANCELLED]
+
+    def test_cancel_orders_up_to(self):
+        # given
+        self.exchange.approve([self.token1, self.token2], directly())
+        signed_orders = self.signed_orders(2)
+        salt = max(order.salt for order in signed_orders) + 1
+
+        # when
+        receipt = self.exchange.cancel_orders_up_to(salt).transact()
+
+        # then
+        assert receipt.result.maker == self.our_address
+        assert receipt.result.order_epoch == salt
+        assert self.exchange.get_order_epoch(self.our_address) == salt
+        # and
+        assert [order_info.status for order_info in self.exchange.get_orders_info(signed_orders)] == \
+               [OrderInfo.CANCELLED, OrderInfo.CANCELLED]
+
+    def test_cancel_orders_up_to_should_require_a_positive_salt(self):
+        # expect
+        with pytest.raises(AssertionError):
+            self.exchange.cancel_orders_up_to(0)
+
     def test_remaining_buy_amount_and_remaining_sell_amount(self):
         # given
         self.exchange.approve([self.token1, self.token2], directly())